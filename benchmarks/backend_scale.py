@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+The system managers, gesture dispatch and (with --pages) the System and
+Tweaks page construction at scale, on the in-memory FakeBackend.
+
+    PYTHONPATH=src python3 benchmarks/backend_scale.py --packages 5000 --gestures 300 --json scale.json
+    PYTHONPATH=src python3 benchmarks/backend_scale.py --packages 5000 --gestures 300 --compare scale.json
+
+The dpkg status parser of the real backend is timed on a generated database
+of the same size. Gesture dispatch uses the loginctl stub from
+press_latency.py; --pages needs a display.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from press_latency import percentiles, compare, write_stubs
+
+def timed(name, call, runs, results):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - start) * 1000)
+    results[name] = percentiles(samples)
+
+def write_dpkg_status(path, count):
+    with open(path, "w") as f:
+        for i in range(count):
+            f.write(f"Package: pkg{i}\nStatus: install ok installed\nPriority: optional\n"
+                    f"Version: 1.0-{i}\nDescription: Benchmark package {i}\n\n")
+
+def write_gestures(home, count):
+    config_dir = os.path.join(home, ".config", "tweak-flx1s")
+    os.makedirs(config_dir, exist_ok=True)
+    action = {"type": "command", "value": ""}
+    gestures = [{"name": f"Gesture {i}", "spec": f"{1 + i % 5},RL,B,*,{i}", "locked": action, "unlocked": action}
+                for i in range(count)]
+    with open(os.path.join(config_dir, "gestures.json"), "w") as f:
+        json.dump({"enabled": True, "gestures": gestures}, f)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--packages", type=int, default=5000)
+    parser.add_argument("--alternatives", type=int, default=50)
+    parser.add_argument("--mounts", type=int, default=500)
+    parser.add_argument("--gestures", type=int, default=300)
+    parser.add_argument("--pages", action="store_true", help="Also time the System and Tweaks pages")
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.25)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="tweak-flx1s-bench-")
+    bin_dir = os.path.join(root, "bin")
+    home = os.path.join(root, "home")
+    runtime = os.path.join(root, "run")
+    os.makedirs(runtime, mode=0o700)
+    write_stubs(bin_dir, {}, False, False)
+    write_gestures(home, args.gestures)
+    status_path = os.path.join(root, "status")
+    write_dpkg_status(status_path, args.packages)
+
+    os.environ.update({
+        "HOME": home,
+        "XDG_RUNTIME_DIR": runtime,
+        "PATH": bin_dir + os.pathsep + os.environ.get("PATH", ""),
+        "DBUS_SYSTEM_BUS_ADDRESS": "unix:path=" + os.path.join(root, "no-bus"),
+    })
+    results = {}
+
+    try:
+        from loguru import logger
+        logger.remove()
+        from tweak_flx1s.backends import set_backend
+        from tweak_flx1s.backends.fake import FakeBackend
+        from tweak_flx1s.backends.real import Packages
+
+        timed("dpkg-status/parse", lambda: Packages(status_path).installed(), args.runs, results)
+        packages = Packages(status_path)
+        packages.installed()
+        timed("dpkg-status/cached", lambda: packages.is_installed("squeekboard"), args.runs, results)
+
+        backend = FakeBackend(
+            packages=[f"pkg{i}" for i in range(args.packages)] + ["squeekboard", "furios-apt-config-staging"],
+            alternatives={"Phosh-OSK": {
+                "value": "/usr/bin/squeekboard",
+                "alternatives": [{"path": f"/usr/libexec/osk-{i}", "priority": i} for i in range(args.alternatives)],
+            }},
+            settings={("org.gnome.desktop.sound", "theme-name"): "default"},
+            mounts=[{"source": f"/dev/loop{i}", "target": f"/snap/pkg{i}", "fstype": "squashfs"}
+                    for i in range(args.mounts)],
+        )
+        set_backend(backend)
+
+        from tweak_flx1s.system.package_manager import PackageManager
+        from tweak_flx1s.system.keyboard import KeyboardManager
+        from tweak_flx1s.system.andromeda import AndromedaManager
+        from tweak_flx1s.system.sounds import SoundManager
+        from tweak_flx1s.actions.gestures import GesturesManager
+
+        timed("packages/check_is_staging", PackageManager().check_is_staging, args.runs, results)
+        keyboard = KeyboardManager()
+        timed("keyboard/available", keyboard.get_available_keyboards, args.runs, results)
+        timed("keyboard/current", keyboard.get_current_keyboard, args.runs, results)
+        andromeda = AndromedaManager()
+        backend.mounts.bind("/dev/null", os.path.join(andromeda.ANDROID_MOUNT_BASE, "Music"))
+        timed("andromeda/is_mounted", andromeda.is_mounted, args.runs, results)
+        sounds = SoundManager()
+        timed("sounds/toggle", lambda: (sounds.disable_custom_theme(), sounds.is_custom_theme_active()),
+              args.runs, results)
+        sounds.install_custom_sounds()
+        timed("assets/sounds-resync", sounds.install_custom_sounds, args.runs, results)
+        from tweak_flx1s.system.wofi import WofiManager
+        wofi = WofiManager()
+        wofi.force_install_config()
+        timed("assets/wofi-check", wofi.check_config_match, args.runs, results)
+
+        timed("gestures/load", GesturesManager, args.runs, results)
+        manager = GesturesManager()
+        timed("gestures/dispatch-last", lambda: manager.handle_gesture(args.gestures - 1), args.runs, results)
+
+        if args.pages:
+            import gi
+            gi.require_version('Gtk', '4.0')
+            gi.require_version('Adw', '1')
+            from gi.repository import Adw
+            Adw.init()
+            from tweak_flx1s.gui.pages.system_page import SystemPage
+            from tweak_flx1s.gui.pages.tweaks_page import TweaksPage
+            timed("pages/system", lambda: SystemPage(None, backend=backend), args.runs, results)
+            timed("pages/tweaks", lambda: TweaksPage(None, backend=backend), args.runs, results)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print(f"{'benchmark':32} {'p50':>9} {'p95':>9} {'p99':>9}   (ms, {args.runs} runs)")
+    for name, stats in results.items():
+        print(f"{name:32} {stats['p50']:9.2f} {stats['p95']:9.2f} {stats['p99']:9.2f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"meta": {"runs": args.runs, "packages": args.packages, "alternatives": args.alternatives,
+                                "mounts": args.mounts, "gestures": args.gestures},
+                       "results": results}, f, indent=2)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Latency of the D-Bus backed actions against the fake services in fakebus:
+the logind lock check, the flashlight toggle, notifications, screenshots
+and placing launched commands in a systemd scope.
+
+    PYTHONPATH=src:benchmarks python3 benchmarks/bus_latency.py --latency login1=5 --json bus.json
+    PYTHONPATH=src:benchmarks python3 benchmarks/bus_latency.py --latency login1=5 --compare bus.json
+
+--fail KEY=ERROR injects D-Bus errors, to time the error paths. Property
+reads are faulted as "<service>.Get" (or with the service key) and delayed
+per property. Reads from a proxy's cache cost no round trip, so after
+"lock/first" has loaded logind's properties, "lock" is not affected by
+--latency login1; "flashlight" reads Brightness afresh on every toggle.
+"""
+
+import sys
+import json
+import time
+import argparse
+from fakebus import FakeBus, parse_pairs
+from press_latency import percentiles, compare
+
+def timed(name, call, runs, results):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - start) * 1000)
+    results[name] = percentiles(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--latency", action="append", metavar="KEY=MS")
+    parser.add_argument("--fail", action="append", metavar="KEY=ERROR")
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.25)
+    args = parser.parse_args()
+
+    results = {}
+    with FakeBus(latency_ms=parse_pairs(args.latency, int), failures=parse_pairs(args.fail)) as bus:
+        bus.apply()
+        from loguru import logger
+        logger.remove()
+        from tweak_flx1s.actions.executor import is_locked, execute_command
+        from tweak_flx1s.actions.shortcuts import ShortcutsManager
+        from tweak_flx1s.actions.screenshot import get_pipeline
+        from tweak_flx1s.core.notify import get_broker
+
+        timed("lock/first", is_locked, 1, results)
+        timed("lock", is_locked, args.runs, results)
+
+        shortcuts = ShortcutsManager()
+        timed("flashlight", shortcuts.toggle_flashlight, args.runs, results)
+
+        broker = get_broker()
+        counter = iter(range(sys.maxsize))
+        # A new source per call keeps the rate limit out of the numbers.
+        timed("notify", lambda: broker.notify("Benchmark", source=f"bench-{next(counter)}"), args.runs, results)
+
+        pipeline = get_pipeline()
+        timed("screenshot", lambda: (pipeline.capture(), pipeline.wait()), args.runs, results)
+
+        timed("launch", lambda: execute_command("true"), args.runs, results)
+
+        calls = bus.calls()
+
+    print(f"{'benchmark':24} {'p50':>9} {'p95':>9} {'p99':>9}   (ms, {args.runs} runs, {len(calls)} bus calls)")
+    for name, stats in results.items():
+        print(f"{name:24} {stats['p50']:9.2f} {stats['p95']:9.2f} {stats['p99']:9.2f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"meta": {"runs": args.runs, "latency": args.latency, "fail": args.fail},
+                       "results": results}, f, indent=2)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Shot-to-file latency of the camera pipeline, cold versus warm.
+
+Uses videotestsrc unless --source is given, and writes into a temporary
+Pictures directory:
+
+    PYTHONPATH=src python3 benchmarks/camera_latency.py --shots 10
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shots", type=int, default=10)
+    parser.add_argument("--source", default="videotestsrc is-live=true ! video/x-raw,width=1920,height=1080")
+    args = parser.parse_args()
+
+    out_dir = tempfile.mkdtemp(prefix="tweak-flx1s-camera-")
+    os.environ["TWEAK_FLX1S_CAMERA_SOURCE"] = args.source
+
+    from tweak_flx1s.actions import camera as camera_mod
+    camera_mod.CameraPipeline._picture_path = lambda self, index: os.path.join(out_dir, f"{time.monotonic_ns()}.jpeg")
+    import tweak_flx1s.utils
+    tweak_flx1s.utils.send_notification = lambda *a, **k: None
+
+    def run(keep_warm):
+        camera = camera_mod.CameraPipeline(keep_warm=keep_warm)
+        totals = []
+        for _ in range(args.shots):
+            start = time.monotonic()
+            camera.shoot()
+            camera.wait()
+            totals.append((time.monotonic() - start) * 1000)
+        camera.stop()
+        return totals
+
+    for label, keep_warm in (("cold", 0), ("warm", 60)):
+        totals = run(keep_warm)
+        print(f"{label}: median {statistics.median(totals):.1f} ms, "
+              f"min {min(totals):.1f} ms, max {max(totals):.1f} ms over {len(totals)} shots")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Private session and system buses with fake logind, systemd, Flashlightd,
+Shell Screenshot, feedbackd and notification services, for exercising and
+timing Tweak-FLX1s off the phone.
+
+    from fakebus import FakeBus
+
+    with FakeBus(latency_ms={"login1": 5, "screenshot.Screenshot": 120}) as bus:
+        bus.apply()                  # before anything connects to a bus
+        ...
+        bus.set_locked(True)
+        bus.set_failure("flashlight.SetBrightness", "org.freedesktop.DBus.Error.NoReply")
+        print(bus.calls())
+
+Faults are keyed by service ("login1", "systemd", "flashlight", "screenshot",
+"feedback", "notifications") or "<service>.<Method>"; property reads count as
+"<service>.Get". GSettings use the
+memory backend, or a keyfile under the fixture's root with
+settings_backend="keyfile" so values survive across processes such as the
+gsettings tool. Minimal schemas for the keys Tweak-FLX1s touches are
+compiled in. From a shell, `PYTHONPATH=src:benchmarks python3 -m fakebus`
+prints the environment to export.
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import subprocess
+
+SCHEMA_SOURCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schemas")
+
+BUS_CONFIG = """<!DOCTYPE busconfig PUBLIC "-//freedesktop//DTD D-BUS Bus Configuration 1.0//EN"
+ "http://www.freedesktop.org/standards/dbus/1.0/busconfig.dtd">
+<busconfig>
+  <type>session</type>
+  <listen>unix:path={socket}</listen>
+  <auth>EXTERNAL</auth>
+  <policy context="default">
+    <allow send_destination="*" eavesdrop="true"/>
+    <allow eavesdrop="true"/>
+    <allow own="*"/>
+  </policy>
+</busconfig>
+"""
+
+STOP_TIMEOUT = 10
+
+def parse_pairs(values, convert=str):
+    """["key=value", ...] from the command line to {key: convert(value)}."""
+    result = {}
+    for value in values or []:
+        key, _, setting = value.partition("=")
+        result[key] = convert(setting)
+    return result
+
+class FakeBus:
+    """One set of private buses and fake services. Use as a context manager."""
+
+    def __init__(self, latency_ms=None, failures=None, locked=False, services=None,
+                 settings_backend="memory", isolate_home=True, **config):
+        self.config = dict(config, latency_ms=latency_ms or {}, failures=failures or {},
+                           locked=locked, services=services)
+        self.settings_backend = settings_backend
+        self.isolate_home = isolate_home
+        self.root = None
+        self.schema_dir = None
+        self.addresses = {}
+        self.processes = []
+        self.control_connection = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def _start_daemon(self, role):
+        socket = os.path.join(self.root, f"{role}_bus_socket")
+        config_path = os.path.join(self.root, f"{role}.conf")
+        with open(config_path, 'w') as f:
+            f.write(BUS_CONFIG.format(socket=socket))
+        process = subprocess.Popen(
+            ["dbus-daemon", "--nofork", f"--config-file={config_path}", "--print-address=1"],
+            stdout=subprocess.PIPE, text=True
+        )
+        self.processes.append(process)
+        address = process.stdout.readline().strip()
+        if not address:
+            raise RuntimeError(f"dbus-daemon for the {role} bus did not start")
+        return address
+
+    def _compile_schemas(self):
+        schema_dir = os.path.join(self.root, "schemas")
+        shutil.copytree(SCHEMA_SOURCE_DIR, schema_dir)
+        try:
+            subprocess.run(["glib-compile-schemas", schema_dir], check=True)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"fakebus: schemas not compiled, using the installed ones: {e}", file=sys.stderr)
+            return None
+        return schema_dir
+
+    def start(self):
+        self.root = tempfile.mkdtemp(prefix="tweak-flx1s-fakebus-")
+        for name in ("run", "home", "config"):
+            os.makedirs(os.path.join(self.root, name), mode=0o700)
+
+        self.addresses["session"] = self._start_daemon("session")
+        self.addresses["system"] = self._start_daemon("system")
+        self.schema_dir = self._compile_schemas()
+
+        package_parent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(os.environ, **self.env())
+        env["PYTHONPATH"] = package_parent + os.pathsep + env.get("PYTHONPATH", "")
+        services = subprocess.Popen(
+            [sys.executable, "-m", "fakebus.services", json.dumps(self.config)],
+            stdout=subprocess.PIPE, text=True, env=env
+        )
+        self.processes.append(services)
+        # The services print READY once every name is owned.
+        if services.stdout.readline().strip() != "READY":
+            self.stop()
+            raise RuntimeError("Fake services did not start")
+
+    def env(self):
+        """Environment variables that point a process at the fakes."""
+        env = {
+            "DBUS_SESSION_BUS_ADDRESS": self.addresses["session"],
+            "DBUS_SYSTEM_BUS_ADDRESS": self.addresses["system"],
+            "XDG_RUNTIME_DIR": os.path.join(self.root, "run"),
+            "GSETTINGS_BACKEND": self.settings_backend,
+        }
+        if self.schema_dir:
+            env["GSETTINGS_SCHEMA_DIR"] = self.schema_dir
+        if self.settings_backend == "keyfile" or self.isolate_home:
+            env["XDG_CONFIG_HOME"] = os.path.join(self.root, "config")
+        if self.isolate_home:
+            env["HOME"] = os.path.join(self.root, "home")
+        return env
+
+    def apply(self):
+        """Points this process at the fakes. Call before anything connects to a bus or reads const."""
+        os.environ.update(self.env())
+
+    def _control(self, method, params=None, reply_type=None):
+        from gi.repository import Gio, GLib
+        if self.control_connection is None:
+            self.control_connection = Gio.DBusConnection.new_for_address_sync(
+                self.addresses["session"],
+                Gio.DBusConnectionFlags.AUTHENTICATION_CLIENT | Gio.DBusConnectionFlags.MESSAGE_BUS_CONNECTION,
+                None, None
+            )
+        result = self.control_connection.call_sync(
+            "io.furios.TweakFLX1s.Fake", "/io/furios/TweakFLX1s/Fake", "io.furios.TweakFLX1s.Fake", method,
+            params, GLib.VariantType(reply_type) if reply_type else None, Gio.DBusCallFlags.NONE, -1, None
+        )
+        return result.unpack() if result is not None else None
+
+    def set_latency(self, key, ms):
+        from gi.repository import GLib
+        self._control("SetLatency", GLib.Variant("(su)", (key, int(ms))))
+
+    def set_failure(self, key, error=""):
+        """Makes calls fail with the given D-Bus error name; an empty name clears it."""
+        from gi.repository import GLib
+        self._control("SetFailure", GLib.Variant("(ss)", (key, error)))
+
+    def set_locked(self, locked):
+        from gi.repository import GLib
+        self._control("SetLocked", GLib.Variant("(b)", (locked,)))
+
+    def calls(self):
+        """[(service, method, monotonic time), ...] of every call the fakes answered."""
+        return self._control("Calls", reply_type="(a(ssd))")[0]
+
+    def reset(self):
+        self._control("Reset")
+
+    def stop(self):
+        if self.control_connection is not None:
+            self.control_connection.close_sync(None)
+            self.control_connection = None
+        for process in reversed(self.processes):
+            process.terminate()
+            try:
+                process.wait(timeout=STOP_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self.processes = []
+        if self.root:
+            shutil.rmtree(self.root, ignore_errors=True)
+            self.root = None
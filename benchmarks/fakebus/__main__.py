@@ -0,0 +1,52 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Starts the fake buses and prints the environment to use them, then waits
+for Ctrl+C:
+
+    PYTHONPATH=src:benchmarks python3 -m fakebus --latency login1=5 --locked
+"""
+
+import sys
+import signal
+import argparse
+from fakebus import FakeBus, parse_pairs
+
+def main():
+    parser = argparse.ArgumentParser(prog="fakebus", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", action="append", metavar="KEY=MS", help="e.g. login1=5 or screenshot.Screenshot=120")
+    parser.add_argument("--fail", action="append", metavar="KEY=ERROR", help="e.g. flashlight=org.freedesktop.DBus.Error.NoReply")
+    parser.add_argument("--locked", action="store_true", help="Start with the session locked")
+    parser.add_argument("--keyfile", action="store_true", help="Keep GSettings in a keyfile instead of memory")
+    args = parser.parse_args()
+
+    bus = FakeBus(latency_ms=parse_pairs(args.latency, int), failures=parse_pairs(args.fail), locked=args.locked,
+                  settings_backend="keyfile" if args.keyfile else "memory")
+    with bus:
+        for key, value in bus.env().items():
+            print(f"export {key}='{value}'")
+        sys.stdout.flush()
+        # Blocked so that sigwait receives them instead of the default action
+        # killing the process before the buses and the temp root are cleaned
+        # up. Done after the daemons were started, which would inherit the mask.
+        stop_signals = {signal.SIGINT, signal.SIGTERM}
+        signal.pthread_sigmask(signal.SIG_BLOCK, stop_signals)
+        signal.sigwait(stop_signals)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,588 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Fake D-Bus services, run in their own process by FakeBus:
+
+    python3 -m fakebus.services CONFIG_JSON
+
+Connects to DBUS_SESSION_BUS_ADDRESS and DBUS_SYSTEM_BUS_ADDRESS, exports
+every fake named in the config and prints READY once all names are owned.
+"""
+
+import os
+import sys
+import json
+import time
+import pwd
+import signal
+from gi.repository import Gio, GLib
+
+CONTROL_NAME = "io.furios.TweakFLX1s.Fake"
+CONTROL_PATH = "/io/furios/TweakFLX1s/Fake"
+
+CONTROL_XML = """
+<node>
+  <interface name="io.furios.TweakFLX1s.Fake">
+    <method name="SetLatency"><arg type="s" name="key" direction="in"/><arg type="u" name="ms" direction="in"/></method>
+    <method name="SetFailure"><arg type="s" name="key" direction="in"/><arg type="s" name="error" direction="in"/></method>
+    <method name="SetLocked"><arg type="b" name="locked" direction="in"/></method>
+    <method name="Calls"><arg type="a(ssd)" name="calls" direction="out"/></method>
+    <method name="Reset"/>
+  </interface>
+</node>
+"""
+
+# A 1x1 transparent PNG, what the fake shell "captures".
+PNG_1X1 = bytes.fromhex(
+    "89504e470d0a1a0a0000000d49484452000000010000000108060000001f15c489"
+    "0000000d49444154789c6360000002000001e221bc330000000049454e44ae426082"
+)
+
+class Faults:
+    """
+    Latency and failure injection, keyed by "<service>" or "<service>.<Method>".
+    The more specific key wins.
+    """
+
+    def __init__(self, latency_ms=None, failures=None):
+        self.latency_ms = dict(latency_ms or {})
+        self.failures = dict(failures or {})
+        self.calls = []
+
+    def _lookup(self, table, key, method):
+        value = table.get(f"{key}.{method}")
+        return table.get(key) if value is None else value
+
+    def latency(self, key, method):
+        return self._lookup(self.latency_ms, key, method) or 0
+
+    def failure(self, key, method):
+        return self._lookup(self.failures, key, method) or None
+
+class FakeService:
+    """
+    Base of the fakes. Subclasses list their objects as {path: interface XML},
+    implement D-Bus methods as methods of the same name returning a tuple
+    (or None) and keep their properties in self.properties[interface].
+    """
+
+    key = None
+    name = None
+    bus = "session"
+    objects = {}
+
+    def __init__(self, faults, config):
+        self.faults = faults
+        self.config = config
+        self.connection = None
+        self.properties = {}
+        self.registrations = []
+        self.nodes = {path: Gio.DBusNodeInfo.new_for_xml(xml) for path, xml in self.objects.items()}
+
+    def export(self, connection):
+        self.connection = connection
+        for path, node in self.nodes.items():
+            for info in node.interfaces:
+                self.registrations.append(connection.register_object(
+                    path, info, self._on_method_call, self._on_get_property, self._on_set_property
+                ))
+
+    def _on_method_call(self, connection, sender, path, interface, method, params, invocation):
+        self.faults.calls.append((self.key, method, time.monotonic()))
+        error = self.faults.failure(self.key, method)
+
+        def reply():
+            if error:
+                invocation.return_dbus_error(error, f"Injected failure of {self.key}.{method}")
+                return GLib.SOURCE_REMOVE
+            try:
+                result = getattr(self, method)(path, *params.unpack())
+            except Exception as e:
+                invocation.return_dbus_error("org.freedesktop.DBus.Error.Failed", str(e))
+                return GLib.SOURCE_REMOVE
+            out_sig = "".join(arg.signature for arg in invocation.get_method_info().out_args)
+            invocation.return_value(GLib.Variant(f"({out_sig})", result or ()))
+            return GLib.SOURCE_REMOVE
+
+        latency = self.faults.latency(self.key, method)
+        if latency:
+            GLib.timeout_add(latency, reply)
+        else:
+            reply()
+
+    def _on_get_property(self, connection, sender, path, interface, name):
+        # Property reads are faulted as "<service>.Get". GDBus wants the value
+        # synchronously, so latency blocks the service for each property read
+        # (GetAll reads every property of the interface), and a failure makes
+        # GDBus reply with its own error rather than the injected name.
+        self.faults.calls.append((self.key, "Get", time.monotonic()))
+        if self.faults.failure(self.key, "Get"):
+            return None
+        latency = self.faults.latency(self.key, "Get")
+        if latency:
+            time.sleep(latency / 1000)
+        return self.properties.get(interface, {}).get(name)
+
+    def _on_set_property(self, connection, sender, path, interface, name, value):
+        self.set_property(interface, name, value)
+        return True
+
+    def set_property(self, interface, name, value, paths=None):
+        """Updates a property and announces it with PropertiesChanged."""
+        self.properties.setdefault(interface, {})[name] = value
+        for path in paths or self.nodes:
+            if any(info.name == interface for info in self.nodes[path].interfaces):
+                self.emit(path, "org.freedesktop.DBus.Properties", "PropertiesChanged",
+                          GLib.Variant("(sa{sv}as)", (interface, {name: value}, [])))
+
+    def emit(self, path, interface, signal_name, params):
+        self.connection.emit_signal(None, path, interface, signal_name, params)
+
+class Login1(FakeService):
+    """logind: one graphical session of the current user, lockable."""
+
+    key = "login1"
+    name = "org.freedesktop.login1"
+    bus = "system"
+
+    MANAGER = "org.freedesktop.login1.Manager"
+    USER = "org.freedesktop.login1.User"
+    SESSION = "org.freedesktop.login1.Session"
+
+    SESSION_XML = """
+    <node>
+      <interface name="org.freedesktop.login1.Session">
+        <method name="Lock"/>
+        <method name="Unlock"/>
+        <method name="SetLockedHint"><arg type="b" direction="in"/></method>
+        <method name="SetBrightness"><arg type="s" direction="in"/><arg type="s" direction="in"/><arg type="u" direction="in"/></method>
+        <signal name="Lock"/>
+        <signal name="Unlock"/>
+        <property name="Id" type="s" access="read"/>
+        <property name="Name" type="s" access="read"/>
+        <property name="Type" type="s" access="read"/>
+        <property name="State" type="s" access="read"/>
+        <property name="Active" type="b" access="read"/>
+        <property name="LockedHint" type="b" access="read"/>
+      </interface>
+    </node>
+    """
+
+    USER_XML = """
+    <node>
+      <interface name="org.freedesktop.login1.User">
+        <property name="UID" type="u" access="read"/>
+        <property name="Name" type="s" access="read"/>
+        <property name="Display" type="(so)" access="read"/>
+        <property name="State" type="s" access="read"/>
+      </interface>
+    </node>
+    """
+
+    MANAGER_XML = """
+    <node>
+      <interface name="org.freedesktop.login1.Manager">
+        <method name="ListSessions"><arg type="a(susso)" direction="out"/></method>
+        <method name="GetSession"><arg type="s" direction="in"/><arg type="o" direction="out"/></method>
+        <method name="LockSession"><arg type="s" direction="in"/></method>
+        <method name="UnlockSession"><arg type="s" direction="in"/></method>
+      </interface>
+    </node>
+    """
+
+    SESSION_ID = "1"
+    SESSION_PATH = "/org/freedesktop/login1/session/_31"
+
+    def __init__(self, faults, config):
+        uid = os.getuid()
+        self.objects = {
+            "/org/freedesktop/login1": self.MANAGER_XML,
+            "/org/freedesktop/login1/user/self": self.USER_XML,
+            f"/org/freedesktop/login1/user/_{uid}": self.USER_XML,
+            self.SESSION_PATH: self.SESSION_XML,
+            "/org/freedesktop/login1/session/auto": self.SESSION_XML,
+            "/org/freedesktop/login1/session/self": self.SESSION_XML,
+        }
+        super().__init__(faults, config)
+        self.user = pwd.getpwuid(uid).pw_name
+        self.brightness = []
+        self.properties = {
+            self.USER: {
+                "UID": GLib.Variant("u", uid),
+                "Name": GLib.Variant("s", self.user),
+                "Display": GLib.Variant("(so)", (self.SESSION_ID, self.SESSION_PATH)),
+                "State": GLib.Variant("s", "active"),
+            },
+            self.SESSION: {
+                "Id": GLib.Variant("s", self.SESSION_ID),
+                "Name": GLib.Variant("s", self.user),
+                "Type": GLib.Variant("s", "wayland"),
+                "State": GLib.Variant("s", "active"),
+                "Active": GLib.Variant("b", True),
+                "LockedHint": GLib.Variant("b", bool(config.get("locked"))),
+            },
+        }
+
+    def set_locked(self, locked):
+        self.set_property(self.SESSION, "LockedHint", GLib.Variant("b", locked))
+        for path in (self.SESSION_PATH, "/org/freedesktop/login1/session/auto", "/org/freedesktop/login1/session/self"):
+            self.emit(path, self.SESSION, "Lock" if locked else "Unlock", None)
+
+    def ListSessions(self, path):
+        return ([(self.SESSION_ID, os.getuid(), self.user, "seat0", self.SESSION_PATH)],)
+
+    def GetSession(self, path, session_id):
+        if session_id not in (self.SESSION_ID, "auto", "self"):
+            raise ValueError(f"No session {session_id}")
+        return (self.SESSION_PATH,)
+
+    def LockSession(self, path, session_id):
+        self.set_locked(True)
+
+    def UnlockSession(self, path, session_id):
+        self.set_locked(False)
+
+    def Lock(self, path):
+        self.set_locked(True)
+
+    def Unlock(self, path):
+        self.set_locked(False)
+
+    def SetLockedHint(self, path, locked):
+        self.set_property(self.SESSION, "LockedHint", GLib.Variant("b", locked))
+
+    def SetBrightness(self, path, subsystem, name, value):
+        self.brightness.append((subsystem, name, value))
+
+class Systemd(FakeService):
+    """The user manager: units start instantly and jobs finish right away."""
+
+    key = "systemd"
+    name = "org.freedesktop.systemd1"
+
+    objects = {"/org/freedesktop/systemd1": """
+    <node>
+      <interface name="org.freedesktop.systemd1.Manager">
+        <method name="StartUnit"><arg type="s" direction="in"/><arg type="s" direction="in"/><arg type="o" direction="out"/></method>
+        <method name="StopUnit"><arg type="s" direction="in"/><arg type="s" direction="in"/><arg type="o" direction="out"/></method>
+        <method name="RestartUnit"><arg type="s" direction="in"/><arg type="s" direction="in"/><arg type="o" direction="out"/></method>
+        <method name="TryRestartUnit"><arg type="s" direction="in"/><arg type="s" direction="in"/><arg type="o" direction="out"/></method>
+        <method name="StartTransientUnit">
+          <arg type="s" direction="in"/><arg type="s" direction="in"/>
+          <arg type="a(sv)" direction="in"/><arg type="a(sa(sv))" direction="in"/>
+          <arg type="o" direction="out"/>
+        </method>
+        <method name="GetUnitFileState"><arg type="s" direction="in"/><arg type="s" direction="out"/></method>
+        <method name="EnableUnitFiles">
+          <arg type="as" direction="in"/><arg type="b" direction="in"/><arg type="b" direction="in"/>
+          <arg type="b" direction="out"/><arg type="a(sss)" direction="out"/>
+        </method>
+        <method name="DisableUnitFiles">
+          <arg type="as" direction="in"/><arg type="b" direction="in"/>
+          <arg type="a(sss)" direction="out"/>
+        </method>
+        <method name="Reload"/>
+        <signal name="JobRemoved"><arg type="u"/><arg type="o"/><arg type="s"/><arg type="s"/></signal>
+      </interface>
+    </node>
+    """}
+
+    def __init__(self, faults, config):
+        super().__init__(faults, config)
+        self.active = set()
+        self.enabled = set(config.get("enabled_units", []))
+        self.job_id = 0
+
+    def _job(self, unit, active):
+        if active:
+            self.active.add(unit)
+        else:
+            self.active.discard(unit)
+        self.job_id += 1
+        job = f"/org/freedesktop/systemd1/job/{self.job_id}"
+        # The job finishes after the reply, as with the real manager.
+        GLib.idle_add(self._job_removed, self.job_id, job, unit)
+        return (job,)
+
+    def _job_removed(self, job_id, job, unit):
+        self.emit("/org/freedesktop/systemd1", "org.freedesktop.systemd1.Manager", "JobRemoved",
+                  GLib.Variant("(uoss)", (job_id, job, unit, "done")))
+        return GLib.SOURCE_REMOVE
+
+    def StartUnit(self, path, unit, mode):
+        return self._job(unit, True)
+
+    def StopUnit(self, path, unit, mode):
+        return self._job(unit, False)
+
+    def RestartUnit(self, path, unit, mode):
+        return self._job(unit, True)
+
+    def TryRestartUnit(self, path, unit, mode):
+        return self._job(unit, unit in self.active)
+
+    def StartTransientUnit(self, path, unit, mode, properties, aux):
+        return self._job(unit, True)
+
+    def GetUnitFileState(self, path, unit):
+        return ("enabled" if unit in self.enabled else "disabled",)
+
+    def EnableUnitFiles(self, path, units, runtime, force):
+        self.enabled.update(units)
+        return (False, [("symlink", unit, unit) for unit in units])
+
+    def DisableUnitFiles(self, path, units, runtime):
+        self.enabled.difference_update(units)
+        return ([("unlink", unit, "") for unit in units],)
+
+    def Reload(self, path):
+        pass
+
+class Flashlightd(FakeService):
+    key = "flashlight"
+    name = "io.furios.Flashlightd"
+    INTERFACE = "io.furios.Flashlightd"
+
+    objects = {"/io/furios/Flashlightd": """
+    <node>
+      <interface name="io.furios.Flashlightd">
+        <method name="SetBrightness"><arg type="u" direction="in"/></method>
+        <property name="Brightness" type="u" access="read"/>
+        <property name="MaxBrightness" type="u" access="read"/>
+      </interface>
+    </node>
+    """}
+
+    def __init__(self, faults, config):
+        super().__init__(faults, config)
+        self.properties = {self.INTERFACE: {
+            "Brightness": GLib.Variant("u", 0),
+            "MaxBrightness": GLib.Variant("u", config.get("max_brightness", 255)),
+        }}
+
+    def SetBrightness(self, path, value):
+        self.set_property(self.INTERFACE, "Brightness", GLib.Variant("u", value))
+
+class Screenshot(FakeService):
+    """The shell's screenshot interface, writing a 1x1 PNG for every capture."""
+
+    key = "screenshot"
+    name = "org.gnome.Shell.Screenshot"
+
+    objects = {"/org/gnome/Shell/Screenshot": """
+    <node>
+      <interface name="org.gnome.Shell.Screenshot">
+        <method name="Screenshot">
+          <arg type="b" direction="in"/><arg type="b" direction="in"/><arg type="s" direction="in"/>
+          <arg type="b" direction="out"/><arg type="s" direction="out"/>
+        </method>
+        <method name="ScreenshotWindow">
+          <arg type="b" direction="in"/><arg type="b" direction="in"/><arg type="b" direction="in"/><arg type="s" direction="in"/>
+          <arg type="b" direction="out"/><arg type="s" direction="out"/>
+        </method>
+        <method name="ScreenshotArea">
+          <arg type="i" direction="in"/><arg type="i" direction="in"/><arg type="i" direction="in"/><arg type="i" direction="in"/>
+          <arg type="b" direction="in"/><arg type="s" direction="in"/>
+          <arg type="b" direction="out"/><arg type="s" direction="out"/>
+        </method>
+        <method name="SelectArea">
+          <arg type="i" direction="out"/><arg type="i" direction="out"/><arg type="i" direction="out"/><arg type="i" direction="out"/>
+        </method>
+      </interface>
+    </node>
+    """}
+
+    def _write(self, filename):
+        if not os.path.isabs(filename):
+            filename = os.path.join(os.path.expanduser("~"), "Pictures", filename)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(filename, 'wb') as f:
+            f.write(PNG_1X1)
+        return (True, filename)
+
+    def Screenshot(self, path, cursor, flash, filename):
+        return self._write(filename)
+
+    def ScreenshotWindow(self, path, frame, cursor, flash, filename):
+        return self._write(filename)
+
+    def ScreenshotArea(self, path, x, y, width, height, flash, filename):
+        return self._write(filename)
+
+    def SelectArea(self, path):
+        return tuple(self.config.get("select_area", (0, 0, 100, 100)))
+
+class Feedback(FakeService):
+    """feedbackd: every event ends after its timeout, or at once."""
+
+    key = "feedback"
+    name = "org.sigxcpu.Feedback"
+    INTERFACE = "org.sigxcpu.Feedback"
+
+    objects = {"/org/sigxcpu/Feedback": """
+    <node>
+      <interface name="org.sigxcpu.Feedback">
+        <method name="TriggerFeedback">
+          <arg type="s" direction="in"/><arg type="s" direction="in"/><arg type="a{sv}" direction="in"/><arg type="i" direction="in"/>
+          <arg type="u" direction="out"/>
+        </method>
+        <method name="EndFeedback"><arg type="u" direction="in"/></method>
+        <signal name="FeedbackEnded"><arg type="u"/><arg type="u"/></signal>
+        <property name="Profile" type="s" access="readwrite"/>
+      </interface>
+    </node>
+    """}
+
+    def __init__(self, faults, config):
+        super().__init__(faults, config)
+        self.next_id = 0
+        self.properties = {self.INTERFACE: {"Profile": GLib.Variant("s", "full")}}
+
+    def _ended(self, event_id, reason):
+        self.emit("/org/sigxcpu/Feedback", self.INTERFACE, "FeedbackEnded", GLib.Variant("(uu)", (event_id, reason)))
+        return GLib.SOURCE_REMOVE
+
+    def TriggerFeedback(self, path, app_id, event, hints, timeout):
+        self.next_id += 1
+        GLib.timeout_add(max(0, timeout) * 1000, self._ended, self.next_id, 0)
+        return (self.next_id,)
+
+    def EndFeedback(self, path, event_id):
+        self._ended(event_id, 1)
+
+class Notifications(FakeService):
+    key = "notifications"
+    name = "org.freedesktop.Notifications"
+
+    objects = {"/org/freedesktop/Notifications": """
+    <node>
+      <interface name="org.freedesktop.Notifications">
+        <method name="Notify">
+          <arg type="s" direction="in"/><arg type="u" direction="in"/><arg type="s" direction="in"/>
+          <arg type="s" direction="in"/><arg type="s" direction="in"/><arg type="as" direction="in"/>
+          <arg type="a{sv}" direction="in"/><arg type="i" direction="in"/>
+          <arg type="u" direction="out"/>
+        </method>
+        <method name="CloseNotification"><arg type="u" direction="in"/></method>
+        <method name="GetCapabilities"><arg type="as" direction="out"/></method>
+        <method name="GetServerInformation">
+          <arg type="s" direction="out"/><arg type="s" direction="out"/><arg type="s" direction="out"/><arg type="s" direction="out"/>
+        </method>
+        <signal name="NotificationClosed"><arg type="u"/><arg type="u"/></signal>
+      </interface>
+    </node>
+    """}
+
+    def __init__(self, faults, config):
+        super().__init__(faults, config)
+        self.next_id = 0
+
+    def Notify(self, path, app_name, replaces_id, icon, summary, body, actions, hints, timeout):
+        if replaces_id:
+            return (replaces_id,)
+        self.next_id += 1
+        return (self.next_id,)
+
+    def CloseNotification(self, path, notification_id):
+        self.emit("/org/freedesktop/Notifications", "org.freedesktop.Notifications", "NotificationClosed",
+                  GLib.Variant("(uu)", (notification_id, 3)))
+
+    def GetCapabilities(self, path):
+        return (["body", "body-markup", "persistence"],)
+
+    def GetServerInformation(self, path):
+        return ("fakebus", "tweak-flx1s", "1.0", "1.2")
+
+FAKES = {fake.key: fake for fake in (Login1, Systemd, Flashlightd, Screenshot, Feedback, Notifications)}
+
+class Control(FakeService):
+    """Lets the fixture change faults and the lock state while the fakes run."""
+
+    key = "control"
+    name = CONTROL_NAME
+    objects = {CONTROL_PATH: CONTROL_XML}
+
+    def __init__(self, faults, config, fakes):
+        super().__init__(faults, config)
+        self.fakes = fakes
+
+    def _on_method_call(self, connection, sender, path, interface, method, params, invocation):
+        # Control calls are neither delayed nor recorded.
+        result = getattr(self, method)(path, *params.unpack())
+        out_sig = "".join(arg.signature for arg in invocation.get_method_info().out_args)
+        invocation.return_value(GLib.Variant(f"({out_sig})", result or ()))
+
+    def SetLatency(self, path, key, ms):
+        self.faults.latency_ms[key] = ms
+
+    def SetFailure(self, path, key, error):
+        if error:
+            self.faults.failures[key] = error
+        else:
+            self.faults.failures.pop(key, None)
+
+    def SetLocked(self, path, locked):
+        if "login1" in self.fakes:
+            self.fakes["login1"].set_locked(locked)
+
+    def Calls(self, path):
+        return (list(self.faults.calls),)
+
+    def Reset(self, path):
+        self.faults.latency_ms.clear()
+        self.faults.failures.clear()
+        self.faults.calls.clear()
+
+def _own(connection, name):
+    result = connection.call_sync(
+        "org.freedesktop.DBus", "/org/freedesktop/DBus", "org.freedesktop.DBus", "RequestName",
+        GLib.Variant("(su)", (name, 4)), GLib.VariantType("(u)"), Gio.DBusCallFlags.NONE, -1, None
+    ).unpack()[0]
+    # 1: primary owner, 4: already the owner.
+    if result not in (1, 4):
+        raise RuntimeError(f"Could not own {name}")
+
+def main():
+    config = json.loads(sys.argv[1]) if len(sys.argv) > 1 else {}
+    faults = Faults(config.get("latency_ms"), config.get("failures"))
+    connections = {
+        "session": Gio.DBusConnection.new_for_address_sync(
+            os.environ["DBUS_SESSION_BUS_ADDRESS"],
+            Gio.DBusConnectionFlags.AUTHENTICATION_CLIENT | Gio.DBusConnectionFlags.MESSAGE_BUS_CONNECTION, None, None),
+        "system": Gio.DBusConnection.new_for_address_sync(
+            os.environ["DBUS_SYSTEM_BUS_ADDRESS"],
+            Gio.DBusConnectionFlags.AUTHENTICATION_CLIENT | Gio.DBusConnectionFlags.MESSAGE_BUS_CONNECTION, None, None),
+    }
+
+    fakes = {}
+    for key in config.get("services") or list(FAKES):
+        fake = FAKES[key](faults, config)
+        fake.export(connections[fake.bus])
+        _own(connections[fake.bus], fake.name)
+        fakes[key] = fake
+
+    control = Control(faults, config, fakes)
+    control.export(connections["session"])
+    _own(connections["session"], CONTROL_NAME)
+
+    loop = GLib.MainLoop()
+    GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGTERM, loop.quit)
+    GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGINT, loop.quit)
+    print("READY", flush=True)
+    loop.run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Press and gesture latency, from the trigger to the configured command running.
+
+Runs on any Linux box: loginctl, pgrep, wtype and wofi are replaced by stubs
+on PATH with fixed delays, HOME and XDG_RUNTIME_DIR point into a temporary
+directory, and the configured action is a stub that records when it ran.
+
+    PYTHONPATH=src python3 benchmarks/press_latency.py --runs 30 --json results.json
+    PYTHONPATH=src python3 benchmarks/press_latency.py --compare results.json
+
+Cold runs start a new interpreter per press (as scripts/short-press and lisgd
+do), warm runs call ButtonManager.handle_press and GesturesManager.handle_gesture
+in-process. "returned" is when the call returned, "executed" when the action
+command started; with --wofi-running a press only confirms the menu, so
+only "returned" is reported for presses. --compare exits with status 1 if any p95 got slower than
+the baseline by more than --tolerance.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+
+STUBS = {
+    "loginctl": """
+case "$1" in
+    list-sessions) echo "1 $(id -u) $(id -un) seat0 tty7" ;;
+    show-session)
+        case "$*" in
+            *LockedHint*) echo "LockedHint={locked}" ;;
+            *) printf 'Type=wayland\\nState=active\\n' ;;
+        esac ;;
+esac
+""",
+    "pgrep": """
+exit {wofi_running}
+""",
+    "wtype": """
+exit 0
+""",
+    "wofi": """
+head -n 1
+""",
+    "mark": """
+date +%s%N >> "$TFX_BENCH_MARKS"
+""",
+}
+
+def write_stubs(bin_dir, delays, locked, wofi_running):
+    os.makedirs(bin_dir, exist_ok=True)
+    for name, body in STUBS.items():
+        delay = delays.get(name, 0)
+        sleep = f"sleep {delay / 1000:.3f}\n" if delay else ""
+        script = "#!/bin/sh\n" + sleep + body.format(
+            locked="yes" if locked else "no", wofi_running=0 if wofi_running else 1
+        ).lstrip("\n")
+        path = os.path.join(bin_dir, name)
+        with open(path, "w") as f:
+            f.write(script)
+        os.chmod(path, 0o755)
+
+def write_configs(home, bin_dir):
+    config_dir = os.path.join(home, ".config", "tweak-flx1s")
+    os.makedirs(config_dir, exist_ok=True)
+    action = {"type": "command", "value": os.path.join(bin_dir, "mark")}
+    empty = {"type": "command", "value": ""}
+    buttons = {
+        "short_press": {"use_custom_file": False, "locked": action, "unlocked": action},
+        "double_press": {"use_custom_file": False, "locked": empty, "unlocked": empty},
+        "long_press": {"use_custom_file": False, "locked": action, "unlocked": action},
+    }
+    gestures = {"enabled": True, "gestures": [
+        {"name": "Benchmark", "spec": "1,RL,B,*,R", "locked": action, "unlocked": action}
+    ]}
+    with open(os.path.join(config_dir, "buttons.json"), "w") as f:
+        json.dump(buttons, f)
+    with open(os.path.join(config_dir, "gestures.json"), "w") as f:
+        json.dump(gestures, f)
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    def rank(p):
+        return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))]
+    return {
+        "n": len(ordered),
+        "min": ordered[0],
+        "p50": rank(50),
+        "p95": rank(95),
+        "p99": rank(99),
+        "max": ordered[-1],
+        "mean": sum(ordered) / len(ordered),
+    }
+
+class Marks:
+    """Reads the timestamps the mark stub appends when the action runs."""
+
+    def __init__(self, path):
+        self.path = path
+        self.seen = 0
+        open(path, "w").close()
+
+    def wait_next(self, timeout=10):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with open(self.path) as f:
+                lines = f.read().split()
+            if len(lines) > self.seen:
+                self.seen = len(lines)
+                return int(lines[-1])
+            time.sleep(0.0005)
+        raise TimeoutError("Action did not run")
+
+def bench_cold(name, argv, runs, env, marks, results, executes=True):
+    """executes=False for presses that run no action, such as confirming an open wofi menu."""
+    returned, executed = [], []
+    for _ in range(runs):
+        start = time.time_ns()
+        subprocess.run([sys.executable, "-m", "tweak_flx1s.main"] + argv, env=env,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        returned.append((time.time_ns() - start) / 1e6)
+        if executes:
+            executed.append((marks.wait_next() - start) / 1e6)
+    results[f"cold/{name}/returned"] = percentiles(returned)
+    if executes:
+        results[f"cold/{name}/executed"] = percentiles(executed)
+
+def bench_warm(name, call, runs, marks, results, executes=True):
+    returned, executed = [], []
+    for _ in range(runs):
+        start = time.time_ns()
+        call()
+        returned.append((time.time_ns() - start) / 1e6)
+        if executes:
+            executed.append((marks.wait_next() - start) / 1e6)
+    results[f"warm/{name}/returned"] = percentiles(returned)
+    if executes:
+        results[f"warm/{name}/executed"] = percentiles(executed)
+
+def bench_stage(name, call, runs, results):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - start) * 1000)
+    results[f"stage/{name}"] = percentiles(samples)
+
+def bench_import(runs, env, results):
+    code = "import time; t = time.perf_counter(); import tweak_flx1s.actions.buttons; print(time.perf_counter() - t)"
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+        samples.append(float(out.stdout.strip()) * 1000)
+    results["stage/import"] = percentiles(samples)
+
+def parse_delays(values):
+    delays = {}
+    for value in values or []:
+        name, _, ms = value.partition("=")
+        delays[name] = float(ms)
+    return delays
+
+def compare(results, baseline_path, tolerance):
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    regressions = []
+    for name, stats in results.items():
+        if name in baseline and stats["p95"] > baseline[name]["p95"] * tolerance:
+            regressions.append(f"{name}: p95 {stats['p95']:.2f} ms, baseline {baseline[name]['p95']:.2f} ms")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--delay", action="append", metavar="STUB=MS",
+                        help="Delay for a stub, e.g. --delay loginctl=15 (repeatable)")
+    parser.add_argument("--locked", action="store_true", help="Report the session as locked")
+    parser.add_argument("--wofi-running", action="store_true", help="Report wofi as running")
+    parser.add_argument("--skip-cold", action="store_true")
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.25)
+    args = parser.parse_args()
+
+    delays = parse_delays(args.delay)
+    root = tempfile.mkdtemp(prefix="tweak-flx1s-bench-")
+    bin_dir = os.path.join(root, "bin")
+    home = os.path.join(root, "home")
+    runtime = os.path.join(root, "run")
+    os.makedirs(runtime, mode=0o700)
+    write_stubs(bin_dir, delays, args.locked, args.wofi_running)
+    write_configs(home, bin_dir)
+
+    src = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+    os.environ.update({
+        "HOME": home,
+        "XDG_RUNTIME_DIR": runtime,
+        "PATH": bin_dir + os.pathsep + os.environ.get("PATH", ""),
+        "PYTHONPATH": os.path.abspath(src) + os.pathsep + os.environ.get("PYTHONPATH", ""),
+        "TFX_BENCH_MARKS": os.path.join(root, "marks"),
+        # Keep is_locked() on the loginctl stub instead of the real logind.
+        "DBUS_SYSTEM_BUS_ADDRESS": "unix:path=" + os.path.join(root, "no-bus"),
+    })
+    sys.path.insert(0, os.path.abspath(src))
+    env = dict(os.environ)
+    marks = Marks(env["TFX_BENCH_MARKS"])
+    results = {}
+
+    try:
+        if not args.skip_cold:
+            bench_import(args.runs, env, results)
+            # With wofi open a short press only sends Return to it, so there is no action to wait for.
+            bench_cold("short-press", ["--short-press"], args.runs, env, marks, results,
+                       executes=not args.wofi_running)
+            bench_cold("trigger-gesture", ["--trigger-gesture", "0"], args.runs, env, marks, results)
+
+        from loguru import logger
+        logger.remove()
+        from tweak_flx1s.actions.buttons import ButtonManager
+        from tweak_flx1s.actions.gestures import GesturesManager
+        from tweak_flx1s.actions.executor import is_locked, is_wofi_running, execute_command
+
+        bench_stage("config-load", ButtonManager, args.runs, results)
+        bench_stage("is_locked", is_locked, args.runs, results)
+        bench_stage("is_wofi_running", is_wofi_running, args.runs, results)
+        bench_stage("execute_command", lambda: (execute_command(os.path.join(bin_dir, "mark")), marks.wait_next()),
+                    args.runs, results)
+
+        bench_warm("handle_press", lambda: ButtonManager().handle_press("short_press"), args.runs, marks, results,
+                   executes=not args.wofi_running)
+        manager = ButtonManager()
+        bench_warm("handle_press-reused", lambda: manager.handle_press("short_press"), args.runs, marks, results,
+                   executes=not args.wofi_running)
+        bench_warm("handle_gesture", lambda: GesturesManager().handle_gesture(0), args.runs, marks, results)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print(f"{'benchmark':40} {'p50':>9} {'p95':>9} {'p99':>9}   (ms, {args.runs} runs)")
+    for name, stats in results.items():
+        print(f"{name:40} {stats['p50']:9.2f} {stats['p95']:9.2f} {stats['p99']:9.2f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "meta": {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "runs": args.runs,
+                    "delays_ms": delays,
+                    "locked": args.locked,
+                    "wofi_running": args.wofi_running,
+                },
+                "results": results,
+            }, f, indent=2)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import glob
+import ctypes
+import ctypes.util
+import gi
+gi.require_version('Gio', '2.0')
+from gi.repository import Gio, GLib
+from loguru import logger
+
+class MprisController:
+    """Controls media players over org.mpris.MediaPlayer2."""
+    MPRIS_PREFIX = "org.mpris.MediaPlayer2."
+    METHODS = ["PlayPause", "Next", "Previous", "Play", "Pause", "Stop"]
+
+    def __init__(self):
+        self.bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+        self.proxies = {}
+
+    def _list_players(self):
+        names = self.bus.call_sync(
+            "org.freedesktop.DBus", "/org/freedesktop/DBus", "org.freedesktop.DBus",
+            "ListNames", None, GLib.VariantType("(as)"), Gio.DBusCallFlags.NONE, 500, None
+        ).unpack()[0]
+        return [n for n in names if n.startswith(self.MPRIS_PREFIX)]
+
+    def _get_proxy(self, name):
+        proxy = self.proxies.get(name)
+        if proxy is None or proxy.get_name_owner() is None:
+            proxy = Gio.DBusProxy.new_sync(
+                self.bus, Gio.DBusProxyFlags.NONE, None,
+                name, "/org/mpris/MediaPlayer2", "org.mpris.MediaPlayer2.Player", None
+            )
+            self.proxies[name] = proxy
+        return proxy
+
+    def _pick_player(self):
+        """Prefers a playing player, then a paused one, then any."""
+        best = None
+        best_rank = -1
+        ranks = {"Playing": 2, "Paused": 1}
+        for name in self._list_players():
+            try:
+                proxy = self._get_proxy(name)
+            except GLib.Error as e:
+                logger.debug(f"Skipping player {name}: {e}")
+                continue
+            status = proxy.get_cached_property("PlaybackStatus")
+            rank = ranks.get(status.unpack() if status else None, 0)
+            if rank > best_rank:
+                best, best_rank = proxy, rank
+        return best
+
+    def call(self, method):
+        if method not in self.METHODS:
+            logger.error(f"Unsupported MPRIS method: {method}")
+            return False
+        proxy = self._pick_player()
+        if not proxy:
+            logger.info("No MPRIS player found.")
+            return False
+        logger.info(f"MPRIS {method} -> {proxy.get_name()}")
+        proxy.call_sync(method, None, Gio.DBusCallFlags.NONE, 1000, None)
+        return True
+
+class _PaSampleSpec(ctypes.Structure):
+    _fields_ = [("format", ctypes.c_int), ("rate", ctypes.c_uint32), ("channels", ctypes.c_uint8)]
+
+class _PaChannelMap(ctypes.Structure):
+    _fields_ = [("channels", ctypes.c_uint8), ("map", ctypes.c_int * 32)]
+
+class _PaCVolume(ctypes.Structure):
+    _fields_ = [("channels", ctypes.c_uint8), ("values", ctypes.c_uint32 * 32)]
+
+class _PaSinkInfo(ctypes.Structure):
+    """Leading part of pa_sink_info, only accessed through pointers."""
+    _fields_ = [
+        ("name", ctypes.c_char_p),
+        ("index", ctypes.c_uint32),
+        ("description", ctypes.c_char_p),
+        ("sample_spec", _PaSampleSpec),
+        ("channel_map", _PaChannelMap),
+        ("owner_module", ctypes.c_uint32),
+        ("volume", _PaCVolume),
+        ("mute", ctypes.c_int),
+    ]
+
+_SINK_INFO_CB = ctypes.CFUNCTYPE(None, ctypes.c_void_p, ctypes.POINTER(_PaSinkInfo), ctypes.c_int, ctypes.c_void_p)
+_SUCCESS_CB = ctypes.CFUNCTYPE(None, ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p)
+
+class VolumeController:
+    """
+    Changes the default sink volume through libpulse (PulseAudio or pipewire-pulse).
+    The context is kept connected for the lifetime of the process.
+    """
+    VOLUME_NORM = 0x10000
+    STEP = VOLUME_NORM * 5 // 100
+    SINK = b"@DEFAULT_SINK@"
+
+    CONTEXT_READY = 4
+    CONTEXT_FAILED = 5
+    CONTEXT_TERMINATED = 6
+    OPERATION_RUNNING = 0
+
+    def __init__(self):
+        path = ctypes.util.find_library("pulse")
+        if not path:
+            raise OSError("libpulse not found")
+        self.pa = ctypes.CDLL(path)
+        self._setup_prototypes()
+        self.mainloop = None
+        self.context = None
+
+    def _setup_prototypes(self):
+        pa = self.pa
+        pa.pa_mainloop_new.restype = ctypes.c_void_p
+        pa.pa_mainloop_get_api.restype = ctypes.c_void_p
+        pa.pa_mainloop_get_api.argtypes = [ctypes.c_void_p]
+        pa.pa_mainloop_iterate.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p]
+        pa.pa_context_new.restype = ctypes.c_void_p
+        pa.pa_context_new.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+        pa.pa_context_connect.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int, ctypes.c_void_p]
+        pa.pa_context_get_state.argtypes = [ctypes.c_void_p]
+        pa.pa_context_unref.argtypes = [ctypes.c_void_p]
+        pa.pa_context_get_sink_info_by_name.restype = ctypes.c_void_p
+        pa.pa_context_get_sink_info_by_name.argtypes = [ctypes.c_void_p, ctypes.c_char_p, _SINK_INFO_CB, ctypes.c_void_p]
+        pa.pa_context_set_sink_volume_by_name.restype = ctypes.c_void_p
+        pa.pa_context_set_sink_volume_by_name.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.POINTER(_PaCVolume), _SUCCESS_CB, ctypes.c_void_p]
+        pa.pa_context_set_sink_mute_by_name.restype = ctypes.c_void_p
+        pa.pa_context_set_sink_mute_by_name.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int, _SUCCESS_CB, ctypes.c_void_p]
+        pa.pa_operation_get_state.argtypes = [ctypes.c_void_p]
+        pa.pa_operation_unref.argtypes = [ctypes.c_void_p]
+
+    def _connect(self):
+        if self.context and self.pa.pa_context_get_state(self.context) == self.CONTEXT_READY:
+            return
+
+        if self.context:
+            self.pa.pa_context_unref(self.context)
+        if not self.mainloop:
+            self.mainloop = self.pa.pa_mainloop_new()
+
+        api = self.pa.pa_mainloop_get_api(self.mainloop)
+        self.context = self.pa.pa_context_new(api, b"tweak-flx1s")
+        if self.pa.pa_context_connect(self.context, None, 0, None) < 0:
+            raise OSError("Failed to connect to the sound server")
+
+        while True:
+            state = self.pa.pa_context_get_state(self.context)
+            if state == self.CONTEXT_READY:
+                return
+            if state in (self.CONTEXT_FAILED, self.CONTEXT_TERMINATED):
+                raise OSError("Sound server connection failed")
+            self.pa.pa_mainloop_iterate(self.mainloop, 1, None)
+
+    def _wait(self, operation):
+        if not operation:
+            raise OSError("Sound server rejected the request")
+        while self.pa.pa_operation_get_state(operation) == self.OPERATION_RUNNING:
+            self.pa.pa_mainloop_iterate(self.mainloop, 1, None)
+        self.pa.pa_operation_unref(operation)
+
+    def _get_sink(self):
+        result = {}
+
+        def on_info(ctx, info, eol, userdata):
+            if eol or not info:
+                return
+            result["volume"] = _PaCVolume.from_buffer_copy(info.contents.volume)
+            result["mute"] = bool(info.contents.mute)
+
+        cb = _SINK_INFO_CB(on_info)
+        self._wait(self.pa.pa_context_get_sink_info_by_name(self.context, self.SINK, cb, None))
+        if "volume" not in result:
+            raise OSError("Default sink not found")
+        return result
+
+    def _set_volume(self, cvolume):
+        cb = _SUCCESS_CB(lambda ctx, success, userdata: None)
+        self._wait(self.pa.pa_context_set_sink_volume_by_name(self.context, self.SINK, ctypes.byref(cvolume), cb, None))
+
+    def _set_mute(self, mute):
+        cb = _SUCCESS_CB(lambda ctx, success, userdata: None)
+        self._wait(self.pa.pa_context_set_sink_mute_by_name(self.context, self.SINK, int(mute), cb, None))
+
+    def change(self, action):
+        self._connect()
+        sink = self._get_sink()
+        cvolume = sink["volume"]
+
+        if action == "mute":
+            self._set_mute(not sink["mute"])
+            logger.info(f"Volume mute: {not sink['mute']}")
+            return True
+
+        if action not in ("up", "down"):
+            logger.error(f"Unsupported volume action: {action}")
+            return False
+
+        for i in range(cvolume.channels):
+            if action == "up":
+                cvolume.values[i] = min(cvolume.values[i] + self.STEP, self.VOLUME_NORM)
+            else:
+                cvolume.values[i] = max(cvolume.values[i] - self.STEP, 0)
+
+        self._set_volume(cvolume)
+        if action == "up" and sink["mute"]:
+            self._set_mute(False)
+        logger.info(f"Volume {action}: {cvolume.values[0] * 100 // self.VOLUME_NORM}%")
+        return True
+
+class BrightnessController:
+    """Changes display brightness through logind's Session.SetBrightness."""
+    STEPS = 10
+
+    def __init__(self):
+        self.subsystem, self.name, self.path = self._find_device()
+        self.max_brightness = self._read_int("max_brightness")
+        self.proxy = Gio.DBusProxy.new_for_bus_sync(
+            Gio.BusType.SYSTEM, Gio.DBusProxyFlags.DO_NOT_LOAD_PROPERTIES, None,
+            "org.freedesktop.login1", "/org/freedesktop/login1/session/auto",
+            "org.freedesktop.login1.Session", None
+        )
+
+    @staticmethod
+    def _find_device():
+        candidates = sorted(glob.glob("/sys/class/backlight/*"))
+        if candidates:
+            path = candidates[0]
+            return "backlight", os.path.basename(path), path
+        path = "/sys/class/leds/lcd-backlight"
+        if os.path.exists(path):
+            return "leds", "lcd-backlight", path
+        raise OSError("No backlight device found")
+
+    def _read_int(self, attr):
+        with open(os.path.join(self.path, attr), "r") as f:
+            return int(f.read().strip())
+
+    def change(self, action):
+        if action not in ("up", "down"):
+            logger.error(f"Unsupported brightness action: {action}")
+            return False
+
+        step = max(1, self.max_brightness // self.STEPS)
+        current = self._read_int("brightness")
+        if action == "up":
+            target = min(current + step, self.max_brightness)
+        else:
+            target = max(current - step, 1)
+
+        self.proxy.call_sync(
+            "SetBrightness", GLib.Variant("(ssu)", (self.subsystem, self.name, target)),
+            Gio.DBusCallFlags.NONE, 1000, None
+        )
+        logger.info(f"Brightness {action}: {current} -> {target}")
+        return True
+
+_controllers = {}
+
+def _get_controller(key, factory):
+    controller = _controllers.get(key)
+    if controller is None:
+        controller = factory()
+        _controllers[key] = controller
+    return controller
+
+# Shell equivalents used if the in-process path is unavailable.
+FALLBACK_COMMANDS = {
+    ("mpris", "PlayPause"): "wtype -k XF86AudioPlay",
+    ("mpris", "Next"): "wtype -k XF86AudioNext",
+    ("mpris", "Previous"): "wtype -k XF86AudioPrev",
+    ("volume", "up"): "wtype -k XF86AudioRaiseVolume",
+    ("volume", "down"): "wtype -k XF86AudioLowerVolume",
+    ("volume", "mute"): "wtype -k XF86AudioMute",
+}
+
+def run_builtin(action_type, value):
+    """Runs an in-process action. Controllers and their proxies are cached per process."""
+    try:
+        if action_type == "mpris":
+            return _get_controller("mpris", MprisController).call(value)
+        if action_type == "volume":
+            return _get_controller("volume", VolumeController).change(value)
+        if action_type == "brightness":
+            return _get_controller("brightness", BrightnessController).change(value)
+        if action_type == "flashlight":
+            from tweak_flx1s.actions.shortcuts import ShortcutsManager
+            _get_controller("flashlight", ShortcutsManager).toggle_flashlight()
+            return True
+        logger.error(f"Unknown built-in action: {action_type}")
+        return False
+    except Exception as e:
+        logger.error(f"Built-in action {action_type}:{value} failed: {e}")
+        fallback = FALLBACK_COMMANDS.get((action_type, value))
+        if fallback:
+            from tweak_flx1s.actions.executor import execute_command
+            execute_command(fallback)
+        return False
@@ -15,10 +15,11 @@
 
 import os
 import json
+import fcntl
 from loguru import logger
-from tweak_flx1s.utils import run_command
-from tweak_flx1s.const import CONFIG_DIR, HOME_DIR
-from tweak_flx1s.actions.executor import is_locked, is_wofi_running, execute_command, show_wofi_menu
+from tweak_flx1s.const import CONFIG_DIR, HOME_DIR, BUTTONS_LOCK
+from tweak_flx1s.actions.executor import is_locked, is_wofi_running, run_action, migrate_action
+from tweak_flx1s.core.trace import traced
 
 CONFIG_FILE = os.path.join(CONFIG_DIR, "buttons.json")
 ASSISTANT_BUTTON_DIR = os.path.join(HOME_DIR, ".config", "assistant-button")
@@ -29,22 +30,32 @@ except NameError:
     def _(s): return s
 
 PREDEFINED_ACTIONS = {
-    _("Copy (Ctrl+C)"): "wtype -M ctrl c -m ctrl",
-    _("Paste (Ctrl+V)"): "wtype -M ctrl v -m ctrl",
-    _("Cut (Ctrl+X)"): "wtype -M ctrl x -m ctrl",
-    _("Select All and Copy"): "wtype -M ctrl a -m ctrl && wtype -M ctrl c -m ctrl",
     _("Paste from Clipboard"): "tweak-flx1s --action paste",
-    _("Kill Active Window"): "wtype -M alt -P F4 -m alt -p F4",
-    _("Switch Window on the left"): "wtype -M alt -P tab -m alt -p tab",
-    _("Switch Window on the right"): "wtype -M alt -M shift -P tab -m alt -m shift -p tab",
     _("Screenshot"): "tweak-flx1s --action screenshot",
-    _("Flashlight"): "tweak-flx1s --action flashlight",
-    _("Play/Pause"): "wtype -k XF86AudioPlay",
-    _("Next Track"): "wtype -k XF86AudioNext",
-    _("Previous Track"): "wtype -k XF86AudioPrev",
-    _("Volume Up"): "wtype -k XF86AudioRaiseVolume",
-    _("Volume Down"): "wtype -k XF86AudioLowerVolume",
-    _("Mute"): "wtype -k XF86AudioMute"
+    _("Screenshot to Clipboard"): "tweak-flx1s --action screenshot --target clipboard",
+    _("Screenshot of Area"): "tweak-flx1s --action screenshot --area select",
+    _("Screenshot of Window"): "tweak-flx1s --action screenshot --window",
+    _("Take Picture"): "tweak-flx1s --action picture"
+}
+
+BUILTIN_ACTIONS = {
+    _("Clipboard History"): {"type": "clipboard", "value": "history"},
+    _("Copy (Ctrl+C)"): {"type": "keys", "value": "ctrl+c"},
+    _("Paste (Ctrl+V)"): {"type": "keys", "value": "ctrl+v"},
+    _("Cut (Ctrl+X)"): {"type": "keys", "value": "ctrl+x"},
+    _("Select All and Copy"): {"type": "keys", "value": "ctrl+a ctrl+c"},
+    _("Kill Active Window"): {"type": "keys", "value": "alt+F4"},
+    _("Switch Window on the left"): {"type": "keys", "value": "alt+Tab"},
+    _("Switch Window on the right"): {"type": "keys", "value": "alt+shift+Tab"},
+    _("Flashlight"): {"type": "flashlight", "value": "toggle"},
+    _("Play/Pause"): {"type": "mpris", "value": "PlayPause"},
+    _("Next Track"): {"type": "mpris", "value": "Next"},
+    _("Previous Track"): {"type": "mpris", "value": "Previous"},
+    _("Volume Up"): {"type": "volume", "value": "up"},
+    _("Volume Down"): {"type": "volume", "value": "down"},
+    _("Mute"): {"type": "volume", "value": "mute"},
+    _("Brightness Up"): {"type": "brightness", "value": "up"},
+    _("Brightness Down"): {"type": "brightness", "value": "down"}
 }
 
 if _.__name__ == "_":
@@ -53,11 +64,11 @@ if _.__name__ == "_":
 DEFAULT_CONFIG = {
     "short_press": {
         "use_custom_file": False,
-        "locked": {"type": "command", "value": "tweak-flx1s --action flashlight"},
+        "locked": {"type": "flashlight", "value": "toggle"},
         "unlocked": {"type": "wofi", "items": [
-            {"label": "Flashlight", "cmd": "tweak-flx1s --action flashlight"},
+            {"label": "Flashlight", "type": "flashlight", "value": "toggle"},
             {"label": "Screenshot", "cmd": "tweak-flx1s --action screenshot"},
-            {"label": "Kill Active Window", "cmd": "tweak-flx1s --action kill-window"}
+            {"label": "Kill Active Window", "type": "keys", "value": "alt+F4"}
         ]}
     },
     "double_press": {
@@ -72,11 +83,57 @@ DEFAULT_CONFIG = {
     }
 }
 
+# In-process press classification (tweak-flx1s --monitor buttons).
+# key_code 583 is KEY_ASSISTANT; device is found by capability when empty.
+ENGINE_DEFAULTS = {
+    "device": "",
+    "key_code": 583,
+    "long_press_ms": 600,
+    "double_press_ms": 300,
+    # Grabbing takes the whole event node, so it is only done when the node
+    # sends no other key (see ButtonEngine.start).
+    "grab": False
+}
+
+def engine_running():
+    """
+    True while the press engine holds BUTTONS_LOCK. The assistant-button
+    scripts still call tweak-flx1s --short-press etc. then, and those
+    presses have already been handled in-process.
+    """
+    try:
+        fd = os.open(BUTTONS_LOCK, os.O_RDONLY | os.O_CLOEXEC)
+    except FileNotFoundError:
+        return False
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+        return False
+    except BlockingIOError:
+        return True
+    finally:
+        os.close(fd)
+
+def get_predefined_actions():
+    """Returns all predefined actions as name -> action config."""
+    actions = {name: {"type": "command", "value": cmd} for name, cmd in PREDEFINED_ACTIONS.items()}
+    actions.update(BUILTIN_ACTIONS)
+    return actions
+
+def find_predefined_name(action_config):
+    """Returns the predefined action name matching a config, or None."""
+    atype = action_config.get("type", "command")
+    val = action_config.get("value", action_config.get("cmd", ""))
+    for name, conf in get_predefined_actions().items():
+        if conf["type"] == atype and conf["value"] == val:
+            return name
+    return None
+
 class ButtonManager:
     """Manages button presses and configuration."""
     def __init__(self):
         self.config = self._load_config()
 
+    @traced("config.buttons")
     def _load_config(self):
         """Loads configuration from JSON file."""
         if not os.path.exists(CONFIG_FILE):
@@ -84,11 +141,29 @@ class ButtonManager:
         try:
             with open(CONFIG_FILE, 'r') as f:
                 conf = json.load(f)
-                return conf
         except Exception as e:
             logger.error(f"Failed to load button config: {e}")
             return DEFAULT_CONFIG
 
+        if self._migrate(conf):
+            logger.info("Migrated button actions to built-in types.")
+            try:
+                with open(CONFIG_FILE, 'w') as f:
+                    json.dump(conf, f, indent=4)
+            except Exception as e:
+                logger.error(f"Failed to save migrated button config: {e}")
+        return conf
+
+    @staticmethod
+    def _migrate(conf):
+        """Converts shell strings with an in-process equivalent."""
+        changed = False
+        for ptype in ["short_press", "double_press", "long_press"]:
+            for state in ["locked", "unlocked"]:
+                action = conf.get(ptype, {}).get(state)
+                changed = migrate_action(action) or changed
+        return changed
+
     def save_config(self, new_config=None):
         """Saves configuration to JSON file."""
         if new_config:
@@ -119,19 +194,38 @@ class ButtonManager:
                 except Exception as e:
                     logger.error(f"Failed to write {path}: {e}")
 
-    def handle_press(self, press_type):
+    def engine_config(self):
+        """Returns the press engine settings with defaults filled in."""
+        config = dict(ENGINE_DEFAULTS)
+        config.update(self.config.get("engine", {}))
+        return config
+
+    def has_action(self, press_type, locked):
+        """True if press_type does something in the given lock state."""
+        action = self.config.get(press_type, {}).get("locked" if locked else "unlocked")
+        if not action:
+            return False
+        if action.get("type") == "wofi":
+            return bool(action.get("items"))
+        return bool(action.get("value", action.get("cmd")))
+
+    @traced("press")
+    def handle_press(self, press_type, locked=None):
         """
         Handle a button press event.
         press_type: 'short_press', 'double_press', 'long_press'
+        locked: the lock state if the caller already knows it.
         """
         logger.info(f"Handling button press: {press_type}")
 
         if press_type == "short_press" and is_wofi_running():
             logger.info("Wofi is running, simulating Enter key.")
-            run_command("wtype -k Return", check=False)
+            from tweak_flx1s.actions.keys import send_keys
+            send_keys("Return")
             return
 
-        locked = is_locked()
+        if locked is None:
+            locked = is_locked()
         state_key = "locked" if locked else "unlocked"
         logger.info(f"System locked: {locked}")
 
@@ -140,12 +234,4 @@ class ButtonManager:
             logger.warning(f"No action configured for {press_type} in {state_key} state.")
             return
 
-        action_type = action_config.get("type")
-
-        if action_type == "command":
-            cmd = action_config.get("value")
-            execute_command(cmd)
-
-        elif action_type == "wofi":
-            items = action_config.get("items", [])
-            show_wofi_menu(items)
+        run_action(action_config, label=f"{press_type}/{state_key}")
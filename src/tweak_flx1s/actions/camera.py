@@ -0,0 +1,274 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import json
+import time
+import queue
+import datetime
+import threading
+from loguru import logger
+from tweak_flx1s.const import CONFIG_DIR, HOME_DIR
+
+CONFIG_FILE = os.path.join(CONFIG_DIR, "camera.json")
+
+DEFAULT_CONFIG = {
+    "source": "droidcamsrc camera-device=0 mode=2",
+    "flip": 8,
+    "keep_warm_seconds": 30,
+    "warmup_frames": 3,
+    "quality": 92
+}
+
+# Overrides the configured source, e.g. "videotestsrc" for testing without a camera.
+SOURCE_ENV = "TWEAK_FLX1S_CAMERA_SOURCE"
+
+class CameraError(Exception):
+    """Raised when the pipeline cannot start or deliver a frame."""
+
+def load_config():
+    config = dict(DEFAULT_CONFIG)
+    if os.path.exists(CONFIG_FILE):
+        try:
+            with open(CONFIG_FILE, 'r') as f:
+                config.update(json.load(f))
+        except Exception as e:
+            logger.error(f"Failed to load camera config: {e}")
+    if os.environ.get(SOURCE_ENV):
+        config["source"] = os.environ[SOURCE_ENV]
+    return config
+
+class PhotoJob:
+    def __init__(self, sample, path, requested):
+        self.sample = sample
+        self.path = path
+        self.requested = requested
+
+class CameraPipeline:
+    """
+    Keeps a GStreamer capture pipeline running between shots.
+    The first shot starts the camera; it then stays prerolled for
+    keep_warm_seconds after the last shot. While idle a valve drops the
+    frames right after the source, so only the camera keeps streaming and
+    nothing is converted. Frames are pulled raw from an appsink, JPEG
+    encoding and the file write happen on a worker thread.
+    """
+
+    def __init__(self, config=None, keep_warm=None):
+        self.config = config or load_config()
+        self.keep_warm = self.config["keep_warm_seconds"] if keep_warm is None else keep_warm
+        self.pipeline = None
+        self.sink = None
+        self.gate = None
+        self.lock = threading.RLock()
+        self.idle_timer = None
+        self.jobs = queue.Queue()
+        self.worker = None
+        # Guards starting the worker against it exiting on an empty queue.
+        self.worker_lock = threading.Lock()
+        self.latencies = []
+
+    def _gst(self):
+        import gi
+        gi.require_version('Gst', '1.0')
+        from gi.repository import Gst
+        if not Gst.is_initialized():
+            Gst.init(None)
+        return Gst
+
+    def _describe(self):
+        flip = f"videoflip video-direction={self.config['flip']} ! " if self.config.get("flip") else ""
+        return (
+            f"{self.config['source']} ! valve name=gate drop=false ! videoconvert ! {flip}"
+            f"videoconvert ! video/x-raw,format=RGB ! "
+            f"appsink name=sink max-buffers=1 drop=true sync=false"
+        )
+
+    def start(self):
+        """Starts the pipeline and waits until it delivers frames."""
+        with self.lock:
+            if self.pipeline:
+                return
+            Gst = self._gst()
+            started = time.monotonic()
+            try:
+                self.pipeline = Gst.parse_launch(self._describe())
+            except Exception as e:
+                raise CameraError(f"Invalid camera pipeline: {e}")
+            self.sink = self.pipeline.get_by_name("sink")
+            self.gate = self.pipeline.get_by_name("gate")
+
+            if self.pipeline.set_state(Gst.State.PLAYING) == Gst.StateChangeReturn.FAILURE:
+                self._teardown()
+                raise CameraError(self._bus_error() or "Camera pipeline failed to start")
+
+            # Let auto exposure settle before the first real shot.
+            for _ in range(self.config.get("warmup_frames", 0)):
+                self._pull()
+            self._close_gate()
+            logger.info(f"Camera pipeline ready in {(time.monotonic() - started) * 1000:.0f} ms")
+
+    def _bus_error(self):
+        Gst = self._gst()
+        bus = self.pipeline.get_bus() if self.pipeline else None
+        msg = bus.pop_filtered(Gst.MessageType.ERROR) if bus else None
+        if msg:
+            err, _debug = msg.parse_error()
+            return err.message
+        return None
+
+    def _open_gate(self):
+        # The sink still holds the last frame from before the valve closed.
+        self.sink.emit("try-pull-sample", 0)
+        self.gate.set_property("drop", False)
+
+    def _close_gate(self):
+        self.gate.set_property("drop", True)
+
+    def _pull(self):
+        Gst = self._gst()
+        sample = self.sink.emit("try-pull-sample", 5 * Gst.SECOND)
+        if sample is None:
+            raise CameraError(self._bus_error() or "No frame from camera")
+        return sample
+
+    def _teardown(self):
+        if self.pipeline:
+            Gst = self._gst()
+            self.pipeline.set_state(Gst.State.NULL)
+        self.pipeline = None
+        self.sink = None
+        self.gate = None
+
+    def stop(self):
+        """Releases the camera."""
+        with self.lock:
+            if self.idle_timer:
+                self.idle_timer.cancel()
+                self.idle_timer = None
+            if self.pipeline:
+                logger.info("Releasing camera")
+            self._teardown()
+
+    def _schedule_idle_stop(self):
+        if self.idle_timer:
+            self.idle_timer.cancel()
+            self.idle_timer = None
+        if self.keep_warm <= 0:
+            self.stop()
+            return
+        self.idle_timer = threading.Timer(self.keep_warm, self.stop)
+        self.idle_timer.daemon = True
+        self.idle_timer.start()
+
+    def _picture_path(self, index):
+        from gi.repository import GLib
+        pictures_dir = GLib.get_user_special_dir(GLib.UserDirectory.DIRECTORY_PICTURES) or f"{HOME_DIR}/Pictures"
+        # With the camera warm, shots can be less than a second apart.
+        now = datetime.datetime.now()
+        stamp = f"{now:%Y%m%d_%H%M%S}_{now.microsecond // 1000:03d}"
+        suffix = f"_{index}" if index else ""
+        return os.path.join(pictures_dir, f"photo_{stamp}{suffix}.jpeg")
+
+    def shoot(self, burst=1, interval_ms=0):
+        """
+        Captures one or more frames and returns the paths they will be written to.
+        Returns as soon as the frames are grabbed; encoding continues in the background.
+        """
+        paths = []
+        with self.lock:
+            if self.idle_timer:
+                self.idle_timer.cancel()
+                self.idle_timer = None
+            self.start()
+            self._open_gate()
+            try:
+                for index in range(max(1, burst)):
+                    if index and interval_ms:
+                        time.sleep(interval_ms / 1000)
+                    requested = time.monotonic()
+                    sample = self._pull()
+                    path = self._picture_path(index)
+                    self._submit(PhotoJob(sample, path, requested))
+                    paths.append(path)
+            finally:
+                if self.gate:
+                    self._close_gate()
+                self._schedule_idle_stop()
+        return paths
+
+    def _submit(self, job):
+        self.jobs.put(job)
+        with self.worker_lock:
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._work, name="camera-encoder")
+                self.worker.start()
+
+    def _work(self):
+        while True:
+            try:
+                job = self.jobs.get(timeout=1)
+            except queue.Empty:
+                with self.worker_lock:
+                    if self.jobs.empty():
+                        self.worker = None
+                        return
+                continue
+            try:
+                self._encode(job)
+            except Exception as e:
+                logger.error(f"Failed to save picture: {e}")
+            finally:
+                self.jobs.task_done()
+
+    def _encode(self, job):
+        import gi
+        gi.require_version('GdkPixbuf', '2.0')
+        from gi.repository import GdkPixbuf, GLib
+
+        caps = job.sample.get_caps().get_structure(0)
+        width = caps.get_value("width")
+        height = caps.get_value("height")
+        # GStreamer pads RGB rows to 4 bytes.
+        stride = (width * 3 + 3) & ~3
+
+        buf = job.sample.get_buffer()
+        data = buf.extract_dup(0, buf.get_size())
+        pixbuf = GdkPixbuf.Pixbuf.new_from_bytes(
+            GLib.Bytes.new(data), GdkPixbuf.Colorspace.RGB, False, 8, width, height, stride
+        )
+
+        os.makedirs(os.path.dirname(job.path), exist_ok=True)
+        pixbuf.savev(job.path, "jpeg", ["quality"], [str(self.config.get("quality", 92))])
+
+        latency_ms = (time.monotonic() - job.requested) * 1000
+        self.latencies.append(latency_ms)
+        logger.info(f"Picture saved to {job.path} ({latency_ms:.0f} ms after the shot)")
+
+        from tweak_flx1s.utils import send_notification
+        send_notification("Picture Taken", f"Saved to {job.path}")
+
+    def wait(self):
+        """Blocks until every grabbed frame has been written."""
+        self.jobs.join()
+
+_pipeline = None
+
+def get_camera():
+    """Returns the process-wide camera pipeline."""
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = CameraPipeline()
+    return _pipeline
@@ -0,0 +1,320 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import json
+import time
+import hashlib
+import subprocess
+from collections import OrderedDict
+from loguru import logger
+from tweak_flx1s.const import CONFIG_DIR, CACHE_DIR, CLIPBOARD_SOCKET
+
+CONFIG_FILE = os.path.join(CONFIG_DIR, "clipboard.json")
+HISTORY_DIR = os.path.join(CACHE_DIR, "clipboard")
+INDEX_FILE = os.path.join(HISTORY_DIR, "index.json")
+
+DEFAULT_CONFIG = {
+    "max_entries": 50,
+    "max_memory_kb": 1024,
+    "max_disk_mb": 32,
+    "max_entry_mb": 8,
+    "inline_kb": 16,
+    "menu_items": 10
+}
+
+TEXT_MIME_TYPES = ["text/plain;charset=utf-8", "UTF8_STRING", "text/plain", "TEXT", "STRING"]
+# Offered by password managers for selections that must not be recorded.
+SECRET_MIME_TYPES = ["x-kde-passwordManagerHint"]
+
+def load_config():
+    """Loads the history caps, falling back to defaults for missing keys."""
+    config = dict(DEFAULT_CONFIG)
+    if os.path.exists(CONFIG_FILE):
+        try:
+            with open(CONFIG_FILE, 'r') as f:
+                config.update(json.load(f))
+        except Exception as e:
+            logger.error(f"Failed to load clipboard config: {e}")
+    return config
+
+def select_mime(offered):
+    """Picks the MIME type to record: text first, then images. None if nothing usable."""
+    if any(m in offered for m in SECRET_MIME_TYPES):
+        return None
+    for mime in TEXT_MIME_TYPES:
+        if mime in offered:
+            return mime
+    for mime in offered:
+        if mime.startswith("text/") or mime.startswith("image/"):
+            return mime
+    return None
+
+def is_text(mime):
+    return mime in TEXT_MIME_TYPES or mime.startswith("text/")
+
+class ClipboardEntry:
+    """One history entry. Small text lives in memory, anything else in a blob file."""
+
+    def __init__(self, digest, mime, size, timestamp, text=None, blob=None):
+        self.digest = digest
+        self.mime = mime
+        self.size = size
+        self.timestamp = timestamp
+        self.text = text
+        self.blob = blob
+
+    @property
+    def memory_size(self):
+        return self.size if self.text is not None else 0
+
+    @property
+    def disk_size(self):
+        return self.size if self.blob else 0
+
+    def label(self, width=40):
+        """Returns a single-line preview for menus."""
+        if self.text is not None:
+            preview = " ".join(self.text.split())
+            return preview[:width - 1] + "…" if len(preview) > width else preview
+        if is_text(self.mime) and self.blob:
+            try:
+                with open(self.blob, "rb") as f:
+                    head = f.read(width * 4).decode(errors="ignore")
+                return " ".join(head.split())[:width - 1] + "…"
+            except OSError:
+                pass
+        return f"[{self.mime} {self.size // 1024} KB]"
+
+    def to_dict(self):
+        data = {"hash": self.digest, "mime": self.mime, "size": self.size, "time": self.timestamp}
+        if self.text is not None:
+            data["text"] = self.text
+        if self.blob:
+            data["blob"] = os.path.basename(self.blob)
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        blob = os.path.join(HISTORY_DIR, data["blob"]) if data.get("blob") else None
+        return cls(data["hash"], data["mime"], data["size"], data.get("time", 0), data.get("text"), blob)
+
+class ClipboardHistory:
+    """
+    Size-capped LRU ring of clipboard entries keyed by content hash.
+    Most recent entries come first. Copying the same content again only
+    moves the existing entry to the front.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or load_config()
+        self.entries = OrderedDict()
+
+    @property
+    def max_entry_bytes(self):
+        return self.config["max_entry_mb"] * 1024 * 1024
+
+    def load(self):
+        """Loads the index written by the history service."""
+        self.entries.clear()
+        if not os.path.exists(INDEX_FILE):
+            return self
+        try:
+            with open(INDEX_FILE, 'r') as f:
+                for data in json.load(f).get("entries", []):
+                    entry = ClipboardEntry.from_dict(data)
+                    self.entries[entry.digest] = entry
+        except Exception as e:
+            logger.error(f"Failed to load clipboard history: {e}")
+        return self
+
+    def save(self):
+        os.makedirs(HISTORY_DIR, exist_ok=True)
+        tmp = INDEX_FILE + ".tmp"
+        try:
+            with open(tmp, 'w') as f:
+                json.dump({"entries": [e.to_dict() for e in self.entries.values()]}, f)
+            os.replace(tmp, INDEX_FILE)
+        except Exception as e:
+            logger.error(f"Failed to save clipboard history: {e}")
+
+    def add_stream(self, stream, mime):
+        """
+        Reads one selection from a binary stream and records it.
+        Content larger than the per-entry cap is dropped without being kept in memory.
+        Returns the entry, or None if nothing was recorded.
+        """
+        inline_limit = self.config["inline_kb"] * 1024
+        digest = hashlib.sha256()
+        head = bytearray()
+        blob_file = None
+        tmp_path = os.path.join(HISTORY_DIR, f".incoming-{os.getpid()}")
+        size = 0
+
+        try:
+            while True:
+                data = stream.read1(65536)
+                if not data:
+                    break
+                size += len(data)
+                if size > self.max_entry_bytes:
+                    logger.info(f"Skipping clipboard content over {self.config['max_entry_mb']} MB")
+                    return None
+                digest.update(data)
+
+                if blob_file:
+                    blob_file.write(data)
+                elif len(head) + len(data) > inline_limit or not is_text(mime):
+                    os.makedirs(HISTORY_DIR, exist_ok=True)
+                    blob_file = open(tmp_path, "wb")
+                    blob_file.write(head)
+                    blob_file.write(data)
+                    head = None
+                else:
+                    head.extend(data)
+        finally:
+            if blob_file:
+                blob_file.close()
+                if size > self.max_entry_bytes:
+                    os.unlink(tmp_path)
+
+        if size == 0:
+            return None
+
+        key = digest.hexdigest()
+        if key in self.entries:
+            if blob_file:
+                os.unlink(tmp_path)
+            self.entries.move_to_end(key, last=False)
+            self.entries[key].timestamp = int(time.time())
+            self.save()
+            return self.entries[key]
+
+        if blob_file:
+            blob = os.path.join(HISTORY_DIR, f"{key}.bin")
+            os.replace(tmp_path, blob)
+            entry = ClipboardEntry(key, mime, size, int(time.time()), blob=blob)
+        else:
+            text = bytes(head).decode(errors="replace")
+            entry = ClipboardEntry(key, mime, size, int(time.time()), text=text)
+
+        self.entries[key] = entry
+        self.entries.move_to_end(key, last=False)
+        self.evict()
+        self.save()
+        return entry
+
+    def evict(self):
+        """Drops the oldest entries until every cap holds. Byte caps only evict entries that count against them."""
+        max_memory = self.config["max_memory_kb"] * 1024
+        max_disk = self.config["max_disk_mb"] * 1024 * 1024
+
+        while len(self.entries) > self.config["max_entries"]:
+            self._drop(next(reversed(self.entries)))
+
+        for attr, cap in (("memory_size", max_memory), ("disk_size", max_disk)):
+            used = sum(getattr(e, attr) for e in self.entries.values())
+            for key in list(reversed(self.entries)):
+                if used <= cap:
+                    break
+                size = getattr(self.entries[key], attr)
+                if size:
+                    used -= size
+                    self._drop(key)
+
+    def _drop(self, key):
+        self._remove_blob(self.entries.pop(key))
+
+    def _remove_blob(self, entry):
+        if entry.blob:
+            try:
+                os.unlink(entry.blob)
+            except FileNotFoundError:
+                pass
+
+    def prune_orphans(self):
+        """Removes blob files the index no longer references."""
+        if not os.path.isdir(HISTORY_DIR):
+            return
+        known = {os.path.basename(e.blob) for e in self.entries.values() if e.blob}
+        for name in os.listdir(HISTORY_DIR):
+            if (name.endswith(".bin") and name not in known) or name.startswith(".incoming-"):
+                try:
+                    os.unlink(os.path.join(HISTORY_DIR, name))
+                except OSError:
+                    pass
+
+    def clear(self):
+        for entry in self.entries.values():
+            self._remove_blob(entry)
+        self.entries.clear()
+        self.save()
+
+    def restore(self, digest):
+        """Puts an entry back on the clipboard with wl-copy."""
+        entry = self.entries.get(digest)
+        if not entry:
+            logger.warning(f"Clipboard entry {digest[:12]} is gone")
+            return False
+
+        cmd = ["wl-copy", "--type", entry.mime]
+        try:
+            if entry.blob:
+                with open(entry.blob, "rb") as f:
+                    subprocess.run(cmd, stdin=f, check=False)
+            else:
+                subprocess.run(cmd, input=entry.text.encode(), check=False)
+        except OSError as e:
+            logger.error(f"Failed to restore clipboard entry: {e}")
+            return False
+        return True
+
+def show_history():
+    """Presents the clipboard history in a wofi menu."""
+    from tweak_flx1s.actions.executor import show_wofi_menu
+    from tweak_flx1s.utils import send_notification
+
+    history = ClipboardHistory().load()
+    if not history.entries:
+        send_notification("Clipboard History", "No entries yet.")
+        return
+
+    limit = history.config["menu_items"]
+    items = [{"label": e.label(), "type": "clipboard", "value": e.digest}
+             for e in list(history.entries.values())[:limit]]
+    show_wofi_menu(items, max_items=limit)
+
+def clear_history():
+    """
+    Empties the history. A running history service is asked to do it, as
+    it would otherwise write its own copy of the entries back.
+    """
+    from tweak_flx1s.core import ipc
+
+    reply = ipc.request(CLIPBOARD_SOCKET, {"command": "clear"})
+    if reply is not None:
+        if reply.get("ok"):
+            return
+        logger.warning(f"Clipboard service failed: {reply.get('error')}")
+    ClipboardHistory().load().clear()
+
+def run_clipboard_action(value):
+    """Handles the 'clipboard' action type: 'history' opens the picker, a hash restores that entry."""
+    if not value or value == "history":
+        show_history()
+    elif value == "clear":
+        clear_history()
+    else:
+        ClipboardHistory().load().restore(value)
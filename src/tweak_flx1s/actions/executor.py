@@ -17,8 +17,63 @@ import os
 import subprocess
 import pwd
 from tweak_flx1s.utils import logger, run_command
-
+from tweak_flx1s.actions.launcher import get_launcher
+from tweak_flx1s.core.trace import span, traced
+
+BUILTIN_TYPES = ("mpris", "volume", "brightness", "flashlight")
+
+# Shell strings that have an in-process equivalent.
+LEGACY_COMMANDS = {
+    "wtype -k XF86AudioPlay": {"type": "mpris", "value": "PlayPause"},
+    "wtype -k XF86AudioNext": {"type": "mpris", "value": "Next"},
+    "wtype -k XF86AudioPrev": {"type": "mpris", "value": "Previous"},
+    "wtype -k XF86AudioRaiseVolume": {"type": "volume", "value": "up"},
+    "wtype -k XF86AudioLowerVolume": {"type": "volume", "value": "down"},
+    "wtype -k XF86AudioMute": {"type": "volume", "value": "mute"},
+    "tweak-flx1s --action flashlight": {"type": "flashlight", "value": "toggle"},
+    "wtype -M ctrl c -m ctrl": {"type": "keys", "value": "ctrl+c"},
+    "wtype -M ctrl v -m ctrl": {"type": "keys", "value": "ctrl+v"},
+    "wtype -M ctrl x -m ctrl": {"type": "keys", "value": "ctrl+x"},
+    "wtype -M ctrl a -m ctrl && wtype -M ctrl c -m ctrl": {"type": "keys", "value": "ctrl+a ctrl+c"},
+    "wtype -M alt -P F4 -m alt -p F4": {"type": "keys", "value": "alt+F4"},
+    "wtype -M alt -P tab -m alt -p tab": {"type": "keys", "value": "alt+Tab"},
+    "wtype -M alt -M shift -P tab -m alt -m shift -p tab": {"type": "keys", "value": "alt+shift+Tab"},
+    "wtype -k XF86Back": {"type": "keys", "value": "XF86Back"},
+    "tweak-flx1s --action kill-window": {"type": "keys", "value": "alt+F4"},
+}
+
+@traced("lock")
 def is_locked():
+    """Check session lock status, from logind's cached properties if possible."""
+    try:
+        locked = _logind_locked()
+    except Exception as e:
+        logger.debug(f"logind lock state unavailable: {e}")
+        locked = None
+    if locked is not None:
+        return locked
+    return _loginctl_locked()
+
+@traced("lock.logind")
+def _logind_locked():
+    """LockedHint of the user's display session, None if there is none."""
+    from gi.repository import Gio
+    from tweak_flx1s.core.bus import get_proxy
+
+    user = get_proxy("org.freedesktop.login1", "/org/freedesktop/login1/user/self",
+                     "org.freedesktop.login1.User", Gio.BusType.SYSTEM)
+    display = user.get_cached_property("Display")
+    if display is None:
+        return None
+    _sid, path = display.unpack()
+    if path == "/":
+        return None
+    session = get_proxy("org.freedesktop.login1", path, "org.freedesktop.login1.Session", Gio.BusType.SYSTEM)
+    hint = session.get_cached_property("LockedHint")
+    return hint.unpack() if hint is not None else None
+
+@traced("lock.loginctl")
+def _loginctl_locked():
     """Check session lock status using loginctl."""
     try:
         user = os.environ.get('USER')
@@ -76,6 +131,7 @@ def is_locked():
         logger.error(f"Error checking lock state: {e}")
         return False
 
+@traced("wofi_check")
 def is_wofi_running():
     """Checks if wofi is currently running."""
     try:
@@ -84,27 +140,76 @@ def is_wofi_running():
     except subprocess.CalledProcessError:
         return False
 
-def execute_command(cmd):
-    """Executes a shell command in background."""
+def migrate_action(action_config):
+    """
+    Rewrites shell commands that match a built-in action in place.
+    Returns True if anything was changed.
+    """
+    if not isinstance(action_config, dict):
+        return False
+
+    changed = False
+    action_type = action_config.get("type", "command")
+
+    if action_type == "command":
+        cmd = (action_config.get("value") or action_config.get("cmd") or "").strip()
+        replacement = LEGACY_COMMANDS.get(cmd)
+        if replacement:
+            action_config.pop("cmd", None)
+            action_config.update(replacement)
+            changed = True
+    elif action_type == "wofi":
+        for item in action_config.get("items", []):
+            changed = migrate_action(item) or changed
+
+    return changed
+
+def run_action(action_config, label=None):
+    """Runs a configured action: a command, a wofi menu, a key macro, the clipboard history or a built-in type."""
+    action_type = action_config.get("type", "command")
+    with span(f"action.{action_type}"):
+        _run_action(action_type, action_config, label)
+
+def _run_action(action_type, action_config, label):
+    if action_type == "command":
+        cmd = action_config.get("value") or action_config.get("cmd")
+        execute_command(cmd, label=label)
+    elif action_type == "wofi":
+        show_wofi_menu(action_config.get("items", []))
+    elif action_type == "keys":
+        from tweak_flx1s.actions.keys import send_keys
+        send_keys(action_config.get("value", ""))
+    elif action_type == "clipboard":
+        from tweak_flx1s.actions.clipboard import run_clipboard_action
+        run_clipboard_action(action_config.get("value"))
+    elif action_type in BUILTIN_TYPES:
+        from tweak_flx1s.actions.builtin import run_builtin
+        logger.info(f"Running built-in action: {action_type} {action_config.get('value', '')}")
+        run_builtin(action_type, action_config.get("value"))
+    else:
+        logger.warning(f"Unknown action type: {action_type}")
+
+@traced("launch")
+def execute_command(cmd, label=None):
+    """Executes a command in background through the shared launcher."""
     if cmd:
         logger.info(f"Executing command: {cmd}")
-        subprocess.Popen(cmd, shell=True)
+        get_launcher().launch(cmd, label=label)
 
-def show_wofi_menu(items):
+def show_wofi_menu(items, max_items=7):
     """Shows a wofi menu with given items."""
-    if len(items) > 7:
-        logger.warning("Too many items for Wofi menu, truncating to 7.")
-        items = items[:7]
+    if len(items) > max_items:
+        logger.warning(f"Too many items for Wofi menu, truncating to {max_items}.")
+        items = items[:max_items]
 
     wofi_input = ""
-    cmd_map = {}
+    item_map = {}
 
     for idx, item in enumerate(items, 1):
         label = item.get("label", "Unknown")
-        cmd = item.get("cmd", "")
         display_str = f"{idx}. {label}"
         wofi_input += f"{display_str}\n"
-        cmd_map[display_str] = cmd
+        item_map[display_str] = item
 
     close_idx = len(items) + 1
     display_close = f"{close_idx}. Close"
@@ -127,10 +232,9 @@ def show_wofi_menu(items):
         if selection == display_close:
             return
 
-        if selection in cmd_map:
-            cmd = cmd_map[selection]
-            logger.info(f"Executing menu command: {cmd}")
-            execute_command(cmd)
+        if selection in item_map:
+            logger.info(f"Executing menu item: {selection}")
+            run_action(item_map[selection], label=selection)
         else:
             logger.warning("Invalid selection")
 
@@ -18,7 +18,8 @@ import json
 import copy
 from loguru import logger
 from tweak_flx1s.const import CONFIG_DIR
-from tweak_flx1s.actions.executor import is_locked, execute_command, show_wofi_menu
+from tweak_flx1s.actions.executor import is_locked, run_action, migrate_action
+from tweak_flx1s.core.trace import traced
 
 try:
     _
@@ -34,25 +35,25 @@ DEFAULT_CONFIG = {
             "name": "Switch App Next",
             "spec": "1,RL,B,*,R",
             "locked": {"type": "command", "value": ""},
-            "unlocked": {"type": "command", "value": "wtype -M alt -P tab -m alt -p tab"}
+            "unlocked": {"type": "keys", "value": "alt+Tab"}
         },
         {
             "name": "Switch App Prev",
             "spec": "1,LR,B,*,R",
             "locked": {"type": "command", "value": ""},
-            "unlocked": {"type": "command", "value": "wtype -M alt -M shift -P tab -m alt -m shift -p tab"}
+            "unlocked": {"type": "keys", "value": "alt+shift+Tab"}
         },
         {
             "name": "Kill App",
             "spec": "1,LR,L,L,R",
             "locked": {"type": "command", "value": ""},
-            "unlocked": {"type": "command", "value": "wtype -M alt -P F4 -m alt -p F4"}
+            "unlocked": {"type": "keys", "value": "alt+F4"}
         },
         {
             "name": "Back",
             "spec": "1,LR,L,S,R",
             "locked": {"type": "command", "value": ""},
-            "unlocked": {"type": "command", "value": "wtype -k XF86Back"}
+            "unlocked": {"type": "keys", "value": "XF86Back"}
         }
     ]
 }
@@ -62,7 +63,9 @@ class GesturesManager:
     def __init__(self):
         self.config = self._load_config()
         self._remove_duplicates()
+        self._migrate_actions()
 
+    @traced("config.gestures")
     def _load_config(self):
         """Loads gesture configuration."""
         if not os.path.exists(CONFIG_FILE):
@@ -102,6 +105,17 @@ class GesturesManager:
             self.config["gestures"] = unique_gestures
             self.save_config()
 
+    def _migrate_actions(self):
+        """Converts shell strings with an in-process equivalent."""
+        changed = False
+        for g in self.config.get("gestures", []):
+            for state in ["locked", "unlocked"]:
+                changed = migrate_action(g.get(state)) or changed
+
+        if changed:
+            logger.info("Migrated gesture actions to built-in types.")
+            self.save_config()
+
     def save_config(self, new_config=None):
         """Saves gesture configuration."""
         if new_config:
@@ -110,6 +124,7 @@ class GesturesManager:
         with open(CONFIG_FILE, 'w') as f:
             json.dump(self.config, f, indent=4)
 
+    @traced("gesture")
     def handle_gesture(self, index):
         """Handles a triggered gesture by index."""
         try:
@@ -134,10 +149,4 @@ class GesturesManager:
              logger.warning(f"No action configured for gesture {index} in {state_key} state.")
              return
 
-        action_type = action_config.get("type")
-        if action_type == "command":
-            cmd = action_config.get("value")
-            execute_command(cmd)
-        elif action_type == "wofi":
-            items = action_config.get("items", [])
-            show_wofi_menu(items)
+        run_action(action_config, label=gesture.get("name"))
@@ -0,0 +1,504 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Key injection.
+
+Key sequences are compiled into a list of events:
+    ("mods", mask)            set the modifier mask
+    ("key", keysym)           press and release a key
+    ("press", keysym)         press only
+    ("release", keysym)       release only
+    ("sleep", ms)             wait
+    ("text", text, delay_ms)  type text
+
+Macros are whitespace separated steps, e.g. "ctrl+a ctrl+c", "alt+F4",
+"sleep:100" or 'type:"hello world"'.
+"""
+
+import os
+import itertools
+import time
+import shlex
+import struct
+import subprocess
+from loguru import logger
+from tweak_flx1s.const import KEYS_SOCKET
+from tweak_flx1s.core import ipc
+from tweak_flx1s.core.wayland import WaylandConnection, WaylandError
+
+MODIFIERS = {
+    "shift": 1,
+    "ctrl": 4,
+    "control": 4,
+    "alt": 8,
+    "super": 64,
+    "logo": 64,
+    "meta": 64,
+}
+
+WTYPE_MODIFIERS = {1: "shift", 4: "ctrl", 8: "alt", 64: "logo"}
+
+KEY_ALIASES = {
+    "tab": "Tab",
+    "enter": "Return",
+    "return": "Return",
+    "esc": "Escape",
+    "escape": "Escape",
+    "space": "space",
+    "backspace": "BackSpace",
+    "delete": "Delete",
+    "del": "Delete",
+    "home": "Home",
+    "end": "End",
+    "pageup": "Prior",
+    "pagedown": "Next",
+    "up": "Up",
+    "down": "Down",
+    "left": "Left",
+    "right": "Right",
+    "menu": "Menu",
+}
+
+SPECIAL_CHARS = {"\n": "Return", "\t": "Tab", " ": "space"}
+
+# Evdev keycodes 1..247 map to XKB keycodes 9..255.
+MAX_KEYS = 247
+# Keys sent before waiting for the compositor to catch up.
+CHUNK_KEYS = 128
+# wtype arguments above this size are fed through stdin instead.
+WTYPE_ARGV_LIMIT = 4096
+
+class MacroError(ValueError):
+    """Raised for malformed key macros."""
+
+def key_name(name):
+    """Normalizes a user supplied key name to an XKB keysym name."""
+    lower = name.lower()
+    if lower in KEY_ALIASES:
+        return KEY_ALIASES[lower]
+    if len(lower) in (2, 3) and lower[0] == "f" and lower[1:].isdigit():
+        return f"F{lower[1:]}"
+    return name
+
+def char_keysym(ch):
+    """Returns the keysym name that types a character, None for control characters."""
+    if ch in SPECIAL_CHARS:
+        return SPECIAL_CHARS[ch]
+    if ch.isascii() and ch.isalnum():
+        return ch
+    code = ord(ch)
+    if code < 0x20 or 0x7f <= code < 0xa0:
+        return None
+    return f"U{code:04X}"
+
+def compile_macro(macro):
+    """Compiles a macro string into a list of events."""
+    try:
+        steps = shlex.split(macro)
+    except ValueError as e:
+        raise MacroError(f"Invalid macro '{macro}': {e}")
+
+    events = []
+    for step in steps:
+        if step.startswith("sleep:"):
+            try:
+                events.append(("sleep", int(step[6:])))
+            except ValueError:
+                raise MacroError(f"Invalid delay in '{step}'")
+            continue
+        if step.startswith("type:"):
+            events.append(("text", step[5:], 0))
+            continue
+
+        parts = ["plus"] if step == "+" else step.split("+")
+        if not all(parts):
+            raise MacroError(f"Invalid key combination '{step}'")
+
+        mask = 0
+        for mod in parts[:-1]:
+            if mod.lower() not in MODIFIERS:
+                raise MacroError(f"Unknown modifier '{mod}' in '{step}'")
+            mask |= MODIFIERS[mod.lower()]
+
+        if mask:
+            events.append(("mods", mask))
+        events.append(("key", key_name(parts[-1])))
+        if mask:
+            events.append(("mods", 0))
+    return events
+
+def build_keymap(keysyms):
+    """Builds an XKB keymap that places each keysym on its own keycode."""
+    lines = [
+        "xkb_keymap {",
+        'xkb_keycodes "(unnamed)" {',
+        "minimum = 8;",
+        "maximum = 255;",
+    ]
+    lines += [f"<K{i}> = {i + 8};" for i in range(1, len(keysyms) + 1)]
+    lines += [
+        "};",
+        'xkb_types "(unnamed)" { include "complete" };',
+        'xkb_compatibility "(unnamed)" { include "complete" };',
+        'xkb_symbols "(unnamed)" {',
+    ]
+    lines += [f"key <K{i}> {{[{name}]}};" for i, name in enumerate(keysyms, 1)]
+    lines += ["};", "};", ""]
+    return "\n".join(lines)
+
+class Injector:
+    """Interface of a key injection backend."""
+
+    # Characters of the last text event handed over before send() failed,
+    # so the rest can be typed by another injector.
+    typed = 0
+
+    def send(self, events):
+        raise NotImplementedError
+
+    def type_stream(self, chunks, delay_ms=0):
+        """Types text arriving in chunks, one batch per chunk."""
+        for chunk in chunks:
+            self.send([("text", chunk, delay_ms)])
+
+    def close(self):
+        pass
+
+class VirtualKeyboardInjector(Injector):
+    """
+    Injects keys over zwp_virtual_keyboard_v1.
+    The connection and keymap are kept for the lifetime of the object, so
+    long-lived processes pay the setup cost once.
+    """
+
+    def __init__(self, display=None):
+        self.conn = WaylandConnection(display)
+        try:
+            seat = self.conn.bind("wl_seat", 1)
+            manager = self.conn.bind("zwp_virtual_keyboard_manager_v1", 1)
+            self.keyboard = self.conn.new_id()
+            self.conn.send(manager, 0, struct.pack("<II", seat, self.keyboard))
+            self.conn.roundtrip()
+        except WaylandError:
+            self.conn.close()
+            raise
+
+        self.keysyms = []
+        self.codes = {}
+        self.mods = 0
+
+    def _ensure_keys(self, names):
+        """Makes sure the keymap covers the given keysyms, uploading a new one if needed."""
+        names = list(dict.fromkeys(names))
+        missing = [n for n in names if n not in self.codes]
+        if not missing:
+            return
+
+        if len(self.keysyms) + len(missing) > MAX_KEYS:
+            self.keysyms = []
+            self.codes = {}
+            missing = names
+
+        for name in missing:
+            self.keysyms.append(name)
+            self.codes[name] = len(self.keysyms)
+        self._upload_keymap()
+
+    def _upload_keymap(self):
+        data = build_keymap(self.keysyms).encode() + b"\0"
+        fd = os.memfd_create("tweak-flx1s-keymap", os.MFD_CLOEXEC)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            # XKB_KEYMAP_FORMAT_TEXT_V1
+            self.conn.send(self.keyboard, 0, struct.pack("<II", 1, len(data)), fds=[fd])
+        finally:
+            os.close(fd)
+
+    def _timestamp(self):
+        return int(time.monotonic() * 1000) & 0xffffffff
+
+    def _key(self, name, state):
+        if name not in self.codes:
+            self._ensure_keys([name])
+        self.conn.send(self.keyboard, 1, struct.pack("<III", self._timestamp(), self.codes[name], state))
+
+    def _set_mods(self, mask):
+        self.mods = mask
+        self.conn.send(self.keyboard, 2, struct.pack("<IIII", mask, 0, 0, 0))
+
+    def _type_text(self, text, delay_ms):
+        for start in range(0, len(text), CHUNK_KEYS):
+            part = text[start:start + CHUNK_KEYS]
+            names = [char_keysym(c) for c in part]
+            self._ensure_keys([n for n in names if n])
+            for offset, name in enumerate(names, start + 1):
+                if name:
+                    self._key(name, 1)
+                    self._key(name, 0)
+                    if delay_ms:
+                        self.conn.roundtrip()
+                        time.sleep(delay_ms / 1000)
+                self.typed = offset
+            self.conn.roundtrip()
+
+    def send(self, events):
+        self.typed = 0
+        names = []
+        for event in events:
+            if event[0] in ("key", "press", "release"):
+                names.append(event[1])
+            elif event[0] == "text":
+                names.extend(n for n in map(char_keysym, event[1]) if n)
+        if len(set(names)) <= MAX_KEYS:
+            self._ensure_keys(names)
+
+        for event in events:
+            kind = event[0]
+            if kind == "mods":
+                self._set_mods(event[1])
+            elif kind == "key":
+                self._key(event[1], 1)
+                self._key(event[1], 0)
+            elif kind == "press":
+                self._key(event[1], 1)
+            elif kind == "release":
+                self._key(event[1], 0)
+            elif kind == "sleep":
+                self.conn.roundtrip()
+                time.sleep(event[1] / 1000)
+            elif kind == "text":
+                self._type_text(event[1], event[2] if len(event) > 2 else 0)
+
+        if self.mods:
+            self._set_mods(0)
+        self.conn.roundtrip()
+
+    def close(self):
+        try:
+            self.conn.send(self.keyboard, 3)
+        except WaylandError:
+            pass
+        self.conn.close()
+
+class WtypeInjector(Injector):
+    """Fallback that runs one wtype process per batch."""
+
+    def send(self, events):
+        argv = ["wtype"]
+        mods = 0
+        for event in events:
+            kind = event[0]
+            if kind == "mods":
+                for bit, name in WTYPE_MODIFIERS.items():
+                    if event[1] & bit and not mods & bit:
+                        argv += ["-M", name]
+                    elif mods & bit and not event[1] & bit:
+                        argv += ["-m", name]
+                mods = event[1]
+            elif kind == "key":
+                argv += ["-k", event[1]]
+            elif kind == "press":
+                argv += ["-P", event[1]]
+            elif kind == "release":
+                argv += ["-p", event[1]]
+            elif kind == "sleep":
+                argv += ["-s", str(event[1])]
+            elif kind == "text":
+                delay = event[2] if len(event) > 2 else 0
+                if len(argv) > 1:
+                    self._run(argv)
+                    argv = ["wtype"]
+                self._type_text(event[1], delay)
+
+        if len(argv) > 1:
+            self._run(argv)
+
+    def type_stream(self, chunks, delay_ms=0):
+        """Pipes all chunks into a single wtype process."""
+        argv = ["wtype"]
+        if delay_ms:
+            argv += ["-d", str(delay_ms)]
+        try:
+            proc = subprocess.Popen(argv + ["-"], stdin=subprocess.PIPE, text=True,
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except OSError as e:
+            logger.error(f"Failed to run wtype: {e}")
+            return
+        try:
+            for chunk in chunks:
+                proc.stdin.write(chunk)
+                proc.stdin.flush()
+        except BrokenPipeError:
+            logger.error("wtype exited while typing")
+        finally:
+            try:
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+            proc.wait()
+
+    def _type_text(self, text, delay_ms):
+        argv = ["wtype"]
+        if delay_ms:
+            argv += ["-d", str(delay_ms)]
+        if len(text.encode()) > WTYPE_ARGV_LIMIT or text.startswith("-"):
+            self._run(argv + ["-"], stdin=text)
+        else:
+            self._run(argv + [text])
+
+    def _run(self, argv, stdin=None):
+        try:
+            subprocess.run(argv, input=stdin, text=True, check=False,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except OSError as e:
+            logger.error(f"Failed to run wtype: {e}")
+
+class RecordingInjector(Injector):
+    """Collects events instead of injecting them, for tests."""
+
+    def __init__(self):
+        self.events = []
+
+    def send(self, events):
+        self.events.extend(tuple(e) for e in events)
+
+_injector = None
+
+def get_injector():
+    """Returns the process-wide injector, preferring the virtual keyboard."""
+    global _injector
+    if _injector is None:
+        try:
+            _injector = VirtualKeyboardInjector()
+            logger.debug("Using zwp_virtual_keyboard_v1 for key injection")
+        except (WaylandError, OSError) as e:
+            logger.debug(f"Virtual keyboard unavailable ({e}), falling back to wtype")
+            _injector = WtypeInjector()
+    return _injector
+
+def set_injector(injector):
+    """Replaces the process-wide injector, e.g. with a RecordingInjector."""
+    global _injector
+    if _injector is not None and _injector is not injector:
+        _injector.close()
+    _injector = injector
+
+def _estimated_duration(events):
+    total = 0
+    for event in events:
+        if event[0] == "sleep":
+            total += event[1]
+        elif event[0] == "text":
+            total += len(event[1]) * (event[2] if len(event) > 2 else 0)
+    return total / 1000
+
+def unsent_events(events, typed):
+    """
+    What is left of a batch after an injector failed typed characters into
+    it. Only a lone text event can be resumed; other batches are sent whole.
+    """
+    if len(events) == 1 and events[0][0] == "text":
+        kind, text, *rest = events[0]
+        return [(kind, text[typed:], *rest)]
+    return events
+
+def _service_reply(events):
+    """Hands the events to the key injection service; None if it is not running."""
+    reply = ipc.request(KEYS_SOCKET, {"events": events}, timeout=5 + _estimated_duration(events))
+    if reply is not None and not reply.get("ok"):
+        logger.warning(f"Key service failed: {reply.get('error')}")
+    return reply
+
+def _send_to_service(events):
+    """Hands the events to the key injection service if it is running."""
+    reply = _service_reply(events)
+    return reply is not None and bool(reply.get("ok"))
+
+def send_events(events):
+    """Injects compiled events, through the service when available."""
+    if not events:
+        return True
+    if _injector is None and _send_to_service(events):
+        return True
+    try:
+        get_injector().send(events)
+        return True
+    except WaylandError as e:
+        logger.error(f"Key injection failed: {e}")
+        set_injector(WtypeInjector())
+        _injector.send(events)
+        return True
+
+def send_keys(macro):
+    """Compiles and injects a key macro such as 'ctrl+c' or 'alt+F4'."""
+    try:
+        events = compile_macro(macro)
+    except MacroError as e:
+        logger.error(str(e))
+        return False
+    logger.info(f"Sending keys: {macro}")
+    return send_events(events)
+
+def type_text(text, delay_ms=0):
+    """Types arbitrary text without going through argv."""
+    return send_events([("text", text, delay_ms)])
+
+def type_stream(chunks, delay_ms=0):
+    """
+    Types text from an iterable of chunks with bounded memory.
+    Each chunk is handed over and typed before the next one is read.
+    """
+    chunks = iter(chunks)
+    if _injector is None:
+        first = next(chunks, None)
+        if first is None:
+            return True
+        if _send_to_service([("text", first, delay_ms)]):
+            for chunk in chunks:
+                reply = _service_reply([("text", chunk, delay_ms)])
+                if reply is None or not reply.get("ok"):
+                    # A service that went away cannot say how far it got.
+                    typed = reply.get("typed", 0) if reply else 0
+                    logger.error("Key service failed while typing, continuing here")
+                    chunks = itertools.chain([chunk[typed:]], chunks)
+                    break
+            else:
+                return True
+        else:
+            chunks = itertools.chain([first], chunks)
+
+    # Remembers the chunk being typed, so a fallback can pick up from it.
+    current = []
+
+    def tracked(source):
+        for chunk in source:
+            current[:] = [chunk]
+            yield chunk
+            current.clear()
+
+    injector = get_injector()
+    try:
+        injector.type_stream(tracked(chunks), delay_ms)
+        return True
+    except WaylandError as e:
+        logger.error(f"Key injection failed: {e}")
+        # Only what the virtual keyboard had not sent yet is typed again.
+        rest = [chunk[injector.typed:] for chunk in current]
+        set_injector(WtypeInjector())
+        _injector.type_stream(itertools.chain(rest, chunks), delay_ms)
+        return True
@@ -0,0 +1,213 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import sys
+import time
+import shlex
+from loguru import logger
+
+SHELL_CHARS = set("|&;<>()$`\\*?[]{}~\n")
+
+class LaunchRecord:
+    """Bookkeeping for a single launched command."""
+    def __init__(self, pid, label, cmd, via_shell, started):
+        self.pid = pid
+        self.label = label
+        self.cmd = cmd
+        self.via_shell = via_shell
+        self.started = started
+        self.scope = None
+
+class Launcher:
+    """
+    Spawns configured commands and keeps track of them.
+    Commands are exec'd directly with posix_spawn when they need no shell.
+    Children are reaped through GLib child watches when a main loop runs.
+    """
+
+    def __init__(self, use_scope=None):
+        if use_scope is None:
+            use_scope = bool(os.environ.get("INVOCATION_ID"))
+        self.use_scope = use_scope
+        self.children = {}
+        self.stats = {}
+
+    @staticmethod
+    def split_command(cmd):
+        """Returns an argv list if the command can run without a shell, else None."""
+        if any(c in SHELL_CHARS for c in cmd):
+            return None
+        try:
+            argv = shlex.split(cmd)
+        except ValueError:
+            return None
+        if not argv or "=" in argv[0]:
+            return None
+        return argv
+
+    def launch(self, cmd, label=None):
+        """Launches a command in the background and returns its pid."""
+        if not cmd:
+            return None
+        label = label or cmd
+        start = time.monotonic()
+
+        argv = self.split_command(cmd)
+        via_shell = argv is None
+        pid = None
+        if not via_shell:
+            try:
+                pid = os.posix_spawnp(argv[0], argv, os.environ, setsid=True)
+            except FileNotFoundError:
+                logger.debug(f"{argv[0]} not found in PATH, retrying through the shell")
+                via_shell = True
+            except OSError as e:
+                logger.error(f"Failed to launch {cmd}: {e}")
+                self._count(label, failed=True)
+                return None
+
+        if via_shell:
+            try:
+                pid = os.posix_spawn("/bin/sh", ["/bin/sh", "-c", cmd], os.environ, setsid=True)
+            except OSError as e:
+                logger.error(f"Failed to launch {cmd}: {e}")
+                self._count(label, failed=True)
+                return None
+
+        latency_ms = (time.monotonic() - start) * 1000
+        record = LaunchRecord(pid, label, cmd, via_shell, start)
+        self._count(label, latency_ms=latency_ms)
+
+        logger.info(f"Launched '{label}' (pid {pid}, {'shell' if via_shell else 'exec'}) in {latency_ms:.2f} ms")
+
+        if self.use_scope:
+            self._move_to_scope(record)
+
+        self._watch_child(record)
+        return pid
+
+    def _count(self, label, latency_ms=None, failed=False):
+        entry = self.stats.setdefault(label, {"spawns": 0, "failures": 0, "latency_ms": 0.0})
+        if failed:
+            entry["failures"] += 1
+            return
+        entry["spawns"] += 1
+        entry["latency_ms"] += latency_ms
+
+    def _main_loop_running(self):
+        """
+        Only processes that already run a GLib main loop can reap via child watches.
+        main_depth() only counts this thread, so a launch from a worker thread
+        (the button engine runs actions on one) checks whether another thread
+        owns the default context, i.e. is iterating it.
+        """
+        glib = sys.modules.get("gi.repository.GLib")
+        if glib is None:
+            return False
+        if glib.main_depth() > 0:
+            return True
+        context = glib.MainContext.default()
+        if context.acquire():
+            context.release()
+            return False
+        return True
+
+    def _watch_child(self, record):
+        if not self._main_loop_running():
+            # One-shot processes exit right away, the child is re-parented and reaped by init.
+            return
+
+        from gi.repository import GLib
+        self.children[record.pid] = record
+        GLib.child_watch_add(GLib.PRIORITY_DEFAULT, record.pid, self._on_child_exit, record)
+
+    def _on_child_exit(self, pid, status, record):
+        self.children.pop(pid, None)
+        runtime = time.monotonic() - record.started
+        if os.WIFEXITED(status):
+            code = os.WEXITSTATUS(status)
+        elif os.WIFSIGNALED(status):
+            code = -os.WTERMSIG(status)
+        else:
+            code = status
+
+        if code == 0:
+            logger.debug(f"'{record.label}' (pid {pid}) exited after {runtime:.1f}s")
+        else:
+            logger.warning(f"'{record.label}' (pid {pid}) exited with status {code} after {runtime:.1f}s")
+
+    def _move_to_scope(self, record):
+        """Moves the child into a transient systemd scope via the user manager."""
+        try:
+            import gi
+            gi.require_version('Gio', '2.0')
+            from gi.repository import Gio, GLib
+
+            unit = f"tweak-flx1s-launch-{record.pid}.scope"
+            params = GLib.Variant("(ssa(sv)a(sa(sv)))", (
+                unit,
+                "fail",
+                [
+                    ("PIDs", GLib.Variant("au", [record.pid])),
+                    ("Description", GLib.Variant("s", f"Tweak-FLX1s: {record.label}"[:200])),
+                    ("CollectMode", GLib.Variant("s", "inactive-or-failed")),
+                ],
+                []
+            ))
+
+            bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+            args = ("org.freedesktop.systemd1", "/org/freedesktop/systemd1",
+                    "org.freedesktop.systemd1.Manager", "StartTransientUnit",
+                    params, GLib.VariantType("(o)"), Gio.DBusCallFlags.NONE, 1000, None)
+
+            if self._main_loop_running():
+                bus.call(*args, self._on_scope_started, record)
+            else:
+                bus.call_sync(*args)
+                record.scope = unit
+                logger.debug(f"Placed pid {record.pid} in {unit}")
+        except Exception as e:
+            logger.warning(f"Could not place pid {record.pid} in a systemd scope: {e}")
+
+    def _on_scope_started(self, bus, result, record):
+        try:
+            bus.call_finish(result)
+            record.scope = f"tweak-flx1s-launch-{record.pid}.scope"
+            logger.debug(f"Placed pid {record.pid} in {record.scope}")
+        except Exception as e:
+            logger.warning(f"Could not place pid {record.pid} in a systemd scope: {e}")
+
+    def report(self):
+        """Returns per-action launch counts and mean latency."""
+        summary = {}
+        for label, entry in self.stats.items():
+            spawns = entry["spawns"]
+            summary[label] = {
+                "spawns": spawns,
+                "failures": entry["failures"],
+                "mean_latency_ms": entry["latency_ms"] / spawns if spawns else 0.0,
+                "running": sum(1 for r in self.children.values() if r.label == label),
+            }
+        return summary
+
+_launcher = None
+
+def get_launcher():
+    """Returns the process-wide launcher."""
+    global _launcher
+    if _launcher is None:
+        _launcher = Launcher()
+    return _launcher
@@ -0,0 +1,235 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import time
+import queue
+import shutil
+import datetime
+import threading
+import subprocess
+from gi.repository import Gio, GLib
+from loguru import logger
+from tweak_flx1s.const import HOME_DIR, CACHE_DIR, RUNTIME_DIR
+from tweak_flx1s.core.bus import get_proxy, call as bus_call, main_loop_running
+from tweak_flx1s.utils import send_notification
+
+SCREENSHOT_BUS_NAME = "org.gnome.Shell.Screenshot"
+SCREENSHOT_OBJECT_PATH = "/org/gnome/Shell/Screenshot"
+SCREENSHOT_INTERFACE = "org.gnome.Shell.Screenshot"
+
+THUMBNAIL_DIR = os.path.join(CACHE_DIR, "thumbnails")
+THUMBNAIL_SIZE = 256
+THUMBNAIL_KEEP = 10
+# The worker thread exits after this long without jobs. One-shot processes
+# do not keep it around, they exit as soon as the queue is drained.
+WORKER_IDLE_TIMEOUT = 5
+
+TARGETS = ("file", "clipboard")
+
+class ScreenshotJob:
+    """A capture that still needs to be stored and announced."""
+    def __init__(self, capture_path, target, dest_path):
+        self.capture_path = capture_path
+        self.target = target
+        self.dest_path = dest_path
+
+class ScreenshotPipeline:
+    """
+    Captures screenshots through org.gnome.Shell.Screenshot into the runtime
+    directory (tmpfs) and hands them to a background worker, which copies
+    them to the clipboard or Pictures, renders a thumbnail and notifies.
+    The capturing caller never waits for the worker.
+    """
+
+    def __init__(self):
+        self.jobs = queue.Queue()
+        self.worker = None
+        self.lock = threading.Lock()
+        self.counter = 0
+        self.idle_timeout = WORKER_IDLE_TIMEOUT
+
+    def _pictures_dir(self):
+        return GLib.get_user_special_dir(GLib.UserDirectory.DIRECTORY_PICTURES) or f"{HOME_DIR}/Pictures"
+
+    def _capture_paths(self):
+        self.counter += 1
+        stamp = datetime.datetime.now().strftime("%F-%T")
+        suffix = f"-{self.counter}" if self.counter > 1 else ""
+        capture = os.path.join(RUNTIME_DIR, f"tweak-flx1s-screenshot-{os.getpid()}{suffix}.png")
+        dest = os.path.join(self._pictures_dir(), f"Screenshot-{stamp}{suffix}.png")
+        return capture, dest
+
+    def _select_area(self, proxy):
+        """Lets the user drag a region. Returns (x, y, w, h) or None."""
+        try:
+            return proxy.call_sync("SelectArea", None, Gio.DBusCallFlags.NONE, -1, None).unpack()
+        except GLib.Error as e:
+            logger.error(f"Area selection failed: {e.message}")
+            return None
+
+    def capture(self, target="file", area=None, window=False, burst=1, interval_ms=500):
+        """
+        Takes one or more screenshots.
+        area: None for the full screen, "select" to pick interactively, or (x, y, w, h).
+        """
+        if target not in TARGETS:
+            logger.error(f"Unknown screenshot target: {target}")
+            return
+
+        try:
+            proxy = get_proxy(SCREENSHOT_BUS_NAME, SCREENSHOT_OBJECT_PATH, SCREENSHOT_INTERFACE)
+        except GLib.Error as e:
+            logger.error(f"Screenshot failed: {e}")
+            return
+
+        if area == "select":
+            area = self._select_area(proxy)
+            if area is None:
+                return
+
+        def shoot(remaining):
+            self._capture_one(proxy, target, area, window)
+            return remaining - 1
+
+        remaining = max(1, burst)
+        if main_loop_running():
+            def on_timeout():
+                nonlocal remaining
+                remaining = shoot(remaining)
+                return remaining > 0
+            remaining = shoot(remaining)
+            if remaining > 0:
+                GLib.timeout_add(interval_ms, on_timeout)
+            return
+
+        while remaining > 0:
+            remaining = shoot(remaining)
+            if remaining > 0:
+                time.sleep(interval_ms / 1000)
+
+    def _capture_one(self, proxy, target, area, window):
+        capture_path, dest_path = self._capture_paths()
+
+        if area:
+            x, y, w, h = area
+            method, params = "ScreenshotArea", GLib.Variant("(iiiibs)", (x, y, w, h, False, capture_path))
+        elif window:
+            method, params = "ScreenshotWindow", GLib.Variant("(bbbs)", (True, True, False, capture_path))
+        else:
+            method, params = "Screenshot", GLib.Variant("(bbs)", (True, False, capture_path))
+
+        logger.info(f"Capturing screenshot ({method}) for {target}")
+
+        def on_done(result, error):
+            if error is not None:
+                return
+            success, used_path = result.unpack()
+            if not success:
+                logger.error("Shell reported a failed screenshot")
+                return
+            self.submit(ScreenshotJob(used_path or capture_path, target, dest_path))
+
+        bus_call(proxy, method, params, on_done)
+
+    def submit(self, job):
+        """Queues a capture for the background worker."""
+        self.jobs.put(job)
+        self.idle_timeout = WORKER_IDLE_TIMEOUT if main_loop_running() else 0
+        with self.lock:
+            if self.worker is None or not self.worker.is_alive():
+                # Not a daemon thread, so one-shot processes finish queued jobs before exiting.
+                self.worker = threading.Thread(target=self._work, name="screenshot-worker")
+                self.worker.start()
+
+    def _work(self):
+        while True:
+            try:
+                job = self.jobs.get(timeout=self.idle_timeout) if self.idle_timeout else self.jobs.get_nowait()
+            except queue.Empty:
+                with self.lock:
+                    if self.jobs.empty():
+                        self.worker = None
+                        return
+                continue
+            try:
+                self._process(job)
+            except Exception as e:
+                logger.error(f"Failed to process screenshot: {e}")
+            finally:
+                self.jobs.task_done()
+
+    def _process(self, job):
+        thumbnail = self._thumbnail(job.capture_path, os.path.basename(job.dest_path))
+
+        if job.target == "clipboard":
+            with open(job.capture_path, "rb") as f:
+                subprocess.run(["wl-copy", "--type", "image/png"], stdin=f, check=False)
+            os.unlink(job.capture_path)
+            send_notification("Screenshot Copied", "The screenshot is on the clipboard.",
+                              icon_name="camera-photo", image_path=thumbnail)
+        else:
+            os.makedirs(os.path.dirname(job.dest_path), exist_ok=True)
+            shutil.move(job.capture_path, job.dest_path)
+            send_notification("Screenshot Taken", f"Saved to {job.dest_path}",
+                              icon_name="camera-photo", image_path=thumbnail)
+
+    def _thumbnail(self, path, name):
+        """Scales the capture down for the notification icon. Returns None if GdkPixbuf is missing."""
+        try:
+            import gi
+            gi.require_version('GdkPixbuf', '2.0')
+            from gi.repository import GdkPixbuf
+        except (ImportError, ValueError):
+            return None
+
+        try:
+            os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+            thumb_path = os.path.join(THUMBNAIL_DIR, name)
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(path, THUMBNAIL_SIZE, THUMBNAIL_SIZE, True)
+            pixbuf.savev(thumb_path, "png", [], [])
+        except GLib.Error as e:
+            logger.debug(f"Thumbnail failed: {e}")
+            return None
+
+        old = sorted((os.path.join(THUMBNAIL_DIR, n) for n in os.listdir(THUMBNAIL_DIR)), key=os.path.getmtime)
+        for stale in old[:-THUMBNAIL_KEEP]:
+            try:
+                os.unlink(stale)
+            except OSError:
+                pass
+        return thumb_path
+
+    def wait(self):
+        """Blocks until every queued capture has been processed."""
+        self.jobs.join()
+
+_pipeline = None
+
+def get_pipeline():
+    """Returns the process-wide screenshot pipeline."""
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = ScreenshotPipeline()
+    return _pipeline
+
+def parse_area(value):
+    """Parses an --area argument: 'select' or 'x,y,w,h'."""
+    if value is None or value == "select":
+        return value
+    parts = value.split(",")
+    if len(parts) != 4:
+        raise ValueError(f"Invalid area '{value}', expected x,y,w,h")
+    return tuple(int(p) for p in parts)
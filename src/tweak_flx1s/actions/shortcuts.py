@@ -13,131 +13,174 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import codecs
 import datetime
-from gi.repository import Gio, GLib
+import subprocess
+from gi.repository import GLib, Gio
 from tweak_flx1s.utils import logger, run_command, send_notification
 from tweak_flx1s.const import HOME_DIR
+from tweak_flx1s.core.bus import get_proxy, call as bus_call
+from tweak_flx1s.core.trace import traced
+from tweak_flx1s.backends import get_backend
 
-class ShortcutsManager:
-    def __init__(self):
-        pass
-
-    def take_screenshot(self):
-        """Takes a screenshot and notifies the user."""
-        timestamp = datetime.datetime.now().strftime("%F-%T")
-        pictures_dir = run_command("xdg-user-dir PICTURES") or f"{HOME_DIR}/Pictures"
-        path = f"{pictures_dir}/Screenshot-{timestamp}.png"
-
-        logger.info(f"Taking screenshot: {path}")
-
-        bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
-        proxy = Gio.DBusProxy.new_sync(
-            bus,
-            Gio.DBusProxyFlags.NONE,
-            None,
-            "org.gnome.Shell.Screenshot",
-            "/org/gnome/Shell/Screenshot",
-            "org.gnome.Shell.Screenshot",
-            None
-        )
+FLASHLIGHT_BUS_NAME = "io.furios.Flashlightd"
+FLASHLIGHT_OBJECT_PATH = "/io/furios/Flashlightd"
+FLASHLIGHT_INTERFACE = "io.furios.Flashlightd"
 
-        try:
-            proxy.call_sync(
-                "Screenshot",
-                GLib.Variant("(bbs)", (True, False, path)),
-                Gio.DBusCallFlags.NONE,
-                -1,
-                None
-            )
-            send_notification("Screenshot Taken", f"Saved to {path}", icon_name="camera-photo")
-        except Exception as e:
-            logger.error(f"Screenshot failed: {e}")
+PASTE_MIME_TYPES = ["text/plain;charset=utf-8", "UTF8_STRING", "text/plain", "TEXT", "STRING"]
+PASTE_CHUNK_SIZE = 4096
 
+class ShortcutsManager:
+    def __init__(self, backend=None):
+        self.backend = backend or get_backend()
+
+    @traced("shortcut.screenshot")
+    def take_screenshot(self, target="file", area=None, window=False, burst=1, interval_ms=500):
+        """
+        Takes a screenshot to a file or the clipboard.
+        Storing, thumbnailing and notifying happen on a background worker.
+        """
+        from tweak_flx1s.actions.screenshot import get_pipeline
+        get_pipeline().capture(target=target, area=area, window=window, burst=burst, interval_ms=interval_ms)
+
+    @traced("shortcut.flashlight")
     def toggle_flashlight(self):
         """Toggles the flashlight on or off."""
-        bus_name = "io.furios.Flashlightd"
-        object_path = "/io/furios/Flashlightd"
-        interface = "io.furios.Flashlightd"
-
-        bus = Gio.bus_get_sync(Gio.BusType.SESSION, None)
         try:
-            proxy = Gio.DBusProxy.new_sync(
-                bus, Gio.DBusProxyFlags.NONE, None, bus_name, object_path, interface, None
-            )
-
-            props = Gio.DBusProxy.new_sync(
-                bus, Gio.DBusProxyFlags.NONE, None, bus_name, object_path, "org.freedesktop.DBus.Properties", None
-            )
-            current = props.call_sync(
-                "Get", GLib.Variant("(ss)", (interface, "Brightness")), Gio.DBusCallFlags.NONE, -1, None
-            ).unpack()[0]
-
-            if current == 0:
-                logger.info("Turning flashlight ON")
-                max_b = props.call_sync(
-                    "Get", GLib.Variant("(ss)", (interface, "MaxBrightness")), Gio.DBusCallFlags.NONE, -1, None
-                ).unpack()[0]
-
-                proxy.call_sync("SetBrightness", GLib.Variant("(u)", (max_b,)), Gio.DBusCallFlags.NONE, -1, None)
-            else:
-                logger.info("Turning flashlight OFF")
-                proxy.call_sync("SetBrightness", GLib.Variant("(u)", (0,)), Gio.DBusCallFlags.NONE, -1, None)
-
-        except Exception as e:
+            proxy = get_proxy(FLASHLIGHT_BUS_NAME, FLASHLIGHT_OBJECT_PATH, FLASHLIGHT_INTERFACE)
+        except GLib.Error as e:
             logger.error(f"Flashlight error: {e}")
+            return
+
+        # Flashlightd does not emit PropertiesChanged, so the cached Brightness
+        # goes stale when the light is switched elsewhere, e.g. from quick
+        # settings. Read it fresh; MaxBrightness does not change.
+        try:
+            current, = proxy.call_sync("org.freedesktop.DBus.Properties.Get",
+                                       GLib.Variant("(ss)", (FLASHLIGHT_INTERFACE, "Brightness")),
+                                       Gio.DBusCallFlags.NONE, 1000, None).unpack()
+        except GLib.Error as e:
+            logger.error(f"Flashlight error: {e.message}")
+            return
+        max_b = proxy.get_cached_property("MaxBrightness")
+        if max_b is None:
+            logger.error("Flashlight error: brightness properties unavailable")
+            return
+
+        if current == 0:
+            logger.info("Turning flashlight ON")
+            target = max_b.unpack()
+        else:
+            logger.info("Turning flashlight OFF")
+            target = 0
+
+        bus_call(proxy, "SetBrightness", GLib.Variant("(u)", (target,)))
 
+    @traced("shortcut.kill_window")
     def kill_active_window(self):
         """Simulates Alt+F4 to close the active window."""
+        from tweak_flx1s.actions.keys import send_keys
         logger.info("Killing active window (Alt+F4 simulation)")
-        run_command("wtype -M alt -P F4 -m alt -p F4")
+        send_keys("alt+F4")
 
+    @traced("shortcut.kill_ram_eaters")
     def kill_ram_eaters(self):
-        """Kills processes consuming high CPU or Memory."""
-        import psutil
+        """Terminates the process using the most memory, skipping protected ones."""
+        from tweak_flx1s.system.memory import load_config, list_candidates, terminate
 
-        exclude = ["systemd", "bash", "sshd", "phosh", "gnome-shell"]
-        killed = []
+        candidates = list_candidates(load_config(), limit=1)
+        if not candidates:
+            send_notification("Nothing to Close", "No app is using enough memory")
+            return
 
-        for proc in psutil.process_iter(['pid', 'name', 'memory_percent', 'cpu_percent']):
-            try:
-                if proc.info['name'] in exclude: continue
-
-                if proc.info['memory_percent'] > 80 or proc.info['cpu_percent'] > 80:
-                    logger.info(f"Killing {proc.info['name']} (PID {proc.info['pid']})")
-                    proc.kill()
-                    killed.append(proc.info['name'])
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                pass
-
-        if killed:
-             send_notification("Killed High Usage Apps", ", ".join(killed))
+        victim = candidates[0]
+        logger.info(f"Killing {victim.name} (PID {victim.pid}, {victim.pss_mb} MB)")
+        if terminate(victim.pid):
+            send_notification("Killed High Usage App", f"{victim.name} ({victim.pss_mb} MB)")
 
+    @traced("shortcut.scale")
     def set_scale(self, scale):
         """Sets the display scale using wlr-randr."""
         logger.info(f"Setting display scale to {scale}")
-        run_command(f"wlr-randr --output 'HWCOMPOSER-1' --scale {scale}")
-
-    def take_picture(self):
-         """Takes a photo using gst-launch."""
-         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-         pictures_dir = f"{HOME_DIR}/Pictures"
-         filename = f"{pictures_dir}/photo_{timestamp}.jpeg"
-
-         cmd = (
-            f"gst-launch-1.0 -e droidcamsrc camera-device=0 mode=2 ! "
-            f"videoconvert ! videoflip video-direction=8 ! jpegenc snapshot=true ! "
-            f"filesink location='{filename}'"
-         )
-         try:
-            run_command(cmd)
-            send_notification("Picture Taken", f"Saved to {filename}")
-         except Exception as e:
+        self.backend.display.set_scale(scale)
+
+    @traced("shortcut.picture")
+    def take_picture(self, burst=1, interval_ms=0):
+        """
+        Takes a photo. The camera service keeps the pipeline warm between
+        shots; without it the camera is opened for this call only.
+        """
+        from tweak_flx1s.const import CAMERA_SOCKET
+        from tweak_flx1s.core import ipc
+
+        reply = ipc.request(CAMERA_SOCKET, {"burst": burst, "interval_ms": interval_ms}, timeout=30)
+        if reply is not None:
+            if reply.get("ok"):
+                return
+            logger.warning(f"Camera service failed: {reply.get('error')}")
+
+        from tweak_flx1s.actions.camera import CameraPipeline, CameraError
+        camera = CameraPipeline(keep_warm=0)
+        try:
+            camera.shoot(burst=burst, interval_ms=interval_ms)
+        except CameraError as e:
             logger.error(f"Failed to take picture: {e}")
 
-    def paste_clipboard(self):
-        """Pastes content from clipboard or notifies if empty."""
-        content = run_command("wl-paste", check=False)
-        if not content:
+    def _select_paste_mime(self, preferred=None):
+        """Picks the MIME type to paste: the preferred one if offered, else the best text type."""
+        offered = (run_command(["wl-paste", "--list-types"], check=False) or "").splitlines()
+        if preferred:
+            return preferred if preferred in offered else None
+        for mime in PASTE_MIME_TYPES:
+            if mime in offered:
+                return mime
+        for mime in offered:
+            if mime.startswith("text/"):
+                return mime
+        return None
+
+    def _clipboard_chunks(self, mime):
+        """Yields decoded clipboard text read from wl-paste in fixed-size chunks."""
+        proc = subprocess.Popen(["wl-paste", "--no-newline", "--type", mime],
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        try:
+            while True:
+                data = proc.stdout.read1(PASTE_CHUNK_SIZE)
+                if not data:
+                    break
+                text = decoder.decode(data)
+                if text:
+                    yield text
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+        finally:
+            proc.stdout.close()
+            proc.wait()
+
+    @traced("shortcut.paste")
+    def paste_clipboard(self, mime=None, delay_ms=0):
+        """
+        Types the clipboard content or notifies if empty.
+        Content is streamed from wl-paste, so size is not limited by argv or memory.
+        """
+        from tweak_flx1s.actions.keys import type_stream
+
+        selected = self._select_paste_mime(mime)
+        if not selected:
+            send_notification("Clipboard Empty", "Nothing to paste." if not mime else f"No {mime} content to paste.")
+            return
+
+        logger.info(f"Pasting clipboard as {selected}")
+        chunks = self._clipboard_chunks(selected)
+        first = next(chunks, None)
+        if first is None:
             send_notification("Clipboard Empty", "Nothing to paste.")
-        else:
-            run_command(["wtype", content], check=False)
+            return
+
+        def all_chunks():
+            yield first
+            yield from chunks
+
+        type_stream(all_chunks(), delay_ms)
@@ -0,0 +1,52 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+System access behind one interface: packages, alternatives, settings,
+mounts, ACLs, services, input injection, display and audio.
+
+Managers take a backend argument and otherwise use get_backend(), which is
+the real system unless set_backend() installed another one, such as
+backends.fake.FakeBackend for running the GUI and actions off the phone.
+"""
+
+class Backend:
+    """A set of system access implementations, one attribute per area."""
+
+    def __init__(self, packages, alternatives, settings, mounts, acl, services, input, display, audio):
+        self.packages = packages
+        self.alternatives = alternatives
+        self.settings = settings
+        self.mounts = mounts
+        self.acl = acl
+        self.services = services
+        self.input = input
+        self.display = display
+        self.audio = audio
+
+_backend = None
+
+def get_backend():
+    """Returns the process-wide backend, the real system by default."""
+    global _backend
+    if _backend is None:
+        from tweak_flx1s.backends.real import SystemBackend
+        _backend = SystemBackend()
+    return _backend
+
+def set_backend(backend):
+    """Replaces the process-wide backend. Managers created afterwards use it."""
+    global _backend
+    _backend = backend
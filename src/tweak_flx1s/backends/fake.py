@@ -0,0 +1,228 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+In-memory system for running managers, pages and actions off the phone.
+
+    from tweak_flx1s.backends import set_backend
+    from tweak_flx1s.backends.fake import FakeBackend
+
+    backend = FakeBackend(packages=[f"pkg{i}" for i in range(5000)])
+    set_backend(backend)
+    ...
+    print(backend.log)     # [("services.start", "tweak-flx1s-gestures.service"), ...]
+
+Nothing runs a command; every change is recorded in backend.log and kept in
+the state, so later queries see it.
+"""
+
+import subprocess
+from tweak_flx1s.backends import Backend
+
+class FakePackages:
+    def __init__(self, log, installed):
+        self.log = log
+        self._installed = set(installed)
+
+    def installed(self):
+        return self._installed
+
+    def is_installed(self, name):
+        return name in self._installed
+
+    def install(self, names):
+        self.log.append(("packages.install", tuple(names)))
+        self._installed.update(names)
+
+class FakeAlternatives:
+    def __init__(self, log, alternatives):
+        self.log = log
+        # name -> {"value": path, "alternatives": [{"path", "priority"}, ...]}
+        self.groups = alternatives
+
+    def query(self, name):
+        group = self.groups.get(name, {})
+        return {"value": group.get("value"), "alternatives": [dict(a) for a in group.get("alternatives", [])]}
+
+class FakeSettings:
+    def __init__(self, log, settings):
+        self.log = log
+        # (schema, key) -> value
+        self.values = settings
+        # handle -> (schema, key, callback)
+        self.watches = {}
+        self.next_handle = 1
+
+    def get(self, schema, key):
+        return self.values.get((schema, key))
+
+    def get_variant(self, schema, key):
+        return self.values.get((schema, key))
+
+    def set(self, schema, key, value):
+        """Writes value and, like dconf, notifies watchers if it changed."""
+        self.log.append(("settings.set", schema, key, value))
+        changed = self.values.get((schema, key)) != value
+        self.values[(schema, key)] = value
+        if changed:
+            for watch_schema, watch_key, callback in list(self.watches.values()):
+                if (watch_schema, watch_key) == (schema, key):
+                    callback(value)
+        return True
+
+    def connect(self, schema, key, callback):
+        handle = self.next_handle
+        self.next_handle += 1
+        self.watches[handle] = (schema, key, callback)
+        return handle
+
+    def disconnect(self, handle):
+        self.watches.pop(handle, None)
+
+class FakeMounts:
+    def __init__(self, log, mounts):
+        self.log = log
+        self.mounts = [dict(m) for m in mounts]
+
+    def list(self):
+        return [dict(m) for m in self.mounts]
+
+    def bind(self, source, target):
+        self.log.append(("mounts.bind", source, target))
+        self.mounts.append({"source": source, "target": target, "fstype": "none"})
+
+    def unmount(self, target, lazy=True):
+        self.log.append(("mounts.unmount", target))
+        for i in range(len(self.mounts) - 1, -1, -1):
+            if self.mounts[i]["target"] == target:
+                del self.mounts[i]
+                return
+        raise subprocess.CalledProcessError(32, ["umount", target])
+
+class FakeAcl:
+    def __init__(self, log):
+        self.log = log
+        # path -> set of users
+        self.grants = {}
+
+    def grant(self, path, users, recursive=False, check=True):
+        self.log.append(("acl.grant", path, tuple(users), recursive))
+        self.grants.setdefault(path, set()).update(users)
+
+class FakeServices:
+    def __init__(self, log, enabled, active):
+        self.log = log
+        # Units are keyed by (unit, user) so the system and user managers stay apart.
+        self.enabled = {(unit, True) for unit in enabled}
+        self.active = {(unit, True) for unit in active}
+        self.masked = set()
+        self.reloads = 0
+
+    def _record(self, op, unit, user):
+        self.log.append((f"services.{op}", unit) if user else (f"services.{op}", unit, "system"))
+
+    def enable(self, unit, user=True, check=True):
+        self._record("enable", unit, user)
+        self.enabled.add((unit, user))
+
+    def disable(self, unit, user=True, check=True):
+        self._record("disable", unit, user)
+        self.enabled.discard((unit, user))
+
+    def start(self, unit, user=True, check=True):
+        self._record("start", unit, user)
+        if (unit, user) in self.masked:
+            if check:
+                raise subprocess.CalledProcessError(1, ["systemctl", "start", unit])
+            return
+        self.active.add((unit, user))
+
+    def stop(self, unit, user=True, check=True):
+        self._record("stop", unit, user)
+        self.active.discard((unit, user))
+
+    def restart(self, unit, user=True, check=True):
+        self.start(unit, user, check)
+
+    def try_restart(self, unit, user=True, check=True):
+        self._record("try-restart", unit, user)
+
+    def mask(self, unit, user=True, check=True):
+        self._record("mask", unit, user)
+        self.masked.add((unit, user))
+
+    def unmask(self, unit, user=True, check=True):
+        self._record("unmask", unit, user)
+        self.masked.discard((unit, user))
+
+    def daemon_reload(self, user=True, check=True):
+        self.reloads += 1
+
+    def is_enabled(self, unit, user=True):
+        if (unit, user) in self.masked:
+            return "masked"
+        return "enabled" if (unit, user) in self.enabled else "disabled"
+
+    def is_active(self, unit, user=True):
+        return (unit, user) in self.active
+
+class FakeInput:
+    def __init__(self, log):
+        self.log = log
+
+    def key(self, keysym, release=True):
+        self.log.append(("input.key", keysym, release))
+
+class FakeDisplay:
+    def __init__(self, log):
+        self.log = log
+        self.scale = 1.0
+
+    def set_scale(self, scale, output=None):
+        self.log.append(("display.set_scale", scale))
+        self.scale = float(scale)
+
+class FakeAudio:
+    def __init__(self, log):
+        self.log = log
+        self.volume = 50
+        self.muted = False
+
+    def set_master_volume(self, percent, unmute=True):
+        self.log.append(("audio.set_master_volume", percent, unmute))
+        self.volume = percent
+        if unmute:
+            self.muted = False
+
+class FakeBackend(Backend):
+    """
+    A seeded in-memory system. packages and active/enabled units are name
+    lists, alternatives maps a name to {"value", "alternatives"}, settings maps
+    (schema, key) to a value and mounts is a list of {"source", "target", "fstype"}.
+    """
+
+    def __init__(self, packages=(), alternatives=None, settings=None, mounts=(), enabled=(), active=()):
+        self.log = []
+        super().__init__(
+            packages=FakePackages(self.log, packages),
+            alternatives=FakeAlternatives(self.log, alternatives or {}),
+            settings=FakeSettings(self.log, settings or {}),
+            mounts=FakeMounts(self.log, mounts),
+            acl=FakeAcl(self.log),
+            services=FakeServices(self.log, enabled, active),
+            input=FakeInput(self.log),
+            display=FakeDisplay(self.log),
+            audio=FakeAudio(self.log),
+        )
@@ -0,0 +1,302 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import subprocess
+from loguru import logger
+from tweak_flx1s.utils import run_command
+from tweak_flx1s.backends import Backend
+
+DPKG_STATUS = "/var/lib/dpkg/status"
+PROC_MOUNTS = "/proc/self/mounts"
+DISPLAY_OUTPUT = "HWCOMPOSER-1"
+
+SYSTEMD_NAME = "org.freedesktop.systemd1"
+SYSTEMD_PATH = "/org/freedesktop/systemd1"
+SYSTEMD_MANAGER = "org.freedesktop.systemd1.Manager"
+
+class Packages:
+    """Installed packages, read from the dpkg database instead of one dpkg -s per query."""
+
+    def __init__(self, status_path=DPKG_STATUS):
+        self.status_path = status_path
+        self._mtime = None
+        self._installed = set()
+
+    def installed(self):
+        """Names of the installed packages. Re-read only when the database changes."""
+        try:
+            mtime = os.stat(self.status_path).st_mtime_ns
+        except OSError as e:
+            logger.warning(f"Cannot read {self.status_path}: {e}")
+            return set()
+        if mtime != self._mtime:
+            self._installed = self._parse()
+            self._mtime = mtime
+        return self._installed
+
+    def _parse(self):
+        installed = set()
+        name = None
+        with open(self.status_path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if line.startswith("Package:"):
+                    name = line[8:].strip()
+                elif line.startswith("Status:") and name and line.split()[-1] == "installed":
+                    installed.add(name)
+                elif line == "\n":
+                    name = None
+        return installed
+
+    def is_installed(self, name):
+        return name in self.installed()
+
+    def install(self, names):
+        """Installs packages with apt-get. Needs root."""
+        run_command(["apt-get", "install", "-y"] + list(names))
+
+class Alternatives:
+    def query(self, name):
+        """{"value": selected path or None, "alternatives": [{"path", "priority"}, ...]}."""
+        out = run_command(["update-alternatives", "--query", name], check=False)
+        result = {"value": None, "alternatives": []}
+        if not out:
+            return result
+        for block in out.split("\n\n"):
+            entry = {}
+            for line in block.splitlines():
+                key, _, value = line.partition(":")
+                value = value.strip()
+                if key == "Value":
+                    result["value"] = value
+                elif key == "Alternative":
+                    entry["path"] = value
+                elif key == "Priority":
+                    entry["priority"] = int(value) if value.isdigit() else 0
+            if "path" in entry:
+                entry.setdefault("priority", 0)
+                result["alternatives"].append(entry)
+        return result
+
+class Settings:
+    """
+    GSettings access. One Gio.Settings per schema is kept for the process, so
+    reads and writes stay in-process and connect() can follow changes made
+    elsewhere, e.g. in GNOME Settings. Unknown schemas read as None and are not
+    written.
+    """
+
+    def __init__(self):
+        self._settings = {}
+
+    def _get_settings(self, schema):
+        if schema not in self._settings:
+            from gi.repository import Gio
+            source = Gio.SettingsSchemaSource.get_default()
+            if source is None or source.lookup(schema, True) is None:
+                logger.warning(f"GSettings schema {schema} is not installed")
+                self._settings[schema] = None
+            else:
+                self._settings[schema] = Gio.Settings.new(schema)
+        return self._settings[schema]
+
+    def get(self, schema, key):
+        settings = self._get_settings(schema)
+        if settings is None:
+            return None
+        return settings.get_value(key).unpack()
+
+    def get_variant(self, schema, key):
+        """The value as a GLib.Variant, for types that do not survive unpacking such as av."""
+        settings = self._get_settings(schema)
+        if settings is None:
+            return None
+        return settings.get_value(key)
+
+    def set(self, schema, key, value):
+        """Writes value, a plain Python value of the key's type or a GLib.Variant."""
+        from gi.repository import Gio, GLib
+        settings = self._get_settings(schema)
+        if settings is None:
+            return False
+        if not isinstance(value, GLib.Variant):
+            value = GLib.Variant(settings.get_value(key).get_type_string(), value)
+        settings.set_value(key, value)
+        # Short-lived processes exit before the write would otherwise be flushed.
+        Gio.Settings.sync()
+        return True
+
+    def connect(self, schema, key, callback):
+        """
+        Calls callback(value) from the main loop whenever key changes, by this
+        or another process. Returns a handle for disconnect(), or None if the
+        schema is not installed.
+        """
+        settings = self._get_settings(schema)
+        if settings is None:
+            return None
+        handler_id = settings.connect(f"changed::{key}", lambda s, k: callback(s.get_value(k).unpack()))
+        # dconf only reports changes to keys that were read after connecting.
+        settings.get_value(key)
+        return (schema, handler_id)
+
+    def disconnect(self, handle):
+        if handle is not None:
+            schema, handler_id = handle
+            self._settings[schema].disconnect(handler_id)
+
+def _unescape_mount_field(field):
+    """Undoes the \\ooo escaping of /proc/self/mounts."""
+    if "\\" not in field:
+        return field
+    out = []
+    i = 0
+    while i < len(field):
+        if field[i] == "\\" and field[i + 1:i + 4].isdigit():
+            out.append(chr(int(field[i + 1:i + 4], 8)))
+            i += 4
+        else:
+            out.append(field[i])
+            i += 1
+    return "".join(out)
+
+class Mounts:
+    def list(self):
+        """[{"source", "target", "fstype"}, ...] of the current mounts."""
+        mounts = []
+        try:
+            with open(PROC_MOUNTS) as f:
+                for line in f:
+                    fields = line.split()
+                    if len(fields) < 3:
+                        continue
+                    # Spaces and other specials in paths are octal escaped.
+                    source, target = (_unescape_mount_field(field) for field in fields[:2])
+                    mounts.append({"source": source, "target": target, "fstype": fields[2]})
+        except OSError as e:
+            logger.error(f"Cannot read {PROC_MOUNTS}: {e}")
+        return mounts
+
+    def bind(self, source, target):
+        run_command(["mount", "--bind", source, target])
+
+    def unmount(self, target, lazy=True):
+        run_command(["umount", "-l", target] if lazy else ["umount", target])
+
+class Acl:
+    def grant(self, path, users, recursive=False, check=True):
+        """Gives each user (name or uid) rwx on path, and as a default ACL on directories when recursive."""
+        entries = ["m:rwx"]
+        for user in users:
+            entries.append(f"u:{user}:rwx")
+            if recursive:
+                entries.append(f"d:u:{user}:rwx")
+        cmd = ["setfacl"] + (["-R"] if recursive else []) + ["-m", ",".join(entries), path]
+        run_command(cmd, check=check)
+
+class Services:
+    """systemd units, on the user manager by default. check=True raises on failure like run_command."""
+
+    def _systemctl(self, args, user, check):
+        cmd = ["systemctl"] + (["--user"] if user else []) + args
+        logger.debug(f"Running command: {' '.join(cmd)}")
+        result = subprocess.run(cmd, text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if result.returncode != 0:
+            if check:
+                raise subprocess.CalledProcessError(result.returncode, cmd, result.stdout, result.stderr)
+            logger.debug(f"{' '.join(cmd)} failed: {result.stderr.strip()}")
+        return result
+
+    def enable(self, unit, user=True, check=True):
+        self._systemctl(["enable", unit], user, check)
+
+    def disable(self, unit, user=True, check=True):
+        self._systemctl(["disable", unit], user, check)
+
+    def start(self, unit, user=True, check=True):
+        self._systemctl(["start", unit], user, check)
+
+    def stop(self, unit, user=True, check=True):
+        self._systemctl(["stop", unit], user, check)
+
+    def restart(self, unit, user=True, check=True):
+        self._systemctl(["restart", unit], user, check)
+
+    def try_restart(self, unit, user=True, check=True):
+        self._systemctl(["try-restart", unit], user, check)
+
+    def mask(self, unit, user=True, check=True):
+        self._systemctl(["mask", unit], user, check)
+
+    def unmask(self, unit, user=True, check=True):
+        self._systemctl(["unmask", unit], user, check)
+
+    def daemon_reload(self, user=True, check=True):
+        self._systemctl(["daemon-reload"], user, check)
+
+    def is_enabled(self, unit, user=True):
+        """The unit file state, e.g. "enabled", "disabled", "masked", or "" if unknown."""
+        return self._systemctl(["is-enabled", unit], user, False).stdout.strip()
+
+    def is_active(self, unit, user=True):
+        """Reads ActiveState over D-Bus; systemctl is only forked if the manager cannot be reached."""
+        from gi.repository import Gio, GLib
+        try:
+            bus = Gio.bus_get_sync(Gio.BusType.SESSION if user else Gio.BusType.SYSTEM, None)
+            try:
+                path, = bus.call_sync(SYSTEMD_NAME, SYSTEMD_PATH, SYSTEMD_MANAGER, "GetUnit",
+                                      GLib.Variant("(s)", (unit,)), GLib.VariantType("(o)"),
+                                      Gio.DBusCallFlags.NONE, 1000, None).unpack()
+            except GLib.Error as e:
+                # Units that are not loaded are not active.
+                if Gio.DBusError.get_remote_error(e) == "org.freedesktop.systemd1.NoSuchUnit":
+                    return False
+                raise
+            state, = bus.call_sync(SYSTEMD_NAME, path, "org.freedesktop.DBus.Properties", "Get",
+                                   GLib.Variant("(ss)", ("org.freedesktop.systemd1.Unit", "ActiveState")),
+                                   GLib.VariantType("(v)"), Gio.DBusCallFlags.NONE, 1000, None).unpack()
+            return state in ("active", "reloading")
+        except GLib.Error as e:
+            logger.debug(f"Cannot read ActiveState of {unit} over D-Bus: {e.message}")
+            return self._systemctl(["is-active", "--quiet", unit], user, False).returncode == 0
+
+class Input:
+    def key(self, keysym, release=True):
+        """Presses, and unless release is False releases, a key by keysym name."""
+        run_command(["wtype", "-k" if release else "-P", keysym], check=False)
+
+class Display:
+    def set_scale(self, scale, output=DISPLAY_OUTPUT):
+        run_command(["wlr-randr", "--output", output, "--scale", str(scale)])
+
+class Audio:
+    def set_master_volume(self, percent, unmute=True):
+        run_command(["amixer", "set", "Master", f"{percent}%"] + (["unmute"] if unmute else []), check=False)
+
+class SystemBackend(Backend):
+    """The phone itself."""
+
+    def __init__(self):
+        super().__init__(
+            packages=Packages(),
+            alternatives=Alternatives(),
+            settings=Settings(),
+            mounts=Mounts(),
+            acl=Acl(),
+            services=Services(),
+            input=Input(),
+            display=Display(),
+            audio=Audio(),
+        )
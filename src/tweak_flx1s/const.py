@@ -21,10 +21,23 @@ VERSION = "0.1.0"
 HOME_DIR = os.path.expanduser("~")
 CONFIG_DIR = os.path.join(HOME_DIR, ".config", "tweak-flx1s")
 CACHE_DIR = os.path.join(HOME_DIR, ".cache", "tweak-flx1s")
+RUNTIME_DIR = os.environ.get("XDG_RUNTIME_DIR") or f"/run/user/{os.getuid()}"
+
+KEYS_SOCKET = os.path.join(RUNTIME_DIR, "tweak-flx1s-keys.sock")
+CAMERA_SOCKET = os.path.join(RUNTIME_DIR, "tweak-flx1s-camera.sock")
+CLIPBOARD_SOCKET = os.path.join(RUNTIME_DIR, "tweak-flx1s-clipboard.sock")
+# Held locked by the press engine while it reads the assistant button.
+BUTTONS_LOCK = os.path.join(RUNTIME_DIR, "tweak-flx1s-buttons.lock")
 
 SERVICE_ALARM = "tweak-flx1s-alarm.service"
 SERVICE_GUARD = "tweak-flx1s-guard.service"
 SERVICE_GESTURES = "tweak-flx1s-gestures.service"
+SERVICE_KEYS = "tweak-flx1s-keys.service"
+SERVICE_CLIPBOARD = "tweak-flx1s-clipboard.service"
+SERVICE_CAMERA = "tweak-flx1s-camera.service"
+SERVICE_MEMORY = "tweak-flx1s-memory.service"
+SERVICE_BUTTONS = "tweak-flx1s-buttons.service"
+SERVICE_MONITORS = "tweak-flx1s-monitors.service"
 
 ANDROMEDA_ANDROID_MOUNT_BASE = os.path.join(HOME_DIR, "Android-Share")
 ANDROMEDA_LINUX_MOUNT_BASE_REL = ".local/share/andromeda/data/media/0/Linux-Share"
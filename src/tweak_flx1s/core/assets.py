@@ -0,0 +1,330 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Keeps copies of the bundled data (sounds, keyboard layouts, Wofi and GTK
+configs) in sync with /usr/share/tweak-flx1s by content hash.
+
+Each bundle directory may ship a MANIFEST_NAME listing its files with their
+SHA-256, written at build time:
+
+    python3 -m tweak_flx1s.core.assets manifest data/share/sounds/__custom ...
+
+Without one the source is hashed once and remembered like any other file.
+Hashes are cached in HASH_CACHE by path, size, mtime and inode, so checking
+a bundle costs a stat per file and a file is only read again after it
+changed. sync() copies only the files that differ, preferring a reflink or
+a kernel side copy, and applies them atomically: owned directories are
+rebuilt next to the target and renamed over it, shared ones get each file
+renamed into place.
+"""
+
+import os
+import sys
+import json
+import errno
+import fcntl
+import shutil
+import hashlib
+import tempfile
+from loguru import logger
+from tweak_flx1s.const import CACHE_DIR
+
+MANIFEST_NAME = ".tweak-flx1s-manifest.json"
+HASH_CACHE = os.path.join(CACHE_DIR, "asset-hashes.json")
+IGNORED = {MANIFEST_NAME, ".gitkeep"}
+
+# linux/fs.h: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+
+def _stat_key(st):
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class HashCache:
+    """path -> (size, mtime, inode, sha256), persisted in HASH_CACHE."""
+
+    def __init__(self, path=HASH_CACHE):
+        self.path = path
+        self.entries = None
+        self.dirty = False
+
+    def _load(self):
+        if self.entries is None:
+            try:
+                with open(self.path, 'r') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def hash(self, path, st=None):
+        """SHA-256 of path, read from disk only if its stat changed since last time."""
+        self._load()
+        if st is None:
+            st = os.stat(path)
+        key = _stat_key(st)
+        entry = self.entries.get(path)
+        if entry and entry[:3] == key:
+            return entry[3]
+        digest = _sha256(path)
+        self.remember(path, digest, st)
+        return digest
+
+    def remember(self, path, digest, st=None):
+        self._load()
+        if st is None:
+            st = os.stat(path)
+        self.entries[path] = _stat_key(st) + [digest]
+        self.dirty = True
+
+    def forget_under(self, directory):
+        self._load()
+        prefix = directory.rstrip(os.sep) + os.sep
+        for path in [p for p in self.entries if p.startswith(prefix)]:
+            del self.entries[path]
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path), prefix=".asset-hashes-")
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.entries, f)
+            os.replace(tmp, self.path)
+            self.dirty = False
+        except OSError as e:
+            logger.warning(f"Could not save asset hashes: {e}")
+
+_hash_cache = None
+
+def get_hash_cache():
+    global _hash_cache
+    if _hash_cache is None:
+        _hash_cache = HashCache()
+    return _hash_cache
+
+def scan(directory):
+    """Relative paths of the files under directory, without manifests and placeholders."""
+    files = []
+    for root, dirs, names in os.walk(directory):
+        dirs.sort()
+        for name in sorted(names):
+            if name not in IGNORED:
+                files.append(os.path.relpath(os.path.join(root, name), directory))
+    return files
+
+def write_manifest(directory):
+    manifest = {rel: _sha256(os.path.join(directory, rel)) for rel in scan(directory)}
+    with open(os.path.join(directory, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    return manifest
+
+def copy_file(src, dst, link=False):
+    """
+    Copies src to the new file dst: a hard link if link is set, else a
+    reflink, else copy_file_range, falling back to a plain copy across
+    filesystems that support neither. The mode is copied too.
+    """
+    if link:
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            pass
+    with open(src, 'rb') as fin, open(dst, 'wb') as fout:
+        try:
+            fcntl.ioctl(fout.fileno(), FICLONE, fin.fileno())
+        except OSError:
+            remaining = os.fstat(fin.fileno()).st_size
+            try:
+                while remaining > 0:
+                    copied = os.copy_file_range(fin.fileno(), fout.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            except (AttributeError, OSError) as e:
+                if isinstance(e, OSError) and e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                    raise
+                fin.seek(0)
+                fout.seek(0)
+                fout.truncate()
+                shutil.copyfileobj(fin, fout)
+    shutil.copymode(src, dst)
+
+class AssetBundle:
+    """
+    A bundled directory installed to target. files limits it to the named
+    files; by default it is every file in source. An owned bundle (prune)
+    has target to itself, so files missing from source are removed there
+    too and updates replace the whole directory. link allows hard links to
+    the source for read-only data.
+    """
+
+    def __init__(self, name, source, target, files=None, prune=False, link=False, hash_cache=None):
+        self.name = name
+        self.source = source
+        self.target = target
+        self.files = files
+        self.prune = prune
+        self.link = link
+        self.hashes = hash_cache or get_hash_cache()
+        self._manifest = None
+
+    def manifest(self):
+        """rel path -> SHA-256 of the source files, from the shipped manifest if there is one."""
+        if self._manifest is None:
+            manifest = None
+            try:
+                with open(os.path.join(self.source, MANIFEST_NAME), 'r') as f:
+                    manifest = json.load(f)
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring manifest of {self.name}: {e}")
+            if manifest is None:
+                manifest = {rel: self.hashes.hash(os.path.join(self.source, rel)) for rel in scan(self.source)}
+                self.hashes.save()
+            if self.files is not None:
+                manifest = {rel: manifest[rel] for rel in self.files if rel in manifest}
+            self._manifest = manifest
+        return self._manifest
+
+    def available(self):
+        return os.path.isdir(self.source)
+
+    def drift(self):
+        """Relative paths where target differs from source: changed, missing, or (pruned) extra."""
+        manifest = self.manifest()
+        changed = []
+        for rel, digest in manifest.items():
+            path = os.path.join(self.target, rel)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                changed.append(rel)
+                continue
+            if not os.path.isfile(path) or self.hashes.hash(path, st) != digest:
+                changed.append(rel)
+        if self.prune and os.path.isdir(self.target):
+            changed.extend(rel for rel in scan(self.target) if rel not in manifest)
+        self.hashes.save()
+        return changed
+
+    def in_sync(self):
+        try:
+            return self.available() and not self.drift()
+        except OSError as e:
+            logger.warning(f"Could not check {self.name}: {e}")
+            return False
+
+    def sync(self):
+        """
+        Brings target in line with source. Returns the number of files
+        copied, 0 when it was already in sync. Raises OSError on failure,
+        leaving target as it was.
+        """
+        if not self.available():
+            raise FileNotFoundError(errno.ENOENT, f"Source of {self.name} not found", self.source)
+        changed = self.drift()
+        if not changed:
+            logger.debug(f"{self.name} is up to date")
+            return 0
+        manifest = self.manifest()
+        to_copy = [rel for rel in changed if rel in manifest]
+        if self.prune:
+            self._replace_tree(to_copy)
+        else:
+            self._replace_files(to_copy)
+        self.hashes.save()
+        logger.info(f"Updated {len(to_copy)} of {len(manifest)} files of {self.name} in {self.target}")
+        return len(to_copy)
+
+    def _stage(self, staging, rel):
+        dst = os.path.join(staging, rel)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        copy_file(os.path.join(self.source, rel), dst, self.link)
+        return dst
+
+    def _replace_tree(self, to_copy):
+        """Builds the new directory beside target, reusing unchanged files as links, then swaps it in."""
+        parent = os.path.dirname(self.target.rstrip(os.sep))
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=parent, prefix=f".{os.path.basename(self.target)}.new-")
+        old = None
+        to_copy = set(to_copy)
+        try:
+            for rel in self.manifest():
+                if rel in to_copy:
+                    self._stage(staging, rel)
+                else:
+                    dst = os.path.join(staging, rel)
+                    os.makedirs(os.path.dirname(dst), exist_ok=True)
+                    copy_file(os.path.join(self.target, rel), dst, link=True)
+            # mkdtemp creates the directory 0700; give it the source's mode.
+            shutil.copymode(self.source, staging)
+            if os.path.lexists(self.target):
+                old = tempfile.mkdtemp(dir=parent, prefix=f".{os.path.basename(self.target)}.old-")
+                os.rename(self.target, os.path.join(old, "tree"))
+            os.rename(staging, self.target)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            if old is not None and not os.path.lexists(self.target):
+                os.rename(os.path.join(old, "tree"), self.target)
+            raise
+        finally:
+            if old is not None:
+                shutil.rmtree(old, ignore_errors=True)
+        self.hashes.forget_under(self.target)
+        for rel, digest in self.manifest().items():
+            self.hashes.remember(os.path.join(self.target, rel), digest)
+
+    def _replace_files(self, to_copy):
+        """Stages the changed files in target, then renames each over the old one."""
+        os.makedirs(self.target, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=self.target, prefix=".tweak-flx1s-new-")
+        try:
+            staged = [(rel, self._stage(staging, rel)) for rel in to_copy]
+            for rel, src in staged:
+                dst = os.path.join(self.target, rel)
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                os.replace(src, dst)
+                self.hashes.remember(dst, self.manifest()[rel])
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python3 -m tweak_flx1s.core.assets", description="Bundled data manifests")
+    sub = parser.add_subparsers(dest="command", required=True)
+    man = sub.add_parser("manifest", help=f"Write {MANIFEST_NAME} for bundle directories")
+    man.add_argument("directories", nargs="+")
+    args = parser.parse_args(argv)
+
+    for directory in args.directories:
+        manifest = write_manifest(directory)
+        print(f"{directory}: {len(manifest)} files")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import gi
+gi.require_version('Gio', '2.0')
+from gi.repository import Gio, GLib
+from loguru import logger
+
+def main_loop_running():
+    """True when called from inside a running GLib main loop."""
+    return GLib.main_depth() > 0
+
+class ProxyCache:
+    """
+    Keeps D-Bus proxies alive for the lifetime of the process.
+    Gio loads all properties when a proxy is created and keeps them
+    up to date from PropertiesChanged, so reads need no round trip.
+    """
+
+    def __init__(self):
+        self.proxies = {}
+
+    def get(self, name, path, interface, bus_type=Gio.BusType.SESSION):
+        key = (bus_type, name, path, interface)
+        proxy = self.proxies.get(key)
+        if proxy is not None and proxy.get_name_owner() is not None:
+            return proxy
+
+        proxy = Gio.DBusProxy.new_for_bus_sync(
+            bus_type, Gio.DBusProxyFlags.NONE, None, name, path, interface, None
+        )
+        proxy.connect("g-properties-changed", self._on_properties_changed)
+        self.proxies[key] = proxy
+        return proxy
+
+    def _on_properties_changed(self, proxy, changed, invalidated):
+        logger.debug(f"{proxy.get_interface_name()} properties changed: {list(changed.keys())}")
+
+    def clear(self):
+        self.proxies.clear()
+
+def call(proxy, method, params=None, callback=None, timeout=-1):
+    """
+    Calls a method without blocking when a main loop runs.
+    One-shot processes have no loop to deliver the reply, so there the call
+    is made synchronously. callback(result, error) is invoked either way.
+    """
+    if main_loop_running():
+        def on_done(source, res):
+            try:
+                result = source.call_finish(res)
+            except GLib.Error as e:
+                logger.error(f"{proxy.get_interface_name()}.{method} failed: {e.message}")
+                if callback:
+                    callback(None, e)
+                return
+            if callback:
+                callback(result, None)
+
+        proxy.call(method, params, Gio.DBusCallFlags.NONE, timeout, None, on_done)
+        return
+
+    try:
+        result = proxy.call_sync(method, params, Gio.DBusCallFlags.NONE, timeout, None)
+    except GLib.Error as e:
+        logger.error(f"{proxy.get_interface_name()}.{method} failed: {e.message}")
+        if callback:
+            callback(None, e)
+        return
+    if callback:
+        callback(result, None)
+
+_cache = None
+
+def get_proxy(name, path, interface, bus_type=Gio.BusType.SESSION):
+    """Returns a cached proxy from the process-wide cache."""
+    global _cache
+    if _cache is None:
+        _cache = ProxyCache()
+    return _cache.get(name, path, interface, bus_type)
+
+def subscribe(sender, interface, member, callback, arg0=None, bus_type=Gio.BusType.SESSION):
+    """
+    Subscribes to a signal on the shared bus connection.
+    callback(parameters) runs in the main loop. Returns a handle for unsubscribe().
+    """
+    connection = Gio.bus_get_sync(bus_type, None)
+
+    def on_signal(_conn, _sender, _path, _interface, _member, parameters):
+        callback(parameters)
+
+    sub_id = connection.signal_subscribe(
+        sender, interface, member, None, arg0, Gio.DBusSignalFlags.NONE, on_signal
+    )
+    return (connection, sub_id)
+
+def unsubscribe(handle):
+    connection, sub_id = handle
+    connection.signal_unsubscribe(sub_id)
+
+class BusMonitor:
+    """
+    Sees messages addressed to other peers, like dbus-monitor does.
+    A monitor connection cannot be used for anything else, so it is a
+    private one. Matching messages are handed to callback(message) in the
+    main loop; everything else is dropped before GDBus dispatches it.
+    """
+
+    def __init__(self, rules, callback, on_closed=None, bus_type=Gio.BusType.SESSION):
+        self.rules = rules
+        self.callback = callback
+        self.on_closed = on_closed
+        self.bus_type = bus_type
+        self.connection = None
+        self.filter_id = None
+
+    def start(self):
+        address = Gio.dbus_address_get_for_bus_sync(self.bus_type, None)
+        self.connection = Gio.DBusConnection.new_for_address_sync(
+            address,
+            Gio.DBusConnectionFlags.AUTHENTICATION_CLIENT | Gio.DBusConnectionFlags.MESSAGE_BUS_CONNECTION,
+            None, None
+        )
+        self.filter_id = self.connection.add_filter(self._filter)
+        self.connection.connect("closed", self._on_closed)
+        self.connection.call_sync(
+            "org.freedesktop.DBus", "/org/freedesktop/DBus", "org.freedesktop.DBus.Monitoring",
+            "BecomeMonitor", GLib.Variant("(asu)", (self.rules, 0)),
+            None, Gio.DBusCallFlags.NONE, -1, None
+        )
+        logger.debug(f"Monitoring bus: {self.rules}")
+
+    def _filter(self, _connection, message, incoming):
+        if not incoming:
+            return message
+        kind = message.get_message_type()
+        if kind in (Gio.DBusMessageType.METHOD_RETURN, Gio.DBusMessageType.ERROR) and message.get_reply_serial():
+            # Could be the reply to BecomeMonitor itself.
+            return message
+        # Runs on the GDBus worker thread.
+        GLib.idle_add(self._dispatch, message)
+        return None
+
+    def _on_closed(self, _connection, remote_peer_vanished, _error):
+        if remote_peer_vanished and self.on_closed:
+            logger.warning("Bus monitor connection closed")
+            self.on_closed()
+
+    def _dispatch(self, message):
+        self.callback(message)
+        return GLib.SOURCE_REMOVE
+
+    def stop(self):
+        if self.connection is None:
+            return
+        if self.filter_id is not None:
+            self.connection.remove_filter(self.filter_id)
+            self.filter_id = None
+        try:
+            self.connection.close_sync(None)
+        except GLib.Error:
+            pass
+        self.connection = None
+
+def name_owner_pid(name, bus_type=Gio.BusType.SESSION):
+    """Returns the pid of the process owning a bus name, or None if it has no owner."""
+    connection = Gio.bus_get_sync(bus_type, None)
+    try:
+        result = connection.call_sync(
+            "org.freedesktop.DBus", "/org/freedesktop/DBus", "org.freedesktop.DBus",
+            "GetConnectionUnixProcessID", GLib.Variant("(s)", (name,)),
+            GLib.VariantType.new("(u)"), Gio.DBusCallFlags.NONE, -1, None
+        )
+    except GLib.Error:
+        return None
+    return result.unpack()[0]
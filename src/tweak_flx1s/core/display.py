@@ -0,0 +1,164 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import glob
+import socket
+from gi.repository import GLib
+from loguru import logger
+from tweak_flx1s.core.bus import get_proxy
+
+BACKLIGHT_PATH = "/sys/class/leds/lcd-backlight/brightness"
+BACKLIGHT_CLASS_GLOB = "/sys/class/backlight/*/brightness"
+
+# linux/netlink.h; group 1 carries the kernel's uevents.
+NETLINK_KOBJECT_UEVENT = 15
+UEVENT_KERNEL_GROUP = 1
+
+DISPLAY_CONFIG_BUS_NAME = "org.gnome.Mutter.DisplayConfig"
+DISPLAY_CONFIG_OBJECT_PATH = "/org/gnome/Mutter/DisplayConfig"
+DISPLAY_CONFIG_INTERFACE = "org.gnome.Mutter.DisplayConfig"
+
+# PowerSaveMode values, as in DPMS: 0 on, 1 standby, 2 suspend, 3 off.
+POWER_SAVE_ON = 0
+
+def backlight_on(path=BACKLIGHT_PATH):
+    """True unless the backlight node says the panel is dark. None if there is no node."""
+    try:
+        with open(path, 'r') as f:
+            return int(f.read().strip()) > 0
+    except (OSError, ValueError):
+        return None
+
+def _backlight_class_node():
+    """The brightness attribute of a backlight class device, which announces changes with uevents."""
+    nodes = sorted(glob.glob(BACKLIGHT_CLASS_GLOB))
+    return nodes[0] if nodes else None
+
+def _open_uevent_socket():
+    sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM | socket.SOCK_CLOEXEC | socket.SOCK_NONBLOCK,
+                         NETLINK_KOBJECT_UEVENT)
+    try:
+        sock.bind((0, UEVENT_KERNEL_GROUP))
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+class DisplayPowerWatch:
+    """
+    Reports display on/off changes to callback(on).
+    Phosh exports the DPMS state as PowerSaveMode on the Mutter DisplayConfig
+    interface and announces changes with PropertiesChanged, so watching costs
+    no wakeups. Without it a backlight class device is followed through its
+    kernel uevents. The LED class lcd-backlight node announces nothing, so it
+    is only polled every poll_seconds if that is set; polling wakes the
+    process while the screen is off and notices a change up to poll_seconds
+    late.
+    """
+
+    def __init__(self, callback, poll_seconds=None):
+        self.callback = callback
+        self.poll_seconds = poll_seconds
+        self.proxy = None
+        self.handler_id = None
+        self.poll_id = None
+        self.uevents = None
+        self.uevent_node = None
+        self.uevent_id = None
+        self.on = True
+
+    def start(self):
+        try:
+            self.proxy = get_proxy(DISPLAY_CONFIG_BUS_NAME, DISPLAY_CONFIG_OBJECT_PATH, DISPLAY_CONFIG_INTERFACE)
+        except GLib.Error as e:
+            logger.debug(f"DisplayConfig unavailable: {e.message}")
+            self.proxy = None
+
+        mode = self.proxy.get_cached_property("PowerSaveMode") if self.proxy else None
+        if mode is not None:
+            self.on = mode.unpack() == POWER_SAVE_ON
+            self.handler_id = self.proxy.connect("g-properties-changed", self._on_properties_changed)
+            logger.debug("Watching display power through DisplayConfig")
+        elif self._watch_uevents():
+            logger.debug(f"Watching display power through uevents of {self.uevent_node}")
+        elif self.poll_seconds and backlight_on() is not None:
+            self.on = backlight_on()
+            self.poll_id = GLib.timeout_add_seconds(self.poll_seconds, self._on_poll)
+            logger.warning(f"DisplayConfig unavailable, polling {BACKLIGHT_PATH} every {self.poll_seconds}s")
+        else:
+            logger.warning("Cannot tell display power state without polling, assuming it stays on")
+        return self.on
+
+    def _watch_uevents(self):
+        node = _backlight_class_node()
+        if node is None or backlight_on(node) is None:
+            return False
+        try:
+            self.uevents = _open_uevent_socket()
+        except OSError as e:
+            logger.debug(f"Cannot listen to uevents: {e}")
+            return False
+        self.uevent_node = node
+        self.on = backlight_on(node)
+        self.uevent_id = GLib.io_add_watch(self.uevents.fileno(), GLib.PRIORITY_DEFAULT, GLib.IOCondition.IN,
+                                           self._on_uevent)
+        return True
+
+    def _on_uevent(self, fd, condition):
+        # Any device's uevents arrive here; only backlight changes are read further.
+        try:
+            while True:
+                message = self.uevents.recv(8192)
+                if b"SUBSYSTEM=backlight" in message.split(b"\0"):
+                    on = backlight_on(self.uevent_node)
+                    if on is not None:
+                        self._update(on)
+        except BlockingIOError:
+            pass
+        except OSError as e:
+            logger.error(f"Lost uevents: {e}")
+            self.uevent_id = None
+            return GLib.SOURCE_REMOVE
+        return GLib.SOURCE_CONTINUE
+
+    def _on_properties_changed(self, proxy, changed, invalidated):
+        mode = changed.unpack().get("PowerSaveMode")
+        if mode is not None:
+            self._update(mode == POWER_SAVE_ON)
+
+    def _on_poll(self):
+        on = backlight_on()
+        if on is not None:
+            self._update(on)
+        return GLib.SOURCE_CONTINUE
+
+    def _update(self, on):
+        if on != self.on:
+            self.on = on
+            self.callback(on)
+
+    def stop(self):
+        if self.handler_id:
+            self.proxy.disconnect(self.handler_id)
+            self.handler_id = None
+        if self.poll_id:
+            GLib.source_remove(self.poll_id)
+            self.poll_id = None
+        if self.uevent_id:
+            GLib.source_remove(self.uevent_id)
+            self.uevent_id = None
+        if self.uevents:
+            self.uevents.close()
+            self.uevents = None
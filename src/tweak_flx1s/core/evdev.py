@@ -0,0 +1,141 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Minimal evdev access without python-evdev: reading input_event structs,
+device discovery by capability and exclusive grabs.
+"""
+
+import os
+import glob
+import fcntl
+import struct
+import array
+
+# struct input_event: struct timeval, __u16 type, __u16 code, __s32 value
+EVENT_FORMAT = "llHHi"
+EVENT_SIZE = struct.calcsize(EVENT_FORMAT)
+
+EV_SYN = 0x00
+EV_KEY = 0x01
+EV_ABS = 0x03
+
+SYN_REPORT = 0
+SYN_DROPPED = 3
+
+KEY_MAX = 0x2ff
+ABS_MAX = 0x3f
+
+KEY_RELEASE = 0
+KEY_PRESS = 1
+KEY_REPEAT = 2
+
+def _ioc(direction, number, size):
+    return (direction << 30) | (size << 16) | (ord('E') << 8) | number
+
+_IOC_WRITE = 1
+_IOC_READ = 2
+
+EVIOCGRAB = _ioc(_IOC_WRITE, 0x90, struct.calcsize("i"))
+
+def EVIOCGNAME(length):
+    return _ioc(_IOC_READ, 0x06, length)
+
+def EVIOCGBIT(ev_type, length):
+    return _ioc(_IOC_READ, 0x20 + ev_type, length)
+
+class InputEvent:
+    __slots__ = ("time", "type", "code", "value")
+
+    def __init__(self, time, type, code, value):
+        self.time = time
+        self.type = type
+        self.code = code
+        self.value = value
+
+    def __repr__(self):
+        return f"<InputEvent {self.time:.6f} type={self.type} code={self.code} value={self.value}>"
+
+class InputDevice:
+    """An open /dev/input/eventN node."""
+
+    def __init__(self, path, nonblocking=True):
+        self.path = path
+        flags = os.O_RDONLY | os.O_CLOEXEC | (os.O_NONBLOCK if nonblocking else 0)
+        self.fd = os.open(path, flags)
+        self.grabbed = False
+
+    def fileno(self):
+        return self.fd
+
+    @property
+    def name(self):
+        buf = array.array('B', [0] * 256)
+        try:
+            fcntl.ioctl(self.fd, EVIOCGNAME(len(buf)), buf, True)
+        except OSError:
+            return ""
+        return buf.tobytes().split(b"\0", 1)[0].decode(errors="replace")
+
+    def capabilities(self, ev_type, maximum):
+        """Returns the set of codes the device supports for an event type."""
+        buf = array.array('B', [0] * (maximum // 8 + 1))
+        try:
+            fcntl.ioctl(self.fd, EVIOCGBIT(ev_type, len(buf)), buf, True)
+        except OSError:
+            return set()
+        return {i * 8 + bit for i, byte in enumerate(buf) for bit in range(8) if byte & (1 << bit)}
+
+    def grab(self, exclusive=True):
+        """Takes or releases the device exclusively, so no other reader sees its events."""
+        fcntl.ioctl(self.fd, EVIOCGRAB, 1 if exclusive else 0)
+        self.grabbed = exclusive
+
+    def read(self):
+        """Returns the events available now, an empty list if there are none."""
+        try:
+            data = os.read(self.fd, EVENT_SIZE * 64)
+        except BlockingIOError:
+            return []
+        return list(unpack_events(data))
+
+    def close(self):
+        if self.fd is not None:
+            if self.grabbed:
+                try:
+                    self.grab(False)
+                except OSError:
+                    pass
+            os.close(self.fd)
+            self.fd = None
+
+def unpack_events(data):
+    for offset in range(0, len(data) - EVENT_SIZE + 1, EVENT_SIZE):
+        sec, usec, ev_type, code, value = struct.unpack_from(EVENT_FORMAT, data, offset)
+        yield InputEvent(sec + usec / 1_000_000, ev_type, code, value)
+
+def find_key_device(key_code):
+    """Returns the path of the first event node that can send key_code, or None."""
+    for path in sorted(glob.glob("/dev/input/event*"), key=lambda p: int(p[16:] or 0)):
+        try:
+            device = InputDevice(path)
+        except OSError:
+            continue
+        try:
+            if key_code in device.capabilities(EV_KEY, KEY_MAX):
+                return path
+        finally:
+            device.close()
+    return None
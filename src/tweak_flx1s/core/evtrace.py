@@ -0,0 +1,343 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Records evdev streams to a compact file and replays them, either through
+a uinput device (for lisgd or anything else reading evdev) or straight
+into the button press classifier.
+
+    python3 -m tweak_flx1s.core.evtrace record /dev/input/event3 swipe.tfev
+    python3 -m tweak_flx1s.core.evtrace replay swipe.tfev --to uinput --speed 2
+    python3 -m tweak_flx1s.core.evtrace replay presses.tfev --to buttons --key 583
+
+File layout (little endian): b"TFEV", version u8, name (u16 length + utf-8),
+properties, key codes and abs axes with their absinfo, then one 16 byte
+record per event: u64 microseconds since the first event, u16 type,
+u16 code, s32 value. Version 1 files, with a u32 timestamp that wraps
+after about 71 minutes, still load.
+"""
+
+import os
+import sys
+import time
+import fcntl
+import select
+import struct
+import array
+from tweak_flx1s.core import evdev
+
+MAGIC = b"TFEV"
+VERSION = 2
+RECORD_FORMAT = "<QHHi"
+# Record format by file version.
+RECORD_FORMATS = {1: "<IHHi", 2: RECORD_FORMAT}
+
+# struct input_absinfo: value, minimum, maximum, fuzz, flat, resolution
+ABSINFO_FORMAT = "6i"
+ABSINFO_SIZE = struct.calcsize(ABSINFO_FORMAT)
+INPUT_PROP_MAX = 0x1f
+
+def EVIOCGABS(axis):
+    return evdev._ioc(evdev._IOC_READ, 0x40 + axis, ABSINFO_SIZE)
+
+def EVIOCGPROP(length):
+    return evdev._ioc(evdev._IOC_READ, 0x09, length)
+
+def _uinput_ioc(direction, number, size=0):
+    return (direction << 30) | (size << 16) | (ord('U') << 8) | number
+
+UI_DEV_CREATE = _uinput_ioc(0, 1)
+UI_DEV_DESTROY = _uinput_ioc(0, 2)
+# struct uinput_setup: struct input_id (4 x u16), char name[80], u32 ff_effects_max
+UINPUT_SETUP_FORMAT = "4H80sI"
+UI_DEV_SETUP = _uinput_ioc(evdev._IOC_WRITE, 3, struct.calcsize(UINPUT_SETUP_FORMAT))
+# struct uinput_abs_setup: u16 code, padding, struct input_absinfo
+UINPUT_ABS_SETUP_FORMAT = "H2x" + ABSINFO_FORMAT
+UI_ABS_SETUP = _uinput_ioc(evdev._IOC_WRITE, 4, struct.calcsize(UINPUT_ABS_SETUP_FORMAT))
+UI_SET_EVBIT = _uinput_ioc(evdev._IOC_WRITE, 100, 4)
+UI_SET_KEYBIT = _uinput_ioc(evdev._IOC_WRITE, 101, 4)
+UI_SET_ABSBIT = _uinput_ioc(evdev._IOC_WRITE, 103, 4)
+UI_SET_PROPBIT = _uinput_ioc(evdev._IOC_WRITE, 110, 4)
+
+def UI_GET_SYSNAME(length):
+    return _uinput_ioc(evdev._IOC_READ, 44, length)
+
+class Recording:
+    """A device description plus its events as (microseconds, type, code, value)."""
+
+    def __init__(self, name="", props=None, keys=None, axes=None, events=None):
+        self.name = name
+        self.props = sorted(props or [])
+        self.keys = sorted(keys or [])
+        self.axes = axes or {}
+        self.events = events or []
+
+    @classmethod
+    def from_device(cls, device):
+        axes = {}
+        for axis in device.capabilities(evdev.EV_ABS, evdev.ABS_MAX):
+            buf = array.array('i', [0] * 6)
+            try:
+                fcntl.ioctl(device.fileno(), EVIOCGABS(axis), buf, True)
+            except OSError:
+                continue
+            axes[axis] = tuple(buf)
+
+        buf = array.array('B', [0] * (INPUT_PROP_MAX // 8 + 1))
+        try:
+            fcntl.ioctl(device.fileno(), EVIOCGPROP(len(buf)), buf, True)
+        except OSError:
+            pass
+        props = {i * 8 + bit for i, byte in enumerate(buf) for bit in range(8) if byte & (1 << bit)}
+
+        return cls(device.name, props, device.capabilities(evdev.EV_KEY, evdev.KEY_MAX), axes)
+
+    @property
+    def duration(self):
+        return self.events[-1][0] / 1_000_000 if self.events else 0.0
+
+    def save(self, path):
+        name = self.name.encode()
+        with open(path, 'wb') as f:
+            f.write(MAGIC + struct.pack("<BH", VERSION, len(name)) + name)
+            f.write(struct.pack("<H", len(self.props)))
+            f.write(struct.pack(f"<{len(self.props)}H", *self.props))
+            f.write(struct.pack("<H", len(self.keys)))
+            f.write(struct.pack(f"<{len(self.keys)}H", *self.keys))
+            f.write(struct.pack("<H", len(self.axes)))
+            for axis, info in sorted(self.axes.items()):
+                f.write(struct.pack("<H" + ABSINFO_FORMAT, axis, *info))
+            for event in self.events:
+                f.write(struct.pack(RECORD_FORMAT, *event))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if data[:4] != MAGIC:
+            raise ValueError(f"{path} is not an event recording")
+        version, name_len = struct.unpack_from("<BH", data, 4)
+        if version not in RECORD_FORMATS:
+            raise ValueError(f"Unsupported recording version {version}")
+        offset = 7
+        name = data[offset:offset + name_len].decode(errors="replace")
+        offset += name_len
+
+        lists = []
+        for _ in range(2):
+            (count,) = struct.unpack_from("<H", data, offset)
+            offset += 2
+            lists.append(list(struct.unpack_from(f"<{count}H", data, offset)))
+            offset += 2 * count
+        props, keys = lists
+
+        (count,) = struct.unpack_from("<H", data, offset)
+        offset += 2
+        axes = {}
+        for _ in range(count):
+            axis, *info = struct.unpack_from("<H" + ABSINFO_FORMAT, data, offset)
+            axes[axis] = tuple(info)
+            offset += 2 + ABSINFO_SIZE
+
+        record_format = RECORD_FORMATS[version]
+        record_size = struct.calcsize(record_format)
+        events = [struct.unpack_from(record_format, data, pos)
+                  for pos in range(offset, len(data) - record_size + 1, record_size)]
+        return cls(name, props, keys, axes, events)
+
+def record(path, duration=None, grab=False):
+    """Reads events from an event node until duration seconds pass or Ctrl+C."""
+    device = evdev.InputDevice(path)
+    recording = Recording.from_device(device)
+    if grab:
+        device.grab()
+
+    first = None
+    deadline = time.monotonic() + duration if duration else None
+    try:
+        while deadline is None or time.monotonic() < deadline:
+            timeout = max(0, deadline - time.monotonic()) if deadline else None
+            ready, _, _ = select.select([device.fileno()], [], [], timeout)
+            if not ready:
+                continue
+            for event in device.read():
+                if first is None:
+                    first = event.time
+                micros = int(round((event.time - first) * 1_000_000))
+                recording.events.append((micros, event.type, event.code, event.value))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        device.close()
+    return recording
+
+class UInputDevice:
+    """A virtual evdev device with the capabilities of a recording."""
+
+    def __init__(self, recording, name=None):
+        self.fd = os.open("/dev/uinput", os.O_WRONLY | os.O_NONBLOCK | os.O_CLOEXEC)
+        try:
+            self._setup(recording, name or f"{recording.name} (replay)")
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def _setup(self, recording, name):
+        fcntl.ioctl(self.fd, UI_SET_EVBIT, evdev.EV_SYN)
+        if recording.keys:
+            fcntl.ioctl(self.fd, UI_SET_EVBIT, evdev.EV_KEY)
+            for key in recording.keys:
+                fcntl.ioctl(self.fd, UI_SET_KEYBIT, key)
+        if recording.axes:
+            fcntl.ioctl(self.fd, UI_SET_EVBIT, evdev.EV_ABS)
+            for axis, info in recording.axes.items():
+                fcntl.ioctl(self.fd, UI_SET_ABSBIT, axis)
+                fcntl.ioctl(self.fd, UI_ABS_SETUP, struct.pack(UINPUT_ABS_SETUP_FORMAT, axis, *info))
+        for prop in recording.props:
+            fcntl.ioctl(self.fd, UI_SET_PROPBIT, prop)
+
+        # BUS_VIRTUAL, vendor/product/version 0
+        fcntl.ioctl(self.fd, UI_DEV_SETUP, struct.pack(UINPUT_SETUP_FORMAT, 0x06, 0, 0, 0, name.encode()[:79], 0))
+        fcntl.ioctl(self.fd, UI_DEV_CREATE)
+
+    @property
+    def node(self):
+        """The /dev/input/eventN path of the virtual device, once udev has it."""
+        buf = array.array('B', [0] * 64)
+        fcntl.ioctl(self.fd, UI_GET_SYSNAME(len(buf)), buf, True)
+        sysname = buf.tobytes().split(b"\0", 1)[0].decode()
+        sys_dir = f"/sys/devices/virtual/input/{sysname}"
+        for entry in os.listdir(sys_dir):
+            if entry.startswith("event"):
+                return f"/dev/input/{entry}"
+        return None
+
+    def write(self, ev_type, code, value):
+        os.write(self.fd, struct.pack(evdev.EVENT_FORMAT, 0, 0, ev_type, code, value))
+
+    def close(self):
+        if self.fd is not None:
+            fcntl.ioctl(self.fd, UI_DEV_DESTROY)
+            os.close(self.fd)
+            self.fd = None
+
+def replay(recording, sink, speed=1.0):
+    """
+    Calls sink(type, code, value) for every event at its recorded time,
+    divided by speed. speed 0 replays as fast as possible.
+    """
+    started = time.monotonic()
+    for micros, ev_type, code, value in recording.events:
+        if speed > 0:
+            delay = started + micros / 1_000_000 / speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        sink(ev_type, code, value)
+
+def replay_into_classifier(recording, key_code, long_ms=600, double_ms=300, double_enabled=True, speed=1.0):
+    """
+    Feeds key events straight into the press classifier, no device or
+    actions involved. Returns (press_type, latency_ms) pairs, the latency
+    measured from the event that decided the press.
+    """
+    from gi.repository import GLib
+    from tweak_flx1s.services.buttons import PressClassifier
+
+    loop = GLib.MainLoop()
+    results = []
+    last_event = [time.monotonic()]
+
+    def emit(press_type):
+        results.append((press_type, (time.monotonic() - last_event[0]) * 1000))
+
+    classifier = PressClassifier(emit, long_ms, double_ms, wants_double=lambda: double_enabled)
+    events = iter(recording.events)
+    started = time.monotonic()
+
+    def next_event():
+        for micros, ev_type, code, value in events:
+            if ev_type == evdev.EV_KEY and code == key_code and value != evdev.KEY_REPEAT:
+                due = started + micros / 1_000_000 / speed if speed > 0 else 0
+                GLib.timeout_add(max(0, int((due - time.monotonic()) * 1000)), feed, value)
+                return
+        # Let pending windows expire before stopping.
+        GLib.timeout_add(max(long_ms, double_ms) + 50, loop.quit)
+
+    def feed(value):
+        last_event[0] = time.monotonic()
+        if value == evdev.KEY_PRESS:
+            classifier.key_down()
+        else:
+            classifier.key_up()
+        next_event()
+        return GLib.SOURCE_REMOVE
+
+    next_event()
+    loop.run()
+    return results
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python3 -m tweak_flx1s.core.evtrace", description="Record and replay evdev input")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Record an event node")
+    rec.add_argument("device")
+    rec.add_argument("output")
+    rec.add_argument("--duration", type=float, help="Stop after this many seconds (default: Ctrl+C)")
+    rec.add_argument("--grab", action="store_true", help="Keep the events from other readers while recording")
+
+    rep = sub.add_parser("replay", help="Replay a recording")
+    rep.add_argument("input")
+    rep.add_argument("--to", choices=["uinput", "buttons"], default="uinput")
+    rep.add_argument("--speed", type=float, default=1.0, help="Playback speed, 0 for as fast as possible")
+    rep.add_argument("--wait", type=float, default=1.0, help="Seconds to wait after creating the uinput device")
+    rep.add_argument("--key", type=int, default=583, help="Key code for --to buttons")
+    rep.add_argument("--long-ms", type=int, default=600)
+    rep.add_argument("--double-ms", type=int, default=300)
+    rep.add_argument("--no-double", action="store_true", help="Classify as if no double press action was set")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        recording = record(args.device, args.duration, args.grab)
+        recording.save(args.output)
+        print(f"{len(recording.events)} events over {recording.duration:.1f}s from '{recording.name}'")
+        return 0
+
+    recording = Recording.load(args.input)
+    print(f"Replaying {len(recording.events)} events from '{recording.name}' at {args.speed}x")
+
+    if args.to == "buttons":
+        cpu = time.process_time()
+        results = replay_into_classifier(recording, args.key, args.long_ms, args.double_ms,
+                                         not args.no_double, args.speed)
+        for press_type, latency in results:
+            print(f"{press_type}: {latency:.1f} ms after the deciding event")
+        print(f"CPU: {(time.process_time() - cpu) * 1000:.1f} ms")
+        return 0
+
+    device = UInputDevice(recording)
+    try:
+        print(f"Virtual device: {device.node}")
+        time.sleep(args.wait)
+        replay(recording, device.write, args.speed)
+    finally:
+        device.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
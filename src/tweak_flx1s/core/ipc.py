@@ -0,0 +1,102 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Line-based JSON requests over unix sockets in XDG_RUNTIME_DIR.
+Long-lived services answer one request per connection, one-shot
+processes use request() and fall back to doing the work themselves
+when no service is listening.
+"""
+
+import os
+import json
+import socket
+from loguru import logger
+
+def request(path, payload, timeout=5):
+    """Sends one request and returns the decoded reply, or None if no service answered."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path)
+            sock.sendall(json.dumps(payload).encode() + b"\n")
+            line = sock.makefile("r").readline()
+    except OSError as e:
+        logger.debug(f"No service on {path}: {e}")
+        return None
+
+    try:
+        return json.loads(line)
+    except ValueError:
+        logger.warning(f"Invalid reply from {path}: {line!r}")
+        return None
+
+class SocketServer:
+    """
+    Serves requests on a unix socket from the GLib main loop.
+    handler(payload) returns the reply dict; exceptions become {"error": ...}.
+    """
+
+    def __init__(self, path, handler, timeout=5):
+        self.path = path
+        self.handler = handler
+        self.timeout = timeout
+        self.sock = None
+        self.watch_id = None
+
+    def start(self):
+        from gi.repository import GLib
+
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM | socket.SOCK_CLOEXEC)
+        self.sock.bind(self.path)
+        os.chmod(self.path, 0o600)
+        self.sock.listen(8)
+        self.watch_id = GLib.io_add_watch(self.sock.fileno(), GLib.PRIORITY_DEFAULT, GLib.IO_IN, self._on_incoming)
+
+    def _on_incoming(self, fd, condition):
+        try:
+            conn, _addr = self.sock.accept()
+        except OSError as e:
+            logger.error(f"Accept failed on {self.path}: {e}")
+            return True
+
+        with conn:
+            conn.settimeout(self.timeout)
+            try:
+                reply = self.handler(json.loads(conn.makefile("r").readline()))
+            except Exception as e:
+                logger.error(f"Request on {self.path} failed: {e}")
+                reply = {"error": str(e)}
+            try:
+                conn.sendall(json.dumps(reply).encode() + b"\n")
+            except OSError:
+                pass
+        return True
+
+    def stop(self):
+        from gi.repository import GLib
+
+        if self.watch_id:
+            GLib.source_remove(self.watch_id)
+            self.watch_id = None
+        if self.sock:
+            self.sock.close()
+            self.sock = None
+            if os.path.exists(self.path):
+                os.unlink(self.path)
@@ -0,0 +1,204 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import json
+import time
+import socket
+import signal
+import functools
+from gi.repository import GLib
+from loguru import logger
+from tweak_flx1s.const import CONFIG_DIR
+from tweak_flx1s.core import trace
+from tweak_flx1s.core.trace import process_age_ms
+
+CONFIG_FILE = os.path.join(CONFIG_DIR, "monitors.json")
+
+DEFAULT_CONFIG = {
+    "alarm": True,
+    "guard": True,
+    "gestures": True,
+    "memory": False,
+    "buttons": False,
+    "stats_interval_seconds": 600,
+    # Standalone monitors exit after this long without activity and are
+    # started again by their activation units.
+    "idle_exit_seconds": {"alarm": 120, "guard": 120}
+}
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+def load_config():
+    config = dict(DEFAULT_CONFIG)
+    if os.path.exists(CONFIG_FILE):
+        try:
+            with open(CONFIG_FILE, 'r') as f:
+                config.update(json.load(f))
+        except Exception as e:
+            logger.error(f"Failed to load monitors config: {e}")
+    return config
+
+def sd_notify(state):
+    """Sends a state update to systemd for Type=notify units. No-op elsewhere."""
+    address = os.environ.get("NOTIFY_SOCKET")
+    if not address:
+        return
+    if address.startswith("@"):
+        address = "\0" + address[1:]
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM | socket.SOCK_CLOEXEC) as sock:
+            sock.sendto(state.encode(), address)
+    except OSError as e:
+        logger.debug(f"sd_notify failed: {e}")
+
+def child_cpu_seconds(pid):
+    """Returns user + system CPU time of a child process, 0 if it is gone."""
+    try:
+        with open(f"/proc/{pid}/stat", 'r') as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+    except (OSError, IndexError, ValueError):
+        return 0.0
+
+class MonitorStats:
+    """CPU time and wakeups spent in one monitor's main loop callbacks."""
+
+    def __init__(self, name):
+        self.name = name
+        self.wakeups = 0
+        self.cpu_seconds = 0.0
+
+    def wrap(self, func):
+        """Wraps a main loop callback so its dispatches are accounted to this monitor."""
+        @functools.wraps(func)
+        def tracked(*args, **kwargs):
+            started = time.thread_time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.wakeups += 1
+                self.cpu_seconds += time.thread_time() - started
+        return tracked
+
+class Monitor:
+    """
+    A background monitor that can run on its own main loop or as a plug-in
+    of the shared monitor host. Subclasses implement start() and stop() and
+    route their main loop callbacks through self.track() so their cost
+    shows up in the host's statistics.
+    """
+
+    name = None
+
+    def __init__(self):
+        self.loop = None
+        self.stats = MonitorStats(self.name)
+        self.running = False
+        # Set by the monitor host to hear about monitors that stopped on their own.
+        self.on_stopped = None
+        self.idle_timeout = None
+        self.idle_id = None
+
+    def track(self, func):
+        tracked = self.stats.wrap(trace.traced(f"{self.name}.{func.__name__.lstrip('_')}")(func))
+        if self.idle_timeout is None:
+            return tracked
+
+        @functools.wraps(func)
+        def touched(*args, **kwargs):
+            self.touch()
+            return tracked(*args, **kwargs)
+        return touched
+
+    def touch(self):
+        """Restarts the idle countdown."""
+        if not self.idle_timeout:
+            return
+        if self.idle_id:
+            GLib.source_remove(self.idle_id)
+        self.idle_id = GLib.timeout_add_seconds(self.idle_timeout, self._on_idle)
+
+    def _on_idle(self):
+        self.idle_id = None
+        if self.busy():
+            self.touch()
+        else:
+            logger.info(f"{self.name} monitor idle for {self.idle_timeout}s, exiting")
+            self.quit()
+        return GLib.SOURCE_REMOVE
+
+    def busy(self):
+        """True while the monitor must not exit on idle."""
+        return False
+
+    def start(self):
+        """Attaches the monitor to the default main context. Returns False if it has nothing to do."""
+        raise NotImplementedError
+
+    def stop(self):
+        """Detaches everything start() attached."""
+        raise NotImplementedError
+
+    def child_pids(self):
+        """Helper processes whose CPU time belongs to this monitor."""
+        return []
+
+    def quit(self):
+        """Stops the monitor after a fatal error or a signal."""
+        if self.idle_id:
+            GLib.source_remove(self.idle_id)
+            self.idle_id = None
+        if self.running:
+            self.running = False
+            # Hosted plug-ins inherit the host's NOTIFY_SOCKET; only a standalone run owns it.
+            if self.loop is not None:
+                sd_notify("STOPPING=1")
+            self.stop()
+            if self.on_stopped:
+                self.on_stopped(self)
+        if self.loop and self.loop.is_running():
+            self.loop.quit()
+        return GLib.SOURCE_REMOVE
+
+    def run(self):
+        """
+        Runs the monitor standalone until SIGTERM, SIGINT or, if configured,
+        until it has been idle for idle_exit_seconds.
+        """
+        self.loop = GLib.MainLoop()
+        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGTERM, self.quit)
+        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGINT, self.quit)
+        self.idle_timeout = load_config().get("idle_exit_seconds", {}).get(self.name) or None
+
+        self.running = True
+        started = self.start()
+        # Ready either way, a monitor with nothing to do exits cleanly.
+        latency = process_age_ms()
+        trace.record(f"{self.name}.ready", latency)
+        sd_notify(f"READY=1\nSTATUS={'Running' if started else 'Nothing to do'}")
+        logger.info(f"{self.name} monitor ready {latency} ms after activation")
+        if not started:
+            self.running = False
+            return
+        self.touch()
+
+        try:
+            self.loop.run()
+        except KeyboardInterrupt:
+            self.quit()
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name}>"
@@ -0,0 +1,194 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import time
+import threading
+import gi
+gi.require_version('Gio', '2.0')
+from gi.repository import Gio, GLib
+from loguru import logger
+from tweak_flx1s.const import APP_ID, APP_NAME
+from tweak_flx1s.core.bus import get_proxy, call as bus_call, main_loop_running
+
+NOTIFICATIONS_BUS_NAME = "org.freedesktop.Notifications"
+NOTIFICATIONS_OBJECT_PATH = "/org/freedesktop/Notifications"
+NOTIFICATIONS_INTERFACE = "org.freedesktop.Notifications"
+
+# Updates for the same key within this window are merged into one.
+COALESCE_MS = 250
+# At most RATE_LIMIT notifications per source within RATE_WINDOW seconds.
+RATE_LIMIT = 5
+RATE_WINDOW = 10
+
+class Notification:
+    def __init__(self, title, body, icon_name, image_path, expire_ms, key, source):
+        self.title = title
+        self.body = body
+        self.icon_name = icon_name
+        self.image_path = image_path
+        self.expire_ms = expire_ms
+        self.key = key
+        self.source = source
+
+class NotificationBroker:
+    """
+    Sends notifications for the whole process.
+    Talks to org.freedesktop.Notifications directly so a keyed notification
+    replaces its previous version (replaces-id) and expires on its own.
+    Inside a main loop, rapid updates per key are coalesced and every
+    source is rate limited; updates over the limit are deferred, not lost.
+    Falls back to a single registered Gio.Application.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.server_ids = {}
+        self.pending = {}
+        self.timers = {}
+        self.in_flight = set()
+        self.history = {}
+        self.app = None
+
+    def notify(self, title, body="", icon_name="dialog-information", key=None,
+               image_path=None, expire_ms=-1, source=None):
+        note = Notification(title, body, icon_name, image_path, expire_ms, key, source or key or title)
+
+        if not main_loop_running() or key is None:
+            if self._allowed(note.source):
+                self._send(note)
+            else:
+                logger.debug(f"Rate limited notification from {note.source}: {title}")
+            return
+
+        with self.lock:
+            self.pending[key] = note
+            if key not in self.timers:
+                self.timers[key] = GLib.timeout_add(COALESCE_MS, self._flush, key)
+
+    def _allowed(self, source):
+        now = time.monotonic()
+        with self.lock:
+            stamps = [t for t in self.history.get(source, []) if now - t < RATE_WINDOW]
+            if len(stamps) >= RATE_LIMIT:
+                self.history[source] = stamps
+                return False
+            stamps.append(now)
+            self.history[source] = stamps
+            return True
+
+    def _retry_delay_ms(self, source):
+        stamps = self.history.get(source, [])
+        if not stamps:
+            return COALESCE_MS
+        return max(COALESCE_MS, int((RATE_WINDOW - (time.monotonic() - stamps[0])) * 1000) + 1)
+
+    def _flush(self, key):
+        with self.lock:
+            note = self.pending.get(key)
+            if note is None:
+                self.timers.pop(key, None)
+                return GLib.SOURCE_REMOVE
+
+            if key in self.in_flight:
+                # Wait for the server id of the previous version.
+                return GLib.SOURCE_CONTINUE
+
+            if not self._allowed(note.source):
+                self.timers[key] = GLib.timeout_add(self._retry_delay_ms(note.source), self._flush, key)
+                return GLib.SOURCE_REMOVE
+
+            del self.pending[key]
+            self.timers.pop(key, None)
+        self._send(note)
+        return GLib.SOURCE_REMOVE
+
+    def _send(self, note):
+        try:
+            proxy = get_proxy(NOTIFICATIONS_BUS_NAME, NOTIFICATIONS_OBJECT_PATH, NOTIFICATIONS_INTERFACE)
+        except GLib.Error as e:
+            logger.debug(f"Notification server unavailable ({e.message}), using GApplication")
+            self._send_gapplication(note)
+            return
+
+        hints = {"desktop-entry": GLib.Variant("s", APP_ID)}
+        if note.image_path:
+            hints["image-path"] = GLib.Variant("s", note.image_path)
+
+        with self.lock:
+            replaces = self.server_ids.get(note.key, 0) if note.key else 0
+            if note.key:
+                self.in_flight.add(note.key)
+
+        params = GLib.Variant("(susssasa{sv}i)", (
+            APP_NAME, replaces, note.icon_name or "", note.title, note.body or "",
+            [], hints, note.expire_ms if note.expire_ms is not None else -1
+        ))
+
+        def on_done(result, error):
+            with self.lock:
+                self.in_flight.discard(note.key)
+                if error is None and note.key:
+                    self.server_ids[note.key] = result.unpack()[0]
+            if error is not None:
+                self._send_gapplication(note)
+            else:
+                logger.info(f"Notification sent: {note.title}")
+
+        bus_call(proxy, "Notify", params, on_done)
+
+    def _send_gapplication(self, note):
+        try:
+            if self.app is None:
+                self.app = Gio.Application(application_id=APP_ID, flags=Gio.ApplicationFlags.NON_UNIQUE)
+                self.app.register(None)
+
+            notification = Gio.Notification.new(note.title)
+            if note.body:
+                notification.set_body(note.body)
+            if note.image_path:
+                notification.set_icon(Gio.FileIcon.new(Gio.File.new_for_path(note.image_path)))
+            elif note.icon_name:
+                notification.set_icon(Gio.ThemedIcon.new(note.icon_name))
+
+            self.app.send_notification(note.key, notification)
+            logger.info(f"Notification sent: {note.title}")
+        except Exception as e:
+            logger.error(f"Failed to send notification: {e}")
+
+    def close(self, key):
+        """Withdraws a keyed notification."""
+        with self.lock:
+            self.pending.pop(key, None)
+            timer = self.timers.pop(key, None)
+            server_id = self.server_ids.pop(key, None)
+        if timer:
+            GLib.source_remove(timer)
+        if server_id:
+            try:
+                proxy = get_proxy(NOTIFICATIONS_BUS_NAME, NOTIFICATIONS_OBJECT_PATH, NOTIFICATIONS_INTERFACE)
+                bus_call(proxy, "CloseNotification", GLib.Variant("(u)", (server_id,)))
+            except GLib.Error as e:
+                logger.debug(f"Could not close notification: {e.message}")
+        elif self.app:
+            self.app.withdraw_notification(key)
+
+_broker = None
+
+def get_broker():
+    """Returns the process-wide notification broker."""
+    global _broker
+    if _broker is None:
+        _broker = NotificationBroker()
+    return _broker
@@ -0,0 +1,265 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Profiling for any entry point, behind `tweak-flx1s --profile[=cpu|alloc|import]`.
+
+cpu runs the entry point under cProfile and writes a .pstats file, alloc
+keeps tracemalloc snapshots, import re-runs the command with -X importtime.
+Every mode also writes collapsed stacks (one "frame;frame;frame value" line
+per stack) that flamegraph.pl, speedscope and inferno read directly.
+Output goes to PROFILE_DIR. With an interval, long running services dump
+a numbered profile every interval seconds as well as at exit.
+"""
+
+import os
+import sys
+import time
+import atexit
+import signal
+import subprocess
+from collections import Counter
+from loguru import logger
+from tweak_flx1s.const import CACHE_DIR
+
+PROFILE_DIR = os.path.join(CACHE_DIR, "profiles")
+
+MODES = ("cpu", "alloc", "import")
+
+# Frames kept per allocation traceback.
+ALLOC_FRAMES = 32
+
+# Walking the cProfile call graph stops below this share of a second.
+MIN_STACK_SECONDS = 1e-5
+MAX_STACK_DEPTH = 64
+
+def _frame_label(func):
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+def collapsed_cpu_stacks(stats):
+    """
+    Collapsed stacks from pstats' {func: (cc, nc, tt, ct, callers)} table.
+    cProfile only records caller/callee pairs, so time below a function
+    called from several places is split by each caller's share of it.
+    """
+    callees = {}
+    for func, (_cc, _nc, _tt, _ct, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, {})[func] = edge[3]
+
+    stacks = Counter()
+
+    def walk(func, path, share, depth):
+        _cc, _nc, tt, ct, _callers = stats[func]
+        path = path + (func,)
+        stacks[";".join(_frame_label(f) for f in path)] += tt * share
+        if depth >= MAX_STACK_DEPTH:
+            return
+        for callee, edge_ct in callees.get(func, {}).items():
+            callee_ct = stats[callee][3]
+            if callee in path or callee_ct <= 0:
+                continue
+            callee_share = share * min(1.0, edge_ct / callee_ct)
+            if callee_ct * callee_share >= MIN_STACK_SECONDS:
+                walk(callee, path, callee_share, depth + 1)
+
+    for func, entry in stats.items():
+        if not entry[4]:
+            walk(func, (), 1.0, 0)
+    # Microseconds, the unit the flame graph tools expect as sample counts.
+    return {stack: int(seconds * 1_000_000) for stack, seconds in stacks.items() if seconds >= 1e-6}
+
+def collapsed_alloc_stacks(snapshot):
+    """Collapsed stacks of live allocations, in bytes."""
+    stacks = Counter()
+    for stat in snapshot.statistics("traceback"):
+        frames = [f"{os.path.basename(frame.filename)}:{frame.lineno}" for frame in reversed(stat.traceback)]
+        stacks[";".join(frames)] += stat.size
+    return stacks
+
+def parse_importtime(lines):
+    """
+    Collapsed stacks from -X importtime output. Modules are printed after
+    the modules they imported, indented two spaces per level.
+    """
+    # (depth, name, self_us, children) of modules whose importer is not printed yet.
+    pending = []
+    for line in lines:
+        parts = line.rstrip("\n").split("|", 2)
+        if len(parts) != 3 or not parts[0].startswith("import time:"):
+            continue
+        self_us = parts[0][len("import time:"):].strip()
+        if not self_us.isdigit():
+            continue
+        # "| " separates the columns, the rest is indentation.
+        name = parts[2][1:]
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        children = []
+        while pending and pending[-1][0] > depth:
+            children.insert(0, pending.pop())
+        pending.append((depth, name, int(self_us), children))
+
+    stacks = {}
+
+    def walk(node, prefix):
+        _depth, name, self_us, children = node
+        path = f"{prefix};{name}" if prefix else name
+        stacks[path] = stacks.get(path, 0) + self_us
+        for child in children:
+            walk(child, path)
+
+    for node in pending:
+        walk(node, "")
+    return stacks
+
+def write_collapsed(path, stacks):
+    with open(path, 'w') as f:
+        for stack, value in sorted(stacks.items()):
+            if value > 0:
+                f.write(f"{stack} {value}\n")
+
+class Profiler:
+    """One profiling session of the current process."""
+
+    def __init__(self, mode, label, interval=None):
+        self.mode = mode
+        self.label = label
+        self.interval = interval
+        self.stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.dumps = 0
+        self.profile = None
+        self.previous = None
+
+    def _path(self, suffix, final):
+        part = "" if final else f"-{self.dumps}"
+        return os.path.join(PROFILE_DIR, f"{self.label}-{self.mode}-{self.stamp}{part}.{suffix}")
+
+    def start(self):
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        if self.mode == "cpu":
+            import cProfile
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        else:
+            import tracemalloc
+            tracemalloc.start(ALLOC_FRAMES)
+
+        atexit.register(self.dump, True)
+        # Without a handler SIGTERM ends the process before atexit runs.
+        if signal.getsignal(signal.SIGTERM) == signal.SIG_DFL:
+            signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+        if self.interval:
+            signal.signal(signal.SIGALRM, lambda signum, frame: self.dump(False))
+            signal.setitimer(signal.ITIMER_REAL, self.interval, self.interval)
+        logger.info(f"Profiling {self.label} ({self.mode}), writing to {PROFILE_DIR}")
+
+    def dump(self, final=False):
+        if final:
+            if self.interval:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+            atexit.unregister(self.dump)
+        self.dumps += 1
+        try:
+            if self.mode == "cpu":
+                self._dump_cpu(final)
+            else:
+                self._dump_alloc(final)
+        except Exception as e:
+            logger.error(f"Failed to write profile: {e}")
+
+    def _dump_cpu(self, final):
+        import pstats
+        path = self._path("pstats", final)
+        # dump_stats() disables the profiler; keep it running between periodic dumps.
+        self.profile.dump_stats(path)
+        if not final:
+            self.profile.enable()
+        write_collapsed(self._path("collapsed", final), collapsed_cpu_stacks(pstats.Stats(path).stats))
+        logger.info(f"Wrote CPU profile {path}")
+
+    def _dump_alloc(self, final):
+        import tracemalloc
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+        path = self._path("tracemalloc", final)
+        snapshot.dump(path)
+        write_collapsed(self._path("collapsed", final), collapsed_alloc_stacks(snapshot))
+
+        current, peak = tracemalloc.get_traced_memory()
+        logger.info(f"Wrote allocation snapshot {path}: {current // 1024} KiB live, {peak // 1024} KiB peak")
+        # Growth since the last dump is what points at a leak.
+        if self.previous is not None:
+            for stat in snapshot.compare_to(self.previous, "lineno")[:10]:
+                if stat.size_diff:
+                    logger.info(f"  {stat}")
+        self.previous = snapshot
+        if final:
+            tracemalloc.stop()
+
+def strip_profile_args(argv):
+    """argv without the --profile options, for re-running the same command."""
+    result = []
+    skip = False
+    for index, arg in enumerate(argv):
+        if skip:
+            skip = False
+            continue
+        if arg in ("--profile", "--profile-interval"):
+            following = argv[index + 1] if index + 1 < len(argv) else None
+            skip = arg == "--profile-interval" or following in MODES
+            continue
+        if arg.startswith(("--profile=", "--profile-interval=")):
+            continue
+        result.append(arg)
+    return result
+
+def run_importtime(label, argv):
+    """Re-runs the command with -X importtime and returns its exit status."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    raw_path = os.path.join(PROFILE_DIR, f"{label}-import-{stamp}.importtime")
+    command = [sys.executable, "-X", "importtime", "-m", "tweak_flx1s.main"] + strip_profile_args(argv)
+
+    timings = []
+    process = subprocess.Popen(command, stderr=subprocess.PIPE, text=True)
+    with open(raw_path, 'w') as raw:
+        for line in process.stderr:
+            if line.startswith("import time:"):
+                raw.write(line)
+                timings.append(line)
+            else:
+                # The command's own log output still reaches the terminal.
+                sys.stderr.write(line)
+    status = process.wait()
+
+    stacks = parse_importtime(timings)
+    write_collapsed(raw_path[:-len(".importtime")] + ".collapsed", stacks)
+    total_ms = sum(stacks.values()) / 1000
+    logger.info(f"Imports took {total_ms:.1f} ms, wrote {raw_path}")
+    return status
+
+def start(mode, label, interval=None):
+    """Profiles the rest of this process. import mode re-runs the command and exits."""
+    if mode == "import":
+        sys.exit(run_importtime(label, sys.argv[1:]))
+    profiler = Profiler(mode, label, interval)
+    profiler.start()
+    return profiler
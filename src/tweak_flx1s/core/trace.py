@@ -0,0 +1,209 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Timing spans for the press, gesture and monitor hot paths.
+
+Tracing is decided once per process, from TWEAK_FLX1S_TRACE if it is set
+and otherwise from the flag file `tweak-flx1s --trace on` creates. When it
+is off, traced() returns the function unchanged and span() a shared no-op,
+so the hot paths pay nothing. When it is on, every span appends one JSON
+line to TRACE_FILE, which is rotated at MAX_BYTES.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import functools
+from tweak_flx1s.const import CONFIG_DIR, CACHE_DIR
+
+TRACE_FLAG = os.path.join(CONFIG_DIR, "trace")
+TRACE_FILE = os.path.join(CACHE_DIR, "trace.jsonl")
+MAX_BYTES = 512 * 1024
+
+# Upper bucket edges for --stats, in ms.
+BUCKETS = [0.1, 0.3, 1, 3, 10, 30, 100, 300, 1000, 3000]
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+def _enabled():
+    value = os.environ.get("TWEAK_FLX1S_TRACE")
+    if value is not None:
+        return value not in ("", "0", "off")
+    return os.path.exists(TRACE_FLAG)
+
+ENABLED = _enabled()
+
+def process_age_ms():
+    """Milliseconds since this process was started, i.e. its activation latency when ready."""
+    try:
+        with open("/proc/self/stat", 'r') as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime", 'r') as f:
+            uptime = float(f.read().split()[0])
+    except (OSError, IndexError, ValueError):
+        return 0
+    return max(0, int((uptime - start_ticks / _CLOCK_TICKS) * 1000))
+
+class _TraceLog:
+    """Appends span records to TRACE_FILE. Safe across threads and processes."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.fd = None
+        self.size = 0
+
+    def _open(self):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        self.fd = os.open(TRACE_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_CLOEXEC, 0o600)
+        self.size = os.fstat(self.fd).st_size
+
+    def _rotate(self):
+        # Another process may have rotated already; then just follow it.
+        try:
+            rotated = os.stat(TRACE_FILE).st_ino != os.fstat(self.fd).st_ino
+        except FileNotFoundError:
+            rotated = True
+        if not rotated:
+            os.replace(TRACE_FILE, TRACE_FILE + ".1")
+        os.close(self.fd)
+        self._open()
+
+    def write(self, name, ms):
+        line = f'{{"t":{time.time():.3f},"n":{json.dumps(name)},"ms":{ms:.3f},"p":{os.getpid()}}}\n'
+        with self.lock:
+            try:
+                if self.fd is None:
+                    self._open()
+                elif self.size >= MAX_BYTES:
+                    self._rotate()
+                # One write per line, so O_APPEND keeps lines from different processes whole.
+                self.size += os.write(self.fd, line.encode())
+            except OSError:
+                pass
+
+_log = _TraceLog()
+
+def record(name, ms):
+    """Records a span measured elsewhere."""
+    if ENABLED:
+        _log.write(name, ms)
+
+class _Span:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.monotonic_ns()
+        return self
+
+    def __exit__(self, *exc):
+        _log.write(self.name, (time.monotonic_ns() - self.started) / 1e6)
+        return False
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+def span(name):
+    """Context manager timing the enclosed block as name."""
+    return _Span(name) if ENABLED else _NULL_SPAN
+
+def traced(name):
+    """Decorator timing every call of the function as name."""
+    def decorate(func):
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.monotonic_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _log.write(name, (time.monotonic_ns() - started) / 1e6)
+        return wrapper
+    return decorate
+
+def set_enabled(enabled):
+    """Turns tracing on or off for processes started from now on."""
+    if enabled:
+        os.makedirs(CONFIG_DIR, exist_ok=True)
+        open(TRACE_FLAG, 'a').close()
+    elif os.path.exists(TRACE_FLAG):
+        os.remove(TRACE_FLAG)
+
+def load_spans():
+    """Returns {name: [ms, ...]} from the current and the rotated trace file."""
+    spans = {}
+    for path in (TRACE_FILE + ".1", TRACE_FILE):
+        try:
+            with open(path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        spans.setdefault(entry["n"], []).append(float(entry["ms"]))
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except OSError:
+            continue
+    return spans
+
+def _rank(ordered, p):
+    return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))]
+
+def _bucket_label(index):
+    low = BUCKETS[index - 1] if index > 0 else 0
+    if index == len(BUCKETS):
+        return f">{low:g} ms"
+    return f"{low:g}-{BUCKETS[index]:g} ms"
+
+def print_stats(out=sys.stdout, width=40):
+    """Prints percentiles and a latency histogram per span name."""
+    spans = load_spans()
+    if not spans:
+        state = "on" if ENABLED else "off (enable with tweak-flx1s --trace on)"
+        print(f"No spans in {TRACE_FILE}. Tracing is {state}.", file=out)
+        return
+
+    for name in sorted(spans):
+        ordered = sorted(spans[name])
+        print(f"{name}: n={len(ordered)} p50={_rank(ordered, 50):.2f} p95={_rank(ordered, 95):.2f} "
+              f"p99={_rank(ordered, 99):.2f} max={ordered[-1]:.2f} ms", file=out)
+
+        counts = [0] * (len(BUCKETS) + 1)
+        for ms in ordered:
+            index = 0
+            while index < len(BUCKETS) and ms > BUCKETS[index]:
+                index += 1
+            counts[index] += 1
+
+        used = [i for i, count in enumerate(counts) if count]
+        peak = max(counts)
+        for index in range(used[0], used[-1] + 1):
+            bar = "#" * round(counts[index] / peak * width)
+            print(f"  {_bucket_label(index):>14} {bar:<{width}} {counts[index]}", file=out)
+        print(file=out)
@@ -0,0 +1,151 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import array
+import socket
+import struct
+
+DISPLAY_ID = 1
+
+class WaylandError(Exception):
+    """Raised when the compositor is unreachable or reports a protocol error."""
+
+def pack_string(value):
+    """Encodes a string argument: length with NUL, then padded bytes."""
+    data = value.encode() + b"\0"
+    padding = (4 - len(data) % 4) % 4
+    return struct.pack("<I", len(data)) + data + b"\0" * padding
+
+def unpack_string(payload, offset):
+    """Decodes a string argument, returns (value, next_offset)."""
+    length, = struct.unpack_from("<I", payload, offset)
+    start = offset + 4
+    value = payload[start:start + length - 1].decode(errors="replace")
+    return value, start + length + (4 - length % 4) % 4
+
+class WaylandConnection:
+    """
+    Minimal Wayland wire protocol client.
+    Only covers what is needed to bind globals and send requests on them,
+    so no libwayland bindings are required.
+    """
+
+    def __init__(self, display=None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM | socket.SOCK_CLOEXEC)
+        try:
+            self.sock.connect(self._socket_path(display))
+        except OSError as e:
+            self.sock.close()
+            raise WaylandError(f"Cannot connect to Wayland display: {e}")
+
+        self.next_id = DISPLAY_ID + 1
+        self.buffer = b""
+        self.globals = {}
+        self.handlers = {DISPLAY_ID: self._on_display_event}
+
+        self.registry = self.new_id()
+        self.handlers[self.registry] = self._on_registry_event
+        self.send(DISPLAY_ID, 1, struct.pack("<I", self.registry))
+        self.roundtrip()
+
+    @staticmethod
+    def _socket_path(display):
+        display = display or os.environ.get("WAYLAND_DISPLAY", "wayland-0")
+        if os.path.isabs(display):
+            return display
+        runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+        if not runtime_dir:
+            raise WaylandError("XDG_RUNTIME_DIR is not set")
+        return os.path.join(runtime_dir, display)
+
+    def new_id(self):
+        oid = self.next_id
+        self.next_id += 1
+        return oid
+
+    def send(self, object_id, opcode, payload=b"", fds=None):
+        """Sends a request. File descriptors travel as SCM_RIGHTS ancillary data."""
+        message = struct.pack("<II", object_id, ((8 + len(payload)) << 16) | opcode) + payload
+        try:
+            if fds:
+                self.sock.sendmsg([message], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array("i", fds))])
+            else:
+                self.sock.sendall(message)
+        except OSError as e:
+            raise WaylandError(f"Lost connection to compositor: {e}")
+
+    def bind(self, interface, version):
+        """Binds a global by interface name and returns the new object id."""
+        if interface not in self.globals:
+            raise WaylandError(f"Compositor does not support {interface}")
+        name, available = self.globals[interface]
+        oid = self.new_id()
+        payload = struct.pack("<I", name) + pack_string(interface) + struct.pack("<II", min(version, available), oid)
+        self.send(self.registry, 0, payload)
+        return oid
+
+    def roundtrip(self):
+        """Blocks until the compositor has processed every request sent so far."""
+        callback = self.new_id()
+        done = []
+        self.handlers[callback] = lambda opcode, payload: done.append(True)
+        self.send(DISPLAY_ID, 0, struct.pack("<I", callback))
+        try:
+            while not done:
+                self.dispatch()
+        finally:
+            self.handlers.pop(callback, None)
+
+    def dispatch(self):
+        """Reads and handles whatever events are available."""
+        try:
+            data = self.sock.recv(4096)
+        except OSError as e:
+            raise WaylandError(f"Lost connection to compositor: {e}")
+        if not data:
+            raise WaylandError("Compositor closed the connection")
+
+        self.buffer += data
+        while len(self.buffer) >= 8:
+            object_id, word = struct.unpack_from("<II", self.buffer)
+            size = word >> 16
+            if len(self.buffer) < size:
+                break
+            payload = self.buffer[8:size]
+            self.buffer = self.buffer[size:]
+
+            handler = self.handlers.get(object_id)
+            if handler:
+                handler(word & 0xffff, payload)
+
+    def _on_display_event(self, opcode, payload):
+        if opcode == 0:
+            object_id, code = struct.unpack_from("<II", payload)
+            message, _offset = unpack_string(payload, 8)
+            raise WaylandError(f"Protocol error on object {object_id} (code {code}): {message}")
+
+    def _on_registry_event(self, opcode, payload):
+        if opcode == 0:
+            name, = struct.unpack_from("<I", payload)
+            interface, offset = unpack_string(payload, 4)
+            version, = struct.unpack_from("<I", payload, offset)
+            self.globals[interface] = (name, version)
+        elif opcode == 1:
+            name, = struct.unpack_from("<I", payload)
+            self.globals = {k: v for k, v in self.globals.items() if v[0] != name}
+
+    def close(self):
+        self.sock.close()
@@ -23,17 +23,35 @@ from tweak_flx1s.const import APP_ID, APP_NAME
 from tweak_flx1s.gui.window import MainWindow
 from tweak_flx1s.utils import logger
 
+# With --gapplication-service a closed window is only hidden, and destroyed
+# after this long so the memory is given back. The process then exits after
+# the inactivity timeout unless it was opened again.
+RESIDENT_TIMEOUT_SECONDS = 15 * 60
+INACTIVITY_TIMEOUT_MS = 10 * 1000
+
 class FastFLX1App(Adw.Application):
-    """Main Application class using libadwaita."""
+    """
+    Main Application class using libadwaita.
+    Started with --gapplication-service (D-Bus activation) it stays resident,
+    so opening the window again does not rebuild it.
+    """
     def __init__(self, **kwargs):
         super().__init__(application_id=APP_ID,
                          flags=Gio.ApplicationFlags.FLAGS_NONE,
                          **kwargs)
+        self.window = None
+        self.release_source_id = None
 
     def do_startup(self):
         Adw.Application.do_startup(self)
         Gtk.Window.set_default_icon_name(APP_ID)
         self._setup_css()
+        if self.is_resident():
+            self.set_inactivity_timeout(INACTIVITY_TIMEOUT_MS)
+            logger.info("Running as a resident service")
+
+    def is_resident(self):
+        return bool(self.get_flags() & Gio.ApplicationFlags.IS_SERVICE)
 
     def _setup_css(self):
         """Load and apply custom CSS."""
@@ -46,12 +64,42 @@ class FastFLX1App(Adw.Application):
             logger.error(f"CSS setup error: {e}")
 
     def do_activate(self):
-        win = self.props.active_window
-        if not win:
-            win = MainWindow(application=self)
-        win.present()
+        self._cancel_release()
+        if self.window is None:
+            self.window = MainWindow(application=self)
+            self.window.connect("close-request", self._on_close_request)
+            self.window.connect("destroy", self._on_window_destroyed)
+        elif not self.window.get_visible():
+            self.window.refresh()
+        self.window.present()
+
+    def _on_close_request(self, window):
+        if not self.is_resident():
+            return False
+        # Keep the window and its pages for the next activation.
+        window.set_visible(False)
+        self.release_source_id = GLib.timeout_add_seconds(RESIDENT_TIMEOUT_SECONDS, self._release_window)
+        return True
+
+    def _release_window(self):
+        logger.info("Window unused for a while, releasing it")
+        self.release_source_id = None
+        self.window.release()
+        return False
+
+    def _cancel_release(self):
+        if self.release_source_id is not None:
+            GLib.source_remove(self.release_source_id)
+            self.release_source_id = None
+
+    def _on_window_destroyed(self, window):
+        self._cancel_release()
+        self.window = None
 
-def start_gui():
-    """Starts the GUI application."""
+def start_gui(argv=None):
+    """
+    Starts the GUI application. argv holds the options for GApplication,
+    such as --gapplication-service.
+    """
     app = FastFLX1App()
-    return app.run(sys.argv)
+    return app.run([sys.argv[0]] + list(argv or []))
@@ -17,7 +17,7 @@ import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, GLib, Gio
-from tweak_flx1s.actions.buttons import ButtonManager, PREDEFINED_ACTIONS
+from tweak_flx1s.actions.buttons import ButtonManager, find_predefined_name
 from tweak_flx1s.gui.dialogs import ActionSelectionDialog
 from tweak_flx1s.utils import logger
 
@@ -80,13 +80,10 @@ class ButtonsPage(Adw.PreferencesPage):
         if atype == "wofi":
             row.set_subtitle(_("Wofi Menu"))
         else:
-            found = False
-            for pname, pcmd in PREDEFINED_ACTIONS.items():
-                if pcmd == val:
-                    row.set_subtitle(_(pname))
-                    found = True
-                    break
-            if not found:
+            pname = find_predefined_name(entry)
+            if pname:
+                row.set_subtitle(_(pname))
+            else:
                 row.set_subtitle(val if val else _("No Action"))
 
     def _on_custom_toggled(self, row, param, key):
@@ -20,7 +20,7 @@ from gi.repository import Gtk, Adw, GLib
 import subprocess
 import threading
 from loguru import logger
-from tweak_flx1s.actions.buttons import PREDEFINED_ACTIONS
+from tweak_flx1s.gui.listmodel import ConfigItem, new_store, position_of, bind_rows
 
 try:
     _
@@ -159,6 +159,7 @@ class KeyboardSelectionDialog(Adw.Window):
 class WofiItemEditor(Adw.Window):
     """Editor for a single Wofi menu item."""
     def __init__(self, parent, item_data, on_save):
+        from tweak_flx1s.actions.buttons import get_predefined_actions, find_predefined_name
         super().__init__(transient_for=parent, modal=True, title=_("Edit Item"))
         self.set_default_size(350, 600)
         self.item = item_data.copy()
@@ -194,11 +195,13 @@ class WofiItemEditor(Adw.Window):
         type_group = Adw.PreferencesGroup(title=_("Action Type"))
         page.add(type_group)
 
-        current_cmd = self.item.get("cmd", "")
-        is_predef = current_cmd in PREDEFINED_ACTIONS.values()
+        self.predefined = get_predefined_actions()
+        current_name = find_predefined_name(self.item)
+        current_cmd = self.item.get("value", self.item.get("cmd", ""))
+        is_predef = current_name is not None
         is_custom = not is_predef
 
-        self.selected_cmd = current_cmd
+        self.selected_name = current_name
 
         predef_row = Adw.ActionRow(title=_("Predefined Action"))
         predef_row.set_subtitle(_("Select from common actions"))
@@ -233,21 +236,19 @@ class WofiItemEditor(Adw.Window):
         page.add(self.predef_group)
 
         self.predef_rows = {}
-        sorted_keys = sorted(PREDEFINED_ACTIONS.keys())
 
-        for key in sorted_keys:
-            val = PREDEFINED_ACTIONS[key]
+        for key in sorted(self.predefined.keys()):
             row = Adw.ActionRow(title=_(key))
             row.set_title_lines(0)
             row.set_activatable(True)
 
             icon = Gtk.Image.new_from_icon_name("object-select-symbolic")
-            icon.set_visible(is_predef and current_cmd == val)
+            icon.set_visible(key == current_name)
             row.add_suffix(icon)
 
-            self.predef_rows[val] = icon
+            self.predef_rows[key] = icon
 
-            row.connect("activated", lambda row, v=val, k=key: GLib.idle_add(lambda: self._on_predef_activated(v, k) or False))
+            row.connect("activated", lambda row, k=key: GLib.idle_add(lambda: self._on_predef_activated(k) or False))
             self.predef_group.add(row)
 
     def _on_type_toggled(self, chk, type_name):
@@ -261,36 +262,32 @@ class WofiItemEditor(Adw.Window):
         elif type_name == "predefined":
             self.cmd_entry.set_visible(False)
             self.predef_group.set_visible(True)
-            if self.selected_cmd in PREDEFINED_ACTIONS.values():
-                 self._update_predef_icons(self.selected_cmd)
-            else:
-                 self._update_predef_icons(None)
+            self._update_predef_icons(self.selected_name)
 
-    def _update_predef_icons(self, active_val):
-        for val, icon in self.predef_rows.items():
-            icon.set_visible(val == active_val)
+    def _update_predef_icons(self, active_name):
+        for name, icon in self.predef_rows.items():
+            icon.set_visible(name == active_name)
 
-    def _on_predef_activated(self, cmd_val, key_name):
+    def _on_predef_activated(self, key_name):
         self.predef_chk.set_active(True)
-        self.selected_cmd = cmd_val
-        self._update_predef_icons(cmd_val)
+        self.selected_name = key_name
+        self._update_predef_icons(key_name)
 
         self.label_entry.set_text(_(key_name))
 
-        self.cmd_entry.set_text(cmd_val)
+        conf = self.predefined[key_name]
+        if conf["type"] == "command":
+            self.cmd_entry.set_text(conf["value"])
 
     def _on_save_clicked(self, btn):
         if self.on_save:
-            final_cmd = ""
-            if self.predef_chk.get_active():
-                final_cmd = self.selected_cmd
+            if self.predef_chk.get_active() and self.selected_name:
+                action = dict(self.predefined[self.selected_name])
             else:
-                final_cmd = self.cmd_entry.get_text()
+                action = {"type": "command", "value": self.cmd_entry.get_text()}
 
-            new_item = {
-                "label": self.label_entry.get_text(),
-                "cmd": final_cmd
-            }
+            new_item = {"label": self.label_entry.get_text()}
+            new_item.update(action)
             self.on_save(new_item)
         GLib.idle_add(lambda: self.close() or False)
 
@@ -323,9 +320,12 @@ class WofiMenuEditor(Adw.Window):
         close_btn.connect("clicked", lambda x: GLib.idle_add(lambda: self.close() or False))
         header.pack_end(close_btn)
 
+        self.store = new_store(self._new_item(item) for item in self.items)
+
         self.list_box = Gtk.ListBox()
         self.list_box.add_css_class("boxed-list")
         self.list_box.set_selection_mode(Gtk.SelectionMode.NONE)
+        bind_rows(self.list_box, self.store, self._on_edit, self._on_delete)
 
         scroll = Gtk.ScrolledWindow()
         scroll.set_child(self.list_box)
@@ -335,32 +335,12 @@ class WofiMenuEditor(Adw.Window):
 
         content.set_content(clamp)
 
-        self._refresh_list()
-
-    def _refresh_list(self):
-        child = self.list_box.get_first_child()
-        while child:
-            self.list_box.remove(child)
-            child = self.list_box.get_first_child()
-
-        for idx, item in enumerate(self.items):
-            row = Adw.ActionRow(title=item.get("label", _("New Item")))
-            row.set_subtitle(item.get("cmd", ""))
-            row.set_title_lines(0)
-            row.set_subtitle_lines(0)
-
-            edit_btn = Gtk.Button(icon_name="document-edit-symbolic")
-            edit_btn.add_css_class("flat")
-            edit_btn.connect("clicked", lambda b: GLib.idle_add(lambda: self._on_edit(b, idx) or False))
-            row.add_suffix(edit_btn)
-
-            del_btn = Gtk.Button(icon_name="user-trash-symbolic")
-            del_btn.add_css_class("flat")
-            del_btn.add_css_class("error")
-            del_btn.connect("clicked", lambda b: GLib.idle_add(lambda: self._on_delete(b, idx) or False))
-            row.add_suffix(del_btn)
-
-            self.list_box.append(row)
+    @staticmethod
+    def _new_item(item):
+        from tweak_flx1s.actions.buttons import find_predefined_name
+        predef_name = find_predefined_name(item)
+        subtitle = _(predef_name) if predef_name else item.get("value", item.get("cmd", ""))
+        return ConfigItem(item, item.get("label", _("New Item")), subtitle)
 
     def _on_add(self, btn):
         if len(self.items) >= 7:
@@ -368,23 +348,31 @@ class WofiMenuEditor(Adw.Window):
             return
         self._show_item_editor(None)
 
-    def _on_edit(self, btn, idx):
-        self._show_item_editor(idx)
+    def _on_edit(self, row_item):
+        self._show_item_editor(row_item)
 
-    def _on_delete(self, btn, idx):
-        self.items.pop(idx)
-        self._refresh_list()
+    def _on_delete(self, row_item):
+        position = position_of(self.store, row_item)
+        if position is None:
+            return
+        self.items.pop(position)
+        self.store.remove(position)
 
-    def _show_item_editor(self, idx):
-        is_new = idx is None
-        item = self.items[idx] if not is_new else {"label": "", "cmd": ""}
+    def _show_item_editor(self, row_item):
+        is_new = row_item is None
+        item = row_item.data if not is_new else {"label": "", "type": "command", "value": ""}
 
         def on_save(new_item):
+            updated = self._new_item(new_item)
             if is_new:
                 self.items.append(new_item)
+                self.store.append(updated)
             else:
-                self.items[idx] = new_item
-            self._refresh_list()
+                position = position_of(self.store, row_item)
+                if position is None:
+                    return
+                self.items[position] = new_item
+                row_item.update(new_item, updated.title, updated.subtitle)
 
         win = WofiItemEditor(self, item, on_save)
         win.present()
@@ -397,6 +385,7 @@ class WofiMenuEditor(Adw.Window):
 class ActionSelectionDialog(Adw.Window):
     """Dialog to select an action type and configure it."""
     def __init__(self, parent, current_config, on_save):
+        from tweak_flx1s.actions.buttons import get_predefined_actions, find_predefined_name
         super().__init__(transient_for=parent, modal=True, title=_("Select Action"))
         self.set_default_size(360, 600)
         self.config = current_config.copy()
@@ -425,10 +414,12 @@ class ActionSelectionDialog(Adw.Window):
         type_group = Adw.PreferencesGroup(title=_("Action Type"))
         page.add(type_group)
 
+        self.predefined = get_predefined_actions()
         c_type = self.config.get("type", "command")
         c_val = self.config.get("value", "")
+        current_name = find_predefined_name(self.config)
         is_wofi = (c_type == "wofi")
-        is_predef = (c_type == "command" and c_val in PREDEFINED_ACTIONS.values())
+        is_predef = current_name is not None
         is_custom = (c_type == "command" and not is_predef)
 
         predef_row = Adw.ActionRow(title=_("Predefined Action"))
@@ -480,24 +471,23 @@ class ActionSelectionDialog(Adw.Window):
         page.add(predef_group)
 
         self.predef_rows = {}
-        sorted_keys = sorted(PREDEFINED_ACTIONS.keys())
 
-        for key in sorted_keys:
-            val = PREDEFINED_ACTIONS[key]
+        for key in sorted(self.predefined.keys()):
             row = Adw.ActionRow(title=_(key))
             row.set_title_lines(0)
             row.set_activatable(True)
 
             icon = Gtk.Image.new_from_icon_name("object-select-symbolic")
-            icon.set_visible(is_predef and c_val == val)
+            icon.set_visible(key == current_name)
             row.add_suffix(icon)
 
-            self.predef_rows[val] = icon
+            self.predef_rows[key] = icon
 
-            row.connect("activated", lambda row, v=val: GLib.idle_add(lambda: self._on_predef_activated(v) or False))
+            row.connect("activated", lambda row, k=key: GLib.idle_add(lambda: self._on_predef_activated(k) or False))
             predef_group.add(row)
 
     def _on_type_toggled(self, chk, type_name):
+        from tweak_flx1s.actions.buttons import find_predefined_name
         if not chk.get_active(): return
 
         if type_name == "command":
@@ -513,22 +503,22 @@ class ActionSelectionDialog(Adw.Window):
             self._update_predef_icons(None)
 
         elif type_name == "predefined":
-            self.config["type"] = "command"
             self.cmd_entry.set_visible(False)
             self.edit_menu_btn.set_visible(False)
-            val = self.config.get("value")
-            self._update_predef_icons(val)
+            self._update_predef_icons(find_predefined_name(self.config))
 
-    def _update_predef_icons(self, active_val):
-        for val, icon in self.predef_rows.items():
-            icon.set_visible(val == active_val)
+    def _update_predef_icons(self, active_name):
+        for name, icon in self.predef_rows.items():
+            icon.set_visible(name == active_name)
 
-    def _on_predef_activated(self, cmd_val):
+    def _on_predef_activated(self, key_name):
         self.predef_chk.set_active(True)
-        self.config["type"] = "command"
-        self.config["value"] = cmd_val
-        self.cmd_entry.set_text(cmd_val)
-        self._update_predef_icons(cmd_val)
+        conf = self.predefined[key_name]
+        self.config["type"] = conf["type"]
+        self.config["value"] = conf["value"]
+        if conf["type"] == "command":
+            self.cmd_entry.set_text(conf["value"])
+        self._update_predef_icons(key_name)
 
     def _on_edit_menu(self, btn):
         items = self.config.get("items", [])
@@ -540,6 +530,7 @@ class ActionSelectionDialog(Adw.Window):
 
     def _on_save(self, btn):
         if self.cmd_chk.get_active():
+            self.config["type"] = "command"
             self.config["value"] = self.cmd_entry.get_text()
 
         if self.on_save:
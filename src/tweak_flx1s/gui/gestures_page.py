@@ -13,24 +13,65 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-import subprocess
+import collections
 import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, GLib, Gio
 import os
 from tweak_flx1s.actions.gestures import GesturesManager
-from tweak_flx1s.actions.buttons import PREDEFINED_ACTIONS
+from tweak_flx1s.actions.buttons import find_predefined_name
 from tweak_flx1s.gui.dialogs import ActionSelectionDialog
 from tweak_flx1s.gui.wizard import GestureWizard
-from tweak_flx1s.utils import logger, run_command, get_device_model
-from tweak_flx1s.const import SERVICE_GESTURES
+from tweak_flx1s.gui.listmodel import ConfigItem, new_store, position_of, bind_rows
+from tweak_flx1s.utils import logger, get_device_model
+from tweak_flx1s.backends import get_backend
+from tweak_flx1s.const import SERVICE_GESTURES, SERVICE_MONITORS
 
 try:
     _
 except NameError:
     from gettext import gettext as _
 
+class SpecIndex:
+    """
+    Gesture specs in use, counted so that adding, removing or changing a
+    gesture updates it in O(1). excluding(spec) gives the view the wizard
+    checks duplicates against while that spec is being edited.
+    """
+
+    def __init__(self, specs=()):
+        self.counts = collections.Counter(spec for spec in specs if spec)
+
+    def add(self, spec):
+        if spec:
+            self.counts[spec] += 1
+
+    def remove(self, spec):
+        if spec and self.counts[spec] > 0:
+            self.counts[spec] -= 1
+            if not self.counts[spec]:
+                del self.counts[spec]
+
+    def replace(self, old, new):
+        if old != new:
+            self.remove(old)
+            self.add(new)
+
+    def excluding(self, spec):
+        return _SpecsExcluding(self, spec)
+
+    def __contains__(self, spec):
+        return spec in self.counts
+
+class _SpecsExcluding:
+    def __init__(self, index, spec):
+        self.index = index
+        self.spec = spec
+
+    def __contains__(self, spec):
+        return self.index.counts.get(spec, 0) > (1 if spec == self.spec else 0)
+
 class GestureEditor(Adw.Window):
     """Editor for individual gestures."""
     def __init__(self, parent, gesture_data, on_save, used_specs=None):
@@ -103,10 +144,7 @@ class GestureEditor(Adw.Window):
             self.gesture["spec"] = new_spec
             row.set_subtitle(new_spec)
 
-        current_spec = self.gesture.get("spec")
-        specs_to_exclude = [s for s in self.used_specs if s != current_spec]
-
-        wiz = GestureWizard(self, on_complete, used_specs=specs_to_exclude)
+        wiz = GestureWizard(self, on_complete, used_specs=self.used_specs)
         wiz.present()
 
     def _update_subtitle(self, row, state_key):
@@ -117,13 +155,10 @@ class GestureEditor(Adw.Window):
         if atype == "wofi":
             row.set_subtitle(_("Wofi Menu"))
         else:
-            found = False
-            for pname, pcmd in PREDEFINED_ACTIONS.items():
-                if pcmd == val:
-                    row.set_subtitle(_(pname))
-                    found = True
-                    break
-            if not found:
+            pname = find_predefined_name(conf)
+            if pname:
+                row.set_subtitle(_(pname))
+            else:
                 row.set_subtitle(val if val else _("No Action"))
 
     def _on_edit_action(self, btn, state_key):
@@ -156,8 +191,9 @@ class GestureEditor(Adw.Window):
 
 class GesturesPage(Adw.PreferencesPage):
     """Page for configuring gestures."""
-    def __init__(self, **kwargs):
+    def __init__(self, backend=None, **kwargs):
         super().__init__(title=_("Gestures"), icon_name="input-touchpad-symbolic", **kwargs)
+        self.services = (backend or get_backend()).services
         self.manager = GesturesManager()
         self.config = self.manager.config
 
@@ -185,18 +221,20 @@ class GesturesPage(Adw.PreferencesPage):
         list_group = Adw.PreferencesGroup(title=_("Configured Gestures"))
         self.add(list_group)
 
+        gestures = self.config.get("gestures", [])
+        self.used_specs = SpecIndex(g.get("spec") for g in gestures)
+        self.store = new_store(self._new_item(g) for g in gestures)
+
         self.list_box = Gtk.ListBox()
         self.list_box.add_css_class("boxed-list")
         self.list_box.set_selection_mode(Gtk.SelectionMode.NONE)
+        bind_rows(self.list_box, self.store, self._on_edit, self._on_delete)
         list_group.add(self.list_box)
 
-        self._refresh_list()
-
     def _is_service_running(self, service):
         """Checks if a service is active (running)."""
         try:
-            cmd = ["systemctl", "--user", "is-active", "--quiet", service]
-            return subprocess.call(cmd) == 0
+            return self.services.is_active(service)
         except Exception as e:
             logger.warning(f"Failed to check active status for {service}: {e}")
             return False
@@ -218,13 +256,13 @@ class GesturesPage(Adw.PreferencesPage):
                 with open(os.path.join(conf_dir, "device.conf"), "w") as f:
                     f.write(f"[Service]\nEnvironment=LISGD_INPUT_DEVICE={dev_path}\n")
 
-                run_command(f"systemctl --user enable {SERVICE_GESTURES}")
-                run_command("systemctl --user daemon-reload")
-                run_command(f"systemctl --user start {SERVICE_GESTURES}")
+                self.services.enable(SERVICE_GESTURES)
+                self.services.daemon_reload()
+                self.services.start(SERVICE_GESTURES)
             else:
-                run_command(f"systemctl --user stop {SERVICE_GESTURES}")
-                run_command(f"systemctl --user disable {SERVICE_GESTURES}")
-                run_command("systemctl --user daemon-reload")
+                self.services.stop(SERVICE_GESTURES)
+                self.services.disable(SERVICE_GESTURES)
+                self.services.daemon_reload()
 
                 # Cleanup override
                 conf_dir = os.path.expanduser(f"~/.config/systemd/user/{SERVICE_GESTURES}.d")
@@ -244,42 +282,12 @@ class GesturesPage(Adw.PreferencesPage):
              logger.warning(f"Service {SERVICE_GESTURES} state mismatch. Expected: {should_be_active}, Actual: {is_running}")
              row.set_active(is_running)
 
-    def _refresh_list(self):
-        child = self.list_box.get_first_child()
-        while child:
-            self.list_box.remove(child)
-            child = self.list_box.get_first_child()
+    @staticmethod
+    def _row_text(gesture):
+        return gesture.get("name", _("Unnamed Gesture")), gesture.get("spec", "")
 
-        gestures = self.config.get("gestures", [])
-        for idx, gesture in enumerate(gestures):
-            name = gesture.get("name", _("Unnamed Gesture"))
-            spec = gesture.get("spec", "")
-
-            row = Adw.ActionRow(title=name, subtitle=spec)
-            row.set_title_lines(0)
-            row.set_subtitle_lines(0)
-
-            edit_btn = Gtk.Button(icon_name="document-edit-symbolic")
-            edit_btn.add_css_class("flat")
-            edit_btn.connect("clicked", lambda b: GLib.idle_add(lambda: self._on_edit(b, idx) or False))
-            row.add_suffix(edit_btn)
-
-            del_btn = Gtk.Button(icon_name="user-trash-symbolic")
-            del_btn.add_css_class("flat")
-            del_btn.add_css_class("error")
-            del_btn.connect("clicked", lambda b: GLib.idle_add(lambda: self._on_delete(b, idx) or False))
-            row.add_suffix(del_btn)
-
-            self.list_box.append(row)
-
-    def _get_used_specs(self, exclude_idx=None):
-        gestures = self.config.get("gestures", [])
-        specs = []
-        for i, g in enumerate(gestures):
-            if exclude_idx is None or i != exclude_idx:
-                s = g.get("spec")
-                if s: specs.append(s)
-        return specs
+    def _new_item(self, gesture):
+        return ConfigItem(gesture, *self._row_text(gesture))
 
     def _on_add(self, btn):
         def on_wizard_complete(spec):
@@ -291,42 +299,53 @@ class GesturesPage(Adw.PreferencesPage):
             }
             self._show_editor(None, new_data)
 
-        wiz = GestureWizard(self.get_root(), on_wizard_complete, used_specs=self._get_used_specs())
+        wiz = GestureWizard(self.get_root(), on_wizard_complete, used_specs=self.used_specs)
         wiz.present()
 
-    def _on_edit(self, btn, idx):
-        self._show_editor(idx)
-
-    def _on_delete(self, btn, idx):
-        gestures = self.config.get("gestures", [])
-        if 0 <= idx < len(gestures):
-            gestures.pop(idx)
-            self.manager.save_config(self.config)
-            self._refresh_list()
-            self._restart_service()
+    def _on_edit(self, item):
+        self._show_editor(item)
+
+    def _on_delete(self, item):
+        # The store mirrors the gestures list, so positions match.
+        position = position_of(self.store, item)
+        if position is None:
+            return
+        self.config.get("gestures", []).pop(position)
+        self.store.remove(position)
+        self.used_specs.remove(item.data.get("spec"))
+        self.manager.save_config(self.config)
+        self._restart_service()
 
-    def _show_editor(self, idx, initial_data=None):
-        gestures = self.config.get("gestures", [])
-        is_new = idx is None
+    def _show_editor(self, item, initial_data=None):
+        gestures = self.config.setdefault("gestures", [])
+        is_new = item is None
 
         if is_new:
             gesture_data = initial_data if initial_data else {}
+            used_specs = self.used_specs
         else:
-            gesture_data = gestures[idx]
-
-        used_specs = self._get_used_specs(exclude_idx=idx)
+            gesture_data = item.data
+            used_specs = self.used_specs.excluding(item.data.get("spec"))
 
         def on_save(new_data):
             if is_new:
                 gestures.append(new_data)
+                self.store.append(self._new_item(new_data))
+                self.used_specs.add(new_data.get("spec"))
             else:
-                gestures[idx] = new_data
+                position = position_of(self.store, item)
+                if position is None:
+                    return
+                gestures[position] = new_data
+                self.used_specs.replace(item.data.get("spec"), new_data.get("spec"))
+                item.update(new_data, *self._row_text(new_data))
             self.manager.save_config(self.config)
-            self._refresh_list()
             self._restart_service()
 
         win = GestureEditor(self.get_root(), gesture_data, on_save, used_specs=used_specs)
         win.present()
 
     def _restart_service(self):
-        run_command(f"systemctl --user daemon-reload && systemctl --user restart {SERVICE_GESTURES}", check=False)
+        self.services.daemon_reload(check=False)
+        self.services.restart(SERVICE_GESTURES, check=False)
+        self.services.try_restart(SERVICE_MONITORS, check=False)
@@ -0,0 +1,78 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Config lists shown as boxed-list rows backed by a Gio.ListStore.
+
+The list box is bound to the store, so adding or removing an item creates or
+drops one row, and editing an item updates its row through property bindings
+without rebuilding anything.
+"""
+
+import gi
+gi.require_version('Gtk', '4.0')
+gi.require_version('Adw', '1')
+from gi.repository import Gtk, Adw, Gio, GLib, GObject
+
+class ConfigItem(GObject.Object):
+    """One entry of a config list: the dict itself plus the text its row shows."""
+
+    title = GObject.Property(type=str, default="")
+    subtitle = GObject.Property(type=str, default="")
+
+    def __init__(self, data, title, subtitle):
+        super().__init__(title=title, subtitle=subtitle)
+        self.data = data
+
+    def update(self, data, title, subtitle):
+        self.data = data
+        if self.title != title:
+            self.title = title
+        if self.subtitle != subtitle:
+            self.subtitle = subtitle
+
+def new_store(items=()):
+    store = Gio.ListStore(item_type=ConfigItem)
+    store.splice(0, 0, list(items))
+    return store
+
+def position_of(store, item):
+    """Index of item in the store, or None if it was removed meanwhile."""
+    found, position = store.find(item)
+    return position if found else None
+
+def bind_rows(list_box, store, on_edit, on_delete):
+    """Shows store in list_box as rows with edit and delete buttons; the callbacks get the item."""
+
+    def create_row(item):
+        row = Adw.ActionRow()
+        row.set_title_lines(0)
+        row.set_subtitle_lines(0)
+        item.bind_property("title", row, "title", GObject.BindingFlags.SYNC_CREATE)
+        item.bind_property("subtitle", row, "subtitle", GObject.BindingFlags.SYNC_CREATE)
+
+        edit_btn = Gtk.Button(icon_name="document-edit-symbolic")
+        edit_btn.add_css_class("flat")
+        edit_btn.connect("clicked", lambda b: GLib.idle_add(lambda: on_edit(item) or False))
+        row.add_suffix(edit_btn)
+
+        del_btn = Gtk.Button(icon_name="user-trash-symbolic")
+        del_btn.add_css_class("flat")
+        del_btn.add_css_class("error")
+        del_btn.connect("clicked", lambda b: GLib.idle_add(lambda: on_delete(item) or False))
+        row.add_suffix(del_btn)
+        return row
+
+    list_box.bind_model(store, create_row)
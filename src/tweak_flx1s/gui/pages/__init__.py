@@ -13,6 +13,18 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from .tweaks_page import TweaksPage
-from .actions_page import ActionsPage
-from .system_page import SystemPage
+import importlib
+
+# Pages are imported on first use, so importing one page does not load them all.
+_PAGES = {
+    "TweaksPage": ".tweaks_page",
+    "ActionsPage": ".actions_page",
+    "SystemPage": ".system_page",
+}
+
+__all__ = list(_PAGES)
+
+def __getattr__(name):
+    if name not in _PAGES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_PAGES[name], __name__), name)
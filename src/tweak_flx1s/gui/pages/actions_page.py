@@ -17,8 +17,6 @@ import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, GLib
-from tweak_flx1s.gui.buttons_page import ButtonsPage
-from tweak_flx1s.gui.gestures_page import GesturesPage
 
 try:
     _
@@ -65,6 +63,7 @@ class ActionsPage(Adw.PreferencesPage):
         close_btn.connect("clicked", lambda b: GLib.idle_add(lambda: win.close() or False))
         header.pack_end(close_btn)
 
+        from tweak_flx1s.gui.buttons_page import ButtonsPage
         page = ButtonsPage()
         content.set_content(page)
         win.present()
@@ -83,6 +82,7 @@ class ActionsPage(Adw.PreferencesPage):
         close_btn.connect("clicked", lambda b: GLib.idle_add(lambda: win.close() or False))
         header.pack_end(close_btn)
 
+        from tweak_flx1s.gui.gestures_page import GesturesPage
         page = GesturesPage()
         content.set_content(page)
         win.present()
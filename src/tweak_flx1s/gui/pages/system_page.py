@@ -16,15 +16,12 @@
 import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
-from gi.repository import Gtk, Adw, GLib
+from gi.repository import Gtk, Adw, GLib, Gio
 from loguru import logger
 from tweak_flx1s.utils import run_command, get_device_model
+from tweak_flx1s.backends import get_backend
+from tweak_flx1s.backends.real import DPKG_STATUS
 from tweak_flx1s.gui.dialogs import ExecutionDialog, KeyboardSelectionDialog
-try:
-    from tweak_flx1s.gui.password_dialog import PasswordChangeDialog
-except ImportError:
-    PasswordChangeDialog = None
-
 from tweak_flx1s.system.package_manager import PackageManager
 from tweak_flx1s.system.keyboard import KeyboardManager
 from tweak_flx1s.system.phofono import PhofonoManager
@@ -38,21 +35,24 @@ try:
 except NameError:
     from gettext import gettext as _
 
+DPKG_SETTLE_MS = 1000
+
 class SystemPage(Adw.PreferencesPage):
     """
     Page for system-level settings.
     Includes: Keyboard, Environment, Updates, Security, Bat-Mon, Phofono, Wofi.
     """
-    def __init__(self, window, **kwargs):
+    def __init__(self, window, backend=None, **kwargs):
         super().__init__(title=_("System"), icon_name="emblem-system-symbolic", **kwargs)
         self.window = window
-        self.pkg_mgr = PackageManager()
-        self.kbd_mgr = KeyboardManager()
-        self.phofono_mgr = PhofonoManager()
-        self.bat_mgr = BatMonManager()
+        backend = backend or get_backend()
+        self.pkg_mgr = PackageManager(backend=backend)
+        self.kbd_mgr = KeyboardManager(backend=backend)
+        self.phofono_mgr = PhofonoManager(backend=backend)
+        self.bat_mgr = BatMonManager(backend=backend)
         self.wofi_mgr = WofiManager()
-        self.pam_mgr = PamManager()
-        self.debui_mgr = DebUiManager()
+        self.pam_mgr = PamManager(backend=backend)
+        self.debui_mgr = DebUiManager(backend=backend)
 
         def run_pkg_cmd(title, cmd):
             try:
@@ -211,6 +211,55 @@ class SystemPage(Adw.PreferencesPage):
             self.fp_row.add_suffix(self.fp_btn)
             self._refresh_fp_ui()
 
+        self.dpkg_refresh_id = None
+        self.dpkg_monitor = self._watch_packages()
+        self.connect("destroy", lambda page: self.shutdown())
+
+    def shutdown(self):
+        """Stops watching dpkg, so the page holds no references from outside the widget tree."""
+        if self.dpkg_refresh_id is not None:
+            GLib.source_remove(self.dpkg_refresh_id)
+            self.dpkg_refresh_id = None
+        if self.dpkg_monitor is not None:
+            self.dpkg_monitor.cancel()
+            self.dpkg_monitor = None
+
+    def refresh(self):
+        """Re-reads package, keyboard and PAM state."""
+        self._refresh_packages()
+        self._update_kbd_subtitle()
+        if hasattr(self, "fp_btn"):
+            self._refresh_fp_ui()
+
+    def _refresh_packages(self):
+        self._refresh_env_ui()
+        self._refresh_squeekboard_ui()
+        self._refresh_bat_mon()
+        self._refresh_phofono()
+        self._refresh_branchy()
+        self._refresh_debui()
+
+    def _watch_packages(self):
+        """Refreshes the package buttons when dpkg changes, also for installs started elsewhere."""
+        try:
+            monitor = Gio.File.new_for_path(DPKG_STATUS).monitor_file(Gio.FileMonitorFlags.WATCH_MOVES, None)
+        except GLib.Error as e:
+            logger.warning(f"Cannot watch {DPKG_STATUS}: {e.message}")
+            return None
+        monitor.connect("changed", self._on_dpkg_changed)
+        return monitor
+
+    def _on_dpkg_changed(self, monitor, file, other_file, event_type):
+        # dpkg rewrites the database several times per run; refresh once it settles.
+        if self.dpkg_refresh_id is not None:
+            GLib.source_remove(self.dpkg_refresh_id)
+        self.dpkg_refresh_id = GLib.timeout_add(DPKG_SETTLE_MS, self._on_dpkg_settled)
+
+    def _on_dpkg_settled(self):
+        self.dpkg_refresh_id = None
+        self._refresh_packages()
+        return False
+
     def _update_kbd_subtitle(self):
         try:
             current = self.kbd_mgr.get_current_keyboard()
@@ -320,11 +369,13 @@ class SystemPage(Adw.PreferencesPage):
             dlg.present()
 
     def _on_change_password_clicked(self):
-        if PasswordChangeDialog:
-            dlg = PasswordChangeDialog(self.window)
-            dlg.present()
-        else:
-            logger.error("PasswordChangeDialog not available (ImportError?)")
+        try:
+            from tweak_flx1s.gui.password_dialog import PasswordChangeDialog
+        except ImportError as e:
+            logger.error(f"PasswordChangeDialog not available: {e}")
+            return
+        dlg = PasswordChangeDialog(self.window)
+        dlg.present()
 
     def _refresh_debui(self):
         try:
@@ -14,41 +14,56 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import os
-import shutil
 import shlex
-import subprocess
 import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, GLib
-from tweak_flx1s.const import SERVICE_ALARM, SERVICE_GUARD, SERVICE_GESTURES, APP_NAME
-from tweak_flx1s.utils import run_command, logger
+from tweak_flx1s.const import SERVICE_ALARM, SERVICE_GUARD, SERVICE_GESTURES, SERVICE_KEYS, SERVICE_CLIPBOARD, SERVICE_CAMERA, SERVICE_MEMORY, SERVICE_BUTTONS, SERVICE_MONITORS, APP_NAME
+from tweak_flx1s.utils import logger
+from tweak_flx1s.backends import get_backend
 from tweak_flx1s.system.andromeda import AndromedaManager
-from tweak_flx1s.system.sounds import SoundManager
+from tweak_flx1s.system.sounds import SoundManager, SOUND_SCHEMA
 from tweak_flx1s.gui.dialogs import ExecutionDialog
+from tweak_flx1s.core.bus import get_proxy, subscribe, unsubscribe, call as bus_call
+from tweak_flx1s.core.assets import AssetBundle
 try:
     _
 except NameError:
     from gettext import gettext as _
 
+SYSTEMD_NAME = "org.freedesktop.systemd1"
+SYSTEMD_PATH = "/org/freedesktop/systemd1"
+SYSTEMD_MANAGER = "org.freedesktop.systemd1.Manager"
+UNITS_SETTLE_MS = 300
+# Units that exit when idle; their switch follows the enabled state.
+ON_DEMAND_SERVICES = (SERVICE_ALARM, SERVICE_GUARD)
+
 class TweaksPage(Adw.PreferencesPage):
     """
     Page for general tweaks.
     Includes: Alarm Volume, Andromeda Guard (OSK),
     Android Shared Folders, Custom Sounds, Appearance.
     """
-    def __init__(self, window, **kwargs):
+    def __init__(self, window, backend=None, **kwargs):
         super().__init__(title=_("Tweaks"), icon_name="preferences-system-symbolic", **kwargs)
         self.window = window
-        self.andromeda = AndromedaManager()
-        self.sounds = SoundManager()
+        backend = backend or get_backend()
+        self.services = backend.services
+        self.settings = backend.settings
+        self.andromeda = AndromedaManager(backend=backend)
+        self.sounds = SoundManager(backend=backend)
+        # key -> (row, handler id, function returning the current state)
+        self.rows = {}
+        self.units_refresh_id = None
+        self.units_pending = set()
+        self.css_assets = None
 
         appearance_grp = Adw.PreferencesGroup(title=_("Appearance"))
         self.add(appearance_grp)
 
         css_row = Adw.SwitchRow(title=_("GTK3 CSS Tweak"), subtitle=_("Apply custom UI scaling tweaks for GTK3 apps"))
-        css_row.set_active(self._is_gtk_tweak_active())
-        css_row.connect("notify::active", lambda r, p: GLib.idle_add(lambda: self._on_css_toggled(r, p) or False))
+        self._bind_row("css", css_row, self._is_gtk_tweak_active, self._on_css_toggled)
         appearance_grp.add(css_row)
 
         svc_group = Adw.PreferencesGroup(title=_("Background Services"))
@@ -56,56 +71,143 @@ class TweaksPage(Adw.PreferencesPage):
 
         self._add_service_row(svc_group, _("Alarm Volume Fix"), _("Ensure alarm plays at full volume"), SERVICE_ALARM)
         self._add_service_row(svc_group, _("Andromeda Guard"), _("Prevent OSK issues"), SERVICE_GUARD)
+        guard_start_row = Adw.SwitchRow(title=_("Start Guard with Andromeda"),
+                                        subtitle=_("Let the Andromeda session start the guard, so it does not have to keep running"))
+        self._bind_row("guard-activation", guard_start_row, self._is_guard_activation_installed, self._on_guard_activation_toggled)
+        svc_group.add(guard_start_row)
+        self._add_service_row(svc_group, _("Fast Key Shortcuts"), _("Keep a virtual keyboard open for key actions"), SERVICE_KEYS)
+        self._add_service_row(svc_group, _("Clipboard History"), _("Remember recently copied items"), SERVICE_CLIPBOARD)
+        self._add_service_row(svc_group, _("Fast Camera Shortcut"), _("Keep the camera ready for a while after taking a picture"), SERVICE_CAMERA)
+        self._add_service_row(svc_group, _("Memory Pressure Responder"), _("Warn about or close the biggest app when memory runs low"), SERVICE_MEMORY)
+        self._add_service_row(svc_group, _("Fast Assistant Button"), _("Recognise button presses without the assistant-button scripts"), SERVICE_BUTTONS)
+        self._add_service_row(svc_group, _("Combined Monitors"), _("Run the alarm, guard and gesture monitors in one process"), SERVICE_MONITORS)
 
         shared_group = Adw.PreferencesGroup(title=_("Andromeda Integration"))
         self.add(shared_group)
 
         shared_row = Adw.SwitchRow(title=_("Shared Folders"), subtitle=_("Mount ~/.local/share/andromeda to ~/Android-Share"))
-        is_mounted = self.andromeda.is_mounted()
-        user = GLib.get_user_name()
-        service_name = f"tweak-flx1s-andromeda-fs@{user}.service"
-        is_running = self._is_service_running(service_name, user_bus=False)
-
-        shared_row.set_active(is_mounted and is_running)
-        shared_row.connect("notify::active", lambda r, p: GLib.idle_add(lambda: self._on_shared_toggled(r, p) or False))
+        self._bind_row("shared", shared_row, self._is_shared_active, self._on_shared_toggled)
         shared_group.add(shared_row)
 
         sound_group = Adw.PreferencesGroup(title=_("Audio"))
         self.add(sound_group)
 
         sound_row = Adw.SwitchRow(title=_("Custom Sound Theme"), subtitle=_("Use fastflx1 custom sounds"))
-        sound_row.set_active(self.sounds.is_custom_theme_active())
-        sound_row.connect("notify::active", lambda r, p: GLib.idle_add(lambda: self._on_sound_toggled(r, p) or False))
+        self._bind_row("sound", sound_row, self.sounds.is_custom_theme_active, self._on_sound_toggled)
         sound_group.add(sound_row)
 
-    def _get_css_paths(self):
-        """Returns (source_path, target_path) for GTK3 CSS."""
-        installed_path = "/usr/share/tweak-flx1s/configs/gtk-3.0/gtk.css"
-        if os.path.exists(installed_path):
-            source = installed_path
+        self.units_subscriptions = self._watch_units()
+        # The theme can also be changed in GNOME Settings or with gsettings.
+        self.sound_watch = self.settings.connect(SOUND_SCHEMA, "theme-name", lambda value: self.refresh(["sound"]))
+        self.connect("destroy", lambda page: self.shutdown())
+
+    def shutdown(self):
+        """Drops the bus and settings subscriptions, so the page holds no references from outside the widget tree."""
+        for handle in self.units_subscriptions:
+            unsubscribe(handle)
+        self.units_subscriptions = []
+        if self.sound_watch is not None:
+            self.settings.disconnect(self.sound_watch)
+            self.sound_watch = None
+        if self.units_refresh_id is not None:
+            GLib.source_remove(self.units_refresh_id)
+            self.units_refresh_id = None
+
+    def _bind_row(self, key, row, read, on_toggled):
+        """Shows read() on a switch row, and runs on_toggled(row, param) when the user flips it."""
+        row.set_active(read())
+        handler_id = row.connect("notify::active", lambda r, p: GLib.idle_add(lambda: on_toggled(r, p) or False))
+        self.rows[key] = (row, handler_id, read)
+
+    def refresh(self, keys=None):
+        """Re-reads the state behind the switches (all, or the given keys) without acting on it."""
+        for key, (row, handler_id, read) in self.rows.items():
+            if keys is not None and key not in keys:
+                continue
+            active = read()
+            if row.get_active() != active:
+                row.handler_block(handler_id)
+                row.set_active(active)
+                row.handler_unblock(handler_id)
+
+    def _watch_units(self):
+        """Follows unit starts, stops and enables on the user manager, also those made outside the app."""
+        try:
+            manager = get_proxy(SYSTEMD_NAME, SYSTEMD_PATH, SYSTEMD_MANAGER)
+            bus_call(manager, "Subscribe")
+            return [subscribe(SYSTEMD_NAME, SYSTEMD_MANAGER, member, self._on_units_changed)
+                    for member in ("JobRemoved", "UnitFilesChanged")]
+        except GLib.Error as e:
+            logger.warning(f"Not following systemd unit changes: {e.message}")
+            return []
+
+    def _on_units_changed(self, parameters):
+        # A hidden window is refreshed as a whole when it is shown again.
+        if not self.get_mapped():
+            return
+        if parameters.n_children() >= 3:
+            # JobRemoved(id, job, unit, result): only jobs of the units shown here matter.
+            key = f"service:{parameters.get_child_value(2).get_string()}"
+            if key not in self.rows:
+                return
+            self.units_pending.add(key)
         else:
-            repo_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
-            source = os.path.join(repo_root, "data", "configs", "gtk-3.0", "gtk.css")
+            # UnitFilesChanged names no unit.
+            self.units_pending.update(key for key in self.rows if key.startswith("service:"))
+        if self.units_refresh_id is None:
+            self.units_refresh_id = GLib.timeout_add(UNITS_SETTLE_MS, self._on_units_settled)
+
+    def _on_units_settled(self):
+        self.units_refresh_id = None
+        keys, self.units_pending = self.units_pending, set()
+        self.refresh(keys)
+        return False
 
-        target = os.path.expanduser("~/.config/gtk-3.0/gtk.css")
-        return source, target
+    def _is_guard_activation_installed(self):
+        from tweak_flx1s.services.guard import installed_activation
+        return installed_activation() is not None
+
+    def _on_guard_activation_toggled(self, row, param):
+        from tweak_flx1s.services.guard import find_session_unit, install_activation, remove_activation
+        if row.get_active():
+            unit = find_session_unit()
+            if not unit:
+                logger.warning("Cannot tell which unit runs the Andromeda session; start Andromeda once and try again")
+                row.set_active(False)
+                return
+            if not install_activation(unit):
+                row.set_active(False)
+        elif not remove_activation():
+            row.set_active(True)
+
+    def _is_shared_active(self):
+        service_name = f"tweak-flx1s-andromeda-fs@{GLib.get_user_name()}.service"
+        return self.andromeda.is_mounted() and self._is_service_running(service_name, user_bus=False)
+
+    def _get_css_assets(self):
+        """The GTK3 CSS as an asset bundle, created on first use."""
+        if self.css_assets is None:
+            installed_dir = "/usr/share/tweak-flx1s/configs/gtk-3.0"
+            if os.path.exists(installed_dir):
+                source = installed_dir
+            else:
+                repo_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+                source = os.path.join(repo_root, "data", "configs", "gtk-3.0")
+            self.css_assets = AssetBundle("gtk-css", source, os.path.expanduser("~/.config/gtk-3.0"), files=["gtk.css"])
+        return self.css_assets
 
     def _is_gtk_tweak_active(self):
-        """Checks if the custom GTK CSS is applied."""
-        source, target = self._get_css_paths()
-        if not os.path.exists(target):
-            return False
-        return True
+        """Checks if the custom GTK CSS is applied with the current content."""
+        return self._get_css_assets().in_sync()
 
     def _on_css_toggled(self, row, param):
-        source, target = self._get_css_paths()
+        assets = self._get_css_assets()
+        target = os.path.join(assets.target, "gtk.css")
         active = row.get_active()
 
         if active:
             try:
-                target_dir = os.path.dirname(target)
-                os.makedirs(target_dir, exist_ok=True)
-                shutil.copy2(source, target)
+                assets.sync()
                 logger.info(f"Applied GTK3 CSS tweak to {target}")
             except Exception as e:
                 logger.error(f"Failed to apply GTK3 CSS tweak: {e}")
@@ -119,45 +221,55 @@ class TweaksPage(Adw.PreferencesPage):
 
     def _add_service_row(self, group, title, subtitle, service_name):
         row = Adw.SwitchRow(title=title, subtitle=subtitle)
-
-        is_running = self._is_service_running(service_name)
-        row.set_active(is_running)
-
-        row.connect("notify::active", lambda r, p, s=service_name: GLib.idle_add(lambda: self._on_switch_toggled(r, p, s) or False))
+        self._bind_row(f"service:{service_name}", row, lambda: self._is_service_on(service_name),
+                       lambda r, p: self._on_switch_toggled(r, p, service_name))
         group.add(row)
 
     def _is_service_running(self, service, user_bus=True):
         """Checks if a service is active (running)."""
         try:
-            cmd = ["systemctl"]
-            if user_bus:
-                cmd.append("--user")
-            cmd.extend(["is-active", "--quiet", service])
-            return subprocess.call(cmd) == 0
+            return self.services.is_active(service, user=user_bus)
         except Exception as e:
             logger.warning(f"Failed to check active status for {service}: {e}")
             return False
 
+    def _is_service_on(self, service):
+        """
+        The state a service switch shows. The alarm monitor and the guard
+        exit while they have nothing to do, so for them it is whether the
+        unit is enabled rather than whether it runs right now.
+        """
+        if service in ON_DEMAND_SERVICES:
+            try:
+                return self.services.is_enabled(service) == "enabled"
+            except Exception as e:
+                logger.warning(f"Failed to check enabled status for {service}: {e}")
+                return False
+        return self._is_service_running(service)
+
     def _on_switch_toggled(self, row, param, service):
         should_be_active = row.get_active()
 
         try:
             if should_be_active:
-                run_command(f"systemctl --user enable {service}")
-                run_command("systemctl --user daemon-reload")
-                run_command(f"systemctl --user start {service}")
+                self.services.enable(service)
+                self.services.daemon_reload()
+                self.services.start(service)
             else:
-                run_command(f"systemctl --user stop {service}")
-                run_command(f"systemctl --user disable {service}")
-                run_command("systemctl --user daemon-reload")
+                self.services.stop(service)
+                self.services.disable(service)
+                self.services.daemon_reload()
         except Exception as e:
             logger.error(f"Failed to toggle service {service}: {e}")
 
-        is_running = self._is_service_running(service)
+        is_on = self._is_service_on(service)
 
-        if should_be_active != is_running:
-             logger.warning(f"Service {service} state mismatch. Expected: {should_be_active}, Actual: {is_running}")
-             row.set_active(is_running)
+        if should_be_active != is_on:
+            logger.warning(f"Service {service} state mismatch. Expected: {should_be_active}, Actual: {is_on}")
+            _row, handler_id, _read = self.rows[f"service:{service}"]
+            row.handler_block(handler_id)
+            row.set_active(is_on)
+            row.handler_unblock(handler_id)
 
     def _on_sound_toggled(self, row, param):
         active = row.get_active()
@@ -13,22 +13,28 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import importlib
 import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, GLib
 from loguru import logger
 from tweak_flx1s.const import APP_NAME
-from tweak_flx1s.gui.pages.info_page import InfoPage
-from tweak_flx1s.gui.pages.tweaks_page import TweaksPage
-from tweak_flx1s.gui.pages.system_page import SystemPage
-from tweak_flx1s.gui.pages.actions_page import ActionsPage
+from tweak_flx1s.core.trace import span
 
 try:
     _
 except NameError:
     from gettext import gettext as _
 
+# name -> (module, class, title, icon), in tab order. Pages are built when
+# first shown, the rest in idle time after the first frame.
+PAGES = {
+    "tweaks": ("tweak_flx1s.gui.pages.tweaks_page", "TweaksPage", _("Tweaks"), "preferences-system-symbolic"),
+    "system": ("tweak_flx1s.gui.pages.system_page", "SystemPage", _("System"), "emblem-system-symbolic"),
+    "actions": ("tweak_flx1s.gui.pages.actions_page", "ActionsPage", _("Actions"), "input-gaming-symbolic"),
+}
+
 class MainWindow(Adw.Window):
     """The main application window."""
     def __init__(self, application=None, **kwargs):
@@ -52,7 +58,7 @@ class MainWindow(Adw.Window):
         info_btn = Gtk.Button(icon_name="dialog-information-symbolic")
         info_btn.add_css_class("flat")
         info_btn.add_css_class("circular")
-        info_btn.connect("clicked", lambda b: GLib.idle_add(lambda: InfoPage.show(self) or False))
+        info_btn.connect("clicked", lambda b: GLib.idle_add(lambda: self._show_info() or False))
         header.pack_start(info_btn)
 
         close_btn = Gtk.Button(label=_("Close"))
@@ -65,15 +71,69 @@ class MainWindow(Adw.Window):
         self.stack.set_vexpand(True)
         main_vbox.append(self.stack)
 
-        self.tweaks_page = TweaksPage(self)
-        self.stack.add_titled(self.tweaks_page, "tweaks", _("Tweaks")).set_icon_name("preferences-system-symbolic")
-
-        self.system_page = SystemPage(self)
-        self.stack.add_titled(self.system_page, "system", _("System")).set_icon_name("emblem-system-symbolic")
+        self.pages = {}
+        self.slots = {}
+        self.prebuild_id = None
+        for name, (_module, _cls, title, icon) in PAGES.items():
+            slot = Adw.Bin()
+            self.slots[name] = slot
+            self.stack.add_titled(slot, name, title).set_icon_name(icon)
 
-        self.actions_page = ActionsPage(self)
-        self.stack.add_titled(self.actions_page, "actions", _("Actions")).set_icon_name("input-gaming-symbolic")
+        self.stack.connect("notify::visible-child-name", lambda stack, p: self.build_page(stack.get_visible_child_name()))
+        self.build_page(self.stack.get_visible_child_name())
+        self.connect("map", self._on_map)
 
         self.switcher = Adw.ViewSwitcherBar(stack=self.stack, reveal=True)
         main_vbox.append(self.switcher)
 
+    def build_page(self, name):
+        """Builds a page into its tab if it is not built yet. Returns the page."""
+        if name not in PAGES:
+            return None
+        page = self.pages.get(name)
+        if page is None:
+            module_name, class_name, _title, _icon = PAGES[name]
+            with span(f"page.{name}"):
+                page = getattr(importlib.import_module(module_name), class_name)(self)
+            self.pages[name] = page
+            self.slots[name].set_child(page)
+        return page
+
+    def _on_map(self, window):
+        # Below redraw priority, so the first frame is painted before this runs.
+        if self.prebuild_id is None:
+            self.prebuild_id = GLib.idle_add(self._prebuild_next, priority=GLib.PRIORITY_LOW)
+
+    def _prebuild_next(self):
+        """Builds one remaining page per idle pass, keeping the UI responsive."""
+        for name in PAGES:
+            if name not in self.pages:
+                self.build_page(name)
+                return True
+        self.prebuild_id = None
+        return False
+
+    def refresh(self):
+        """Re-reads system state into the pages built so far, e.g. when a kept window is shown again."""
+        for page in self.pages.values():
+            if hasattr(page, "refresh"):
+                page.refresh()
+
+    def release(self):
+        """
+        Shuts the built pages down and destroys the window. The pages' bus,
+        settings and file monitor callbacks hold references to them, so
+        they are dropped first or the pages would outlive the window.
+        """
+        if self.prebuild_id is not None:
+            GLib.source_remove(self.prebuild_id)
+            self.prebuild_id = None
+        for page in self.pages.values():
+            if hasattr(page, "shutdown"):
+                page.shutdown()
+        self.pages.clear()
+        self.destroy()
+
+    def _show_info(self):
+        from tweak_flx1s.gui.pages.info_page import InfoPage
+        InfoPage.show(self)
@@ -17,6 +17,20 @@ import sys
 import argparse
 from tweak_flx1s.utils import setup_logging
 from tweak_flx1s.core.i18n import install_i18n
+from tweak_flx1s.core import trace
+
+def _profile_label(args):
+    """Names profile files after the entry point."""
+    if args.monitor:
+        return f"monitor-{args.monitor}"
+    if args.action:
+        return f"action-{args.action}"
+    if args.trigger_gesture is not None:
+        return "gesture"
+    for press in ("short_press", "double_press", "long_press"):
+        if getattr(args, press):
+            return press.replace("_", "-")
+    return "gui"
 
 def main():
     """Parses arguments and dispatches actions."""
@@ -25,22 +39,58 @@ def main():
     parser = argparse.ArgumentParser(description="Tweak-FLX1s")
     parser.add_argument("--debug", action="store_true", help="Enable debug logging")
     parser.add_argument("--monitor", help="Start a monitor service")
+    parser.add_argument("--arm-only", action="store_true", help="Only schedule the next start and exit (with --monitor alarm)")
     parser.add_argument("--action", help="Perform a one-off action")
     parser.add_argument("--user", help="Specify target user (for system services)")
     parser.add_argument("--trigger-gesture", help="Trigger a configured gesture by index")
+    parser.add_argument("--target", choices=["file", "clipboard"], default="file", help="Where to put a screenshot (with --action screenshot)")
+    parser.add_argument("--area", help="Screenshot region: 'select' or x,y,w,h (with --action screenshot)")
+    parser.add_argument("--window", action="store_true", help="Screenshot the focused window (with --action screenshot)")
+    parser.add_argument("--burst", type=int, default=1, help="Number of screenshots or pictures to take back to back")
+    parser.add_argument("--interval", type=int, default=None, help="Delay between burst captures in ms")
+    parser.add_argument("--mime", help="MIME type to paste (with --action paste)")
+    parser.add_argument("--type-delay", type=int, default=0, help="Delay between typed keys in ms (with --action paste)")
 
     parser.add_argument("--short-press", action="store_true", help="Handle short press event")
     parser.add_argument("--double-press", action="store_true", help="Handle double press event")
     parser.add_argument("--long-press", action="store_true", help="Handle long press event")
 
+    parser.add_argument("--trace", choices=["on", "off"], help="Record timing spans of presses, gestures and monitors")
+    parser.add_argument("--stats", action="store_true", help="Show latency histograms of the recorded spans")
+    parser.add_argument("--profile", nargs="?", const="cpu", choices=["cpu", "alloc", "import"],
+                        help="Profile this run (default cpu); results go to ~/.cache/tweak-flx1s/profiles")
+    parser.add_argument("--profile-interval", type=int, help="Also write a profile every N seconds (with --profile)")
+
     args, unknown = parser.parse_known_args()
     setup_logging(debug=args.debug)
 
+    if args.trace:
+        trace.set_enabled(args.trace == "on")
+        print(f"Tracing {args.trace}, spans go to {trace.TRACE_FILE}")
+        return
+
+    if args.stats:
+        trace.print_stats()
+        return
+
+    if trace.ENABLED:
+        trace.record("startup", trace.process_age_ms())
+
+    if args.profile:
+        from tweak_flx1s.core import profiler
+        profiler.start(args.profile, _profile_label(args), args.profile_interval)
+
     if args.trigger_gesture is not None:
         from tweak_flx1s.actions.gestures import GesturesManager
         GesturesManager().handle_gesture(args.trigger_gesture)
         return
 
+    if args.short_press or args.double_press or args.long_press:
+        from tweak_flx1s.actions.buttons import engine_running
+        if engine_running():
+            # The press engine already ran the action for this press.
+            return
+
     if args.short_press:
         from tweak_flx1s.actions.buttons import ButtonManager
         ButtonManager().handle_press("short_press")
@@ -57,7 +107,13 @@ def main():
         return
 
     if args.monitor:
-        if args.monitor == "alarm":
+        if args.monitor == "all":
+             from tweak_flx1s.services.host import run
+             run()
+        elif args.monitor == "alarm" and args.arm_only:
+             from tweak_flx1s.services.alarm import arm
+             arm()
+        elif args.monitor == "alarm":
              from tweak_flx1s.services.alarm import run
              run()
         elif args.monitor == "guard":
@@ -66,6 +122,21 @@ def main():
         elif args.monitor == "gestures":
              from tweak_flx1s.services.gestures import run
              run()
+        elif args.monitor == "keys":
+             from tweak_flx1s.services.keys import run
+             run()
+        elif args.monitor == "clipboard":
+             from tweak_flx1s.services.clipboard import run
+             run()
+        elif args.monitor == "camera":
+             from tweak_flx1s.services.camera import run
+             run()
+        elif args.monitor == "memory":
+             from tweak_flx1s.services.memory import run
+             run()
+        elif args.monitor == "buttons":
+             from tweak_flx1s.services.buttons import run
+             run()
         elif args.monitor == "andromeda-fs":
              from tweak_flx1s.system.andromeda import AndromedaManager
              mgr = AndromedaManager()
@@ -80,17 +151,25 @@ def main():
          from tweak_flx1s.actions.shortcuts import ShortcutsManager
          mgr = ShortcutsManager()
          if args.action == "screenshot":
-             mgr.take_screenshot()
+             from tweak_flx1s.actions.screenshot import parse_area
+             try:
+                 area = parse_area(args.area)
+             except ValueError as e:
+                 parser.error(str(e))
+             mgr.take_screenshot(target=args.target, area=area, window=args.window,
+                                 burst=args.burst, interval_ms=500 if args.interval is None else args.interval)
+         elif args.action == "picture":
+             mgr.take_picture(burst=args.burst, interval_ms=args.interval or 0)
          elif args.action == "flashlight":
              mgr.toggle_flashlight()
          elif args.action == "kill-window":
              mgr.kill_active_window()
          elif args.action == "paste":
-             mgr.paste_clipboard()
+             mgr.paste_clipboard(mime=args.mime, delay_ms=args.type_delay)
          return
 
     from tweak_flx1s.gui.app import start_gui
-    sys.exit(start_gui())
+    sys.exit(start_gui([arg for arg in unknown if arg.startswith("--gapplication-")]))
 
 if __name__ == "__main__":
     main()
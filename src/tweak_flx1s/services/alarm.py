@@ -14,127 +14,177 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import os
-import signal
-import gi
-from gi.repository import GLib, Gio
+import datetime
+from gi.repository import GLib
+from tweak_flx1s.const import SERVICE_ALARM, RUNTIME_DIR
 from tweak_flx1s.utils import logger, run_command
+from tweak_flx1s.backends import get_backend
+from tweak_flx1s.core.bus import BusMonitor
+from tweak_flx1s.core.display import backlight_on
+from tweak_flx1s.core.monitor import Monitor
+
+FEEDBACK_RULE = "type='method_call',interface='org.sigxcpu.Feedback',member='TriggerFeedback'"
+
+CLOCKS_SCHEMA = "org.gnome.clocks"
+# Transient timer that starts the monitor ahead of the next alarm.
+ARM_TIMER = "tweak-flx1s-alarm-arm"
+# Start this long before an alarm, and stay this long after it (ringing and snoozes).
+ARM_LEAD = datetime.timedelta(minutes=2)
+ARM_TAIL = datetime.timedelta(minutes=30)
+# The start time the arm timer was last set to, so unrelated dconf writes
+# do not reschedule it.
+ARMED_FILE = os.path.join(RUNTIME_DIR, "tweak-flx1s-alarm-armed")
+
+def next_alarms(alarms, now):
+    """
+    Returns the upcoming ring times of active gnome-clocks alarms, soonest first.
+    Alarms are stored as a list of dicts with hour, minute, days (0 = Monday)
+    and, while ringing or snoozed, ring_time/snooze_time.
+    """
+    times = []
+    for alarm in alarms:
+        for key in ("ring_time", "snooze_time"):
+            if alarm.get(key):
+                try:
+                    times.append(datetime.datetime.fromisoformat(alarm[key]).astimezone().replace(tzinfo=None))
+                except ValueError:
+                    pass
+        if not alarm.get("active", True) or "hour" not in alarm:
+            continue
+        days = alarm.get("days") or list(range(7))
+        for offset in range(8):
+            day = now.date() + datetime.timedelta(days=offset)
+            ring = datetime.datetime.combine(day, datetime.time(alarm["hour"], alarm.get("minute", 0)))
+            if day.weekday() in days and ring >= now - ARM_TAIL:
+                times.append(ring)
+                break
+    return sorted(times)
+
+def arm(alarms=None):
+    """
+    Schedules the alarm monitor to be started ahead of the next alarm.
+    Also run on its own (--monitor alarm --arm-only) by the path unit when
+    the dconf database changes, so alarms set while the monitor is not
+    running get armed too.
+    """
+    if alarms is None:
+        alarms = get_backend().settings.get(CLOCKS_SCHEMA, "alarms") or []
+    now = datetime.datetime.now()
+    upcoming = [ring for ring in next_alarms(alarms, now) if ring - ARM_LEAD > now]
+    when = (upcoming[0] - ARM_LEAD).strftime("%Y-%m-%d %H:%M:%S") if upcoming else ""
+
+    try:
+        with open(ARMED_FILE, 'r') as f:
+            if f.read() == when:
+                logger.debug(f"Alarm monitor already armed for {when or 'nothing'}")
+                return
+    except OSError:
+        pass
 
-class AlarmMonitor:
-    """Monitors alarm events to ensure wake-up."""
-    def __init__(self):
-        self.loop = GLib.MainLoop()
-        self.subprocess = None
-        self.cancellable = Gio.Cancellable()
-        self.data_input_stream = None
-        self.lines_to_check = 0
-
-    def start(self):
-        """Starts the monitoring process."""
-        logger.info("Starting Alarm Monitor")
-
-        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGTERM, self._on_quit)
-        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGINT, self._on_quit)
-
-        self._start_monitor_subprocess()
-
+    get_backend().services.stop(f"{ARM_TIMER}.timer", check=False)
+    if upcoming:
         try:
-            self.loop.run()
-        except KeyboardInterrupt:
-            self._on_quit()
-
-    def _on_quit(self):
-        """Handles termination signals."""
-        logger.info("Stopping Alarm Monitor...")
-        self.cancellable.cancel()
+            run_command(["systemd-run", "--user", f"--unit={ARM_TIMER}", f"--on-calendar={when}",
+                         "--timer-property=AccuracySec=1s", "systemctl", "--user", "start", SERVICE_ALARM])
+        except Exception:
+            # Not remembered, so the next change tries again.
+            return
+        logger.info(f"Alarm monitor armed for {when}")
+    else:
+        logger.info("No upcoming alarm")
+    try:
+        with open(ARMED_FILE, 'w') as f:
+            f.write(when)
+    except OSError as e:
+        logger.warning(f"Could not remember the armed alarm: {e}")
+
+class AlarmMonitor(Monitor):
+    """Monitors alarm events to ensure wake-up."""
 
-        if self.subprocess:
-            self.subprocess.force_exit()
+    name = "alarm"
 
-        if self.loop.is_running():
-            self.loop.quit()
-        return GLib.SOURCE_REMOVE
+    def __init__(self):
+        super().__init__()
+        self.bus_monitor = None
+        self.settings = None
+        self.changed_handle = None
 
-    def _start_monitor_subprocess(self):
+    def start(self):
         """
-        Runs dbus-monitor to intercept TriggerFeedback method calls.
-        This is required because we need to see method calls destined for other services.
+        Watches TriggerFeedback calls to feedbackd.
+        They are method calls to another service, so this needs a monitor connection.
+        Standalone, the monitor only runs around scheduled alarms: otherwise it
+        arms a timer for the next one and returns False.
         """
-        cmd = ["dbus-monitor", "type='method_call',interface='org.sigxcpu.Feedback',member='TriggerFeedback'"]
-        logger.debug(f"Running: {' '.join(cmd)}")
-
-        try:
-            self.subprocess = Gio.Subprocess.new(
-                cmd,
-                Gio.SubprocessFlags.STDOUT_PIPE | Gio.SubprocessFlags.STDERR_PIPE
-            )
-
-            stdout_pipe = self.subprocess.get_stdout_pipe()
-            self.data_input_stream = Gio.DataInputStream.new(stdout_pipe)
-
-            self._read_line()
-
-        except Exception as e:
-            logger.error(f"Failed to start dbus-monitor: {e}")
-            self._on_quit()
-
-    def _read_line(self):
-        """Reads a line asynchronously from the subprocess stdout."""
-        self.data_input_stream.read_line_async(
-            GLib.PRIORITY_DEFAULT,
-            self.cancellable,
-            self._on_line_read
-        )
-
-    def _on_line_read(self, source, result):
-        """Callback when a line is read."""
+        logger.info("Starting Alarm Monitor")
+        settings = get_backend().settings
+        if settings.get(CLOCKS_SCHEMA, "alarms") is not None:
+            self.settings = settings
+            if self.idle_timeout:
+                self.changed_handle = settings.connect(CLOCKS_SCHEMA, "alarms", self.track(self._on_alarms_changed))
+                self._arm()
+            if self.idle_timeout and not self.busy():
+                logger.info("No alarm due, not monitoring")
+                return False
+
+        self.bus_monitor = BusMonitor([FEEDBACK_RULE], self.track(self._on_feedback), on_closed=self.quit)
         try:
-            line_bytes, length = source.read_line_finish(result)
-            if line_bytes is None:
-                logger.warning("dbus-monitor stream ended")
-                self._on_quit()
-                return
-
-            line = line_bytes.decode('utf-8').strip()
-            self._process_line(line)
-            self._read_line()
-
-        except  GLib.Error as e:
-            if e.code != Gio.IOErrorEnum.CANCELLED:
-                 logger.error(f"Error reading line: {e}")
-                 self._on_quit()
-
-    def _process_line(self, line):
-        """Processes a single line from dbus-monitor."""
-        if self.lines_to_check > 0:
-            self.lines_to_check -= 1
-            if "alarm-clock-elapsed" in line:
-                self._perform_action()
-                self.lines_to_check = 0
-                return
-
-        if "org.gnome.clocks" in line:
-            self.lines_to_check = 5
+            self.bus_monitor.start()
+        except GLib.Error as e:
+            logger.error(f"Failed to monitor feedback calls: {e.message}")
+            self.bus_monitor = None
+            return False
+        return True
+
+    def stop(self):
+        logger.info("Stopping Alarm Monitor...")
+        if self.changed_handle:
+            self.settings.disconnect(self.changed_handle)
+            self.changed_handle = None
+        if self.bus_monitor:
+            self.bus_monitor.stop()
+            self.bus_monitor = None
+
+    def busy(self):
+        """True from ARM_LEAD before an alarm until ARM_TAIL after it."""
+        if self.settings is None:
+            return True
+        now = datetime.datetime.now()
+        return any(ring - ARM_LEAD <= now <= ring + ARM_TAIL for ring in next_alarms(self._alarms(), now))
+
+    def _alarms(self):
+        return self.settings.get(CLOCKS_SCHEMA, "alarms") or []
+
+    def _on_alarms_changed(self, alarms):
+        self._arm()
+
+    def _arm(self):
+        arm(self._alarms())
+
+    def _on_feedback(self, message):
+        """TriggerFeedback(app_id, event, hints, timeout)."""
+        body = message.get_body()
+        if body is None or body.n_children() < 2:
+            return
+        app_id = body.get_child_value(0).get_string()
+        event = body.get_child_value(1).get_string()
+        if app_id == "org.gnome.clocks" and event == "alarm-clock-elapsed":
+            self._perform_action()
 
     def _perform_action(self):
         """Wakes up the screen and maximizes volume."""
         logger.info("Alarm clock event detected!")
+        backend = get_backend()
 
-        try:
-            if os.path.exists("/sys/class/leds/lcd-backlight/brightness"):
-                with open("/sys/class/leds/lcd-backlight/brightness", "r") as f:
-                    brightness = int(f.read().strip())
-
-                if brightness == 0:
-                    logger.info("Screen is off, waking up/pressing power...")
-                    run_command("wtype -P XF86PowerOff", check=False)
-        except Exception as e:
-            logger.error(f"Error checking brightness: {e}")
+        if backlight_on() is False:
+            logger.info("Screen is off, waking up/pressing power...")
+            backend.input.key("XF86PowerOff", release=False)
 
-        run_command("amixer set Master 100% unmute", check=False)
+        backend.audio.set_master_volume(100, unmute=True)
 
 def run():
     monitor = AlarmMonitor()
-    monitor.start()
+    monitor.run()
 
 if __name__ == "__main__":
     from tweak_flx1s.utils import setup_logging
@@ -0,0 +1,224 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import fcntl
+import threading
+from gi.repository import GLib, Gio
+from loguru import logger
+from tweak_flx1s.actions.buttons import ButtonManager, CONFIG_FILE
+from tweak_flx1s.actions.executor import is_locked, is_wofi_running
+from tweak_flx1s.const import BUTTONS_LOCK
+from tweak_flx1s.core import evdev
+from tweak_flx1s.core.monitor import Monitor
+
+class PressClassifier:
+    """
+    Turns key down/up into short, double and long presses.
+    A hold reaching long_ms is a long press. A release starts the double
+    press window, unless wants_double() says no double press could follow,
+    in which case the short press fires right away.
+    """
+
+    def __init__(self, emit, long_ms=600, double_ms=300, wants_double=None):
+        self.emit = emit
+        self.long_ms = long_ms
+        self.double_ms = double_ms
+        self.wants_double = wants_double or (lambda: True)
+        self.down = False
+        self.long_fired = False
+        self.long_id = None
+        self.double_id = None
+
+    def key_down(self):
+        if self.down:
+            return
+        self.down = True
+        self.long_fired = False
+        self.long_id = GLib.timeout_add(self.long_ms, self._on_long)
+
+    def key_up(self):
+        if not self.down:
+            return
+        self.down = False
+        self._cancel("long_id")
+        if self.long_fired:
+            return
+
+        if self.double_id:
+            self._cancel("double_id")
+            self.emit("double_press")
+        elif self.wants_double():
+            self.double_id = GLib.timeout_add(self.double_ms, self._on_double_timeout)
+        else:
+            self.emit("short_press")
+
+    def _on_long(self):
+        self.long_id = None
+        self.long_fired = True
+        # A tap followed by a hold is a long press, not a double press.
+        self._cancel("double_id")
+        self.emit("long_press")
+        return GLib.SOURCE_REMOVE
+
+    def _on_double_timeout(self):
+        self.double_id = None
+        self.emit("short_press")
+        return GLib.SOURCE_REMOVE
+
+    def _cancel(self, attr):
+        source_id = getattr(self, attr)
+        if source_id:
+            GLib.source_remove(source_id)
+            setattr(self, attr, None)
+
+    def reset(self):
+        self._cancel("long_id")
+        self._cancel("double_id")
+        self.down = False
+        self.long_fired = False
+
+class ButtonEngine(Monitor):
+    """
+    Reads the assistant key from its evdev node and runs the configured
+    press actions in-process, instead of going through the assistant-button
+    tooling and a new tweak-flx1s process per press.
+    """
+
+    name = "buttons"
+
+    def __init__(self):
+        super().__init__()
+        self.manager = ButtonManager()
+        self.config = self.manager.engine_config()
+        self.device = None
+        self.watch_id = None
+        self.file_monitor = None
+        self.locked = False
+        self.classifier = None
+        self.lock_fd = None
+
+    def _take_lock(self):
+        """Marks the engine as running, so the assistant-button scripts' presses are skipped (see engine_running)."""
+        try:
+            os.makedirs(os.path.dirname(BUTTONS_LOCK), exist_ok=True)
+            self.lock_fd = os.open(BUTTONS_LOCK, os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o600)
+            fcntl.flock(self.lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError as e:
+            if self.lock_fd is not None:
+                os.close(self.lock_fd)
+                self.lock_fd = None
+            logger.error(f"Cannot lock {BUTTONS_LOCK}, is another press engine running? {e}")
+            return False
+        return True
+
+    def start(self):
+        if not self._take_lock():
+            return False
+
+        path = self.config["device"] or evdev.find_key_device(self.config["key_code"])
+        if not path:
+            logger.error(f"No input device sends key {self.config['key_code']}")
+            self.stop()
+            return False
+
+        try:
+            self.device = evdev.InputDevice(path)
+            if self.config["grab"]:
+                other_keys = self.device.capabilities(evdev.EV_KEY, evdev.KEY_MAX) - {self.config["key_code"]}
+                if other_keys:
+                    logger.warning(f"Not grabbing {path}: it also sends keys {sorted(other_keys)}, "
+                                   "which would no longer reach the compositor")
+                else:
+                    self.device.grab()
+        except OSError as e:
+            logger.error(f"Cannot open {path}: {e}")
+            self.stop()
+            return False
+
+        self.classifier = PressClassifier(
+            self.track(self._on_press), self.config["long_press_ms"], self.config["double_press_ms"],
+            wants_double=self._wants_double
+        )
+        self.watch_id = GLib.io_add_watch(self.device.fileno(), GLib.PRIORITY_HIGH,
+                                          GLib.IOCondition.IN | GLib.IOCondition.ERR | GLib.IOCondition.HUP,
+                                          self.track(self._on_input))
+
+        self.file_monitor = Gio.File.new_for_path(CONFIG_FILE).monitor_file(Gio.FileMonitorFlags.NONE, None)
+        self.file_monitor.connect("changed", self.track(self._on_config_changed))
+
+        logger.info(f"Reading assistant key from {path} ({self.device.name})")
+        return True
+
+    def _on_input(self, fd, condition):
+        if condition & (GLib.IOCondition.ERR | GLib.IOCondition.HUP):
+            logger.error("Input device went away")
+            self.watch_id = None
+            self.quit()
+            return GLib.SOURCE_REMOVE
+
+        for event in self.device.read():
+            if event.type == evdev.EV_SYN and event.code == evdev.SYN_DROPPED:
+                self.classifier.reset()
+            elif event.type == evdev.EV_KEY and event.code == self.config["key_code"]:
+                if event.value == evdev.KEY_PRESS:
+                    # Needed at release time; logind's cached property makes this cheap.
+                    self.locked = is_locked()
+                    self.classifier.key_down()
+                elif event.value == evdev.KEY_RELEASE:
+                    self.classifier.key_up()
+        return GLib.SOURCE_CONTINUE
+
+    def _wants_double(self):
+        if is_wofi_running():
+            return False
+        return self.manager.has_action("double_press", self.locked)
+
+    def _on_press(self, press_type):
+        # Actions may block (a wofi menu waits for the user, and the next
+        # short press has to reach it), so they run off the main loop.
+        threading.Thread(target=self._dispatch, args=(press_type, self.locked),
+                         name=f"button-{press_type}", daemon=True).start()
+
+    def _dispatch(self, press_type, locked):
+        try:
+            self.manager.handle_press(press_type, locked=locked)
+        except Exception as e:
+            logger.error(f"Button action failed: {e}")
+
+    def _on_config_changed(self, monitor, file, other_file, event_type):
+        if event_type == Gio.FileMonitorEvent.CHANGES_DONE_HINT:
+            logger.info("Button config changed, reloading")
+            self.manager = ButtonManager()
+
+    def stop(self):
+        if self.watch_id:
+            GLib.source_remove(self.watch_id)
+            self.watch_id = None
+        if self.file_monitor:
+            self.file_monitor.cancel()
+            self.file_monitor = None
+        if self.classifier:
+            self.classifier.reset()
+        if self.device:
+            self.device.close()
+            self.device = None
+        if self.lock_fd is not None:
+            os.close(self.lock_fd)
+            self.lock_fd = None
+
+def run():
+    engine = ButtonEngine()
+    engine.run()
@@ -0,0 +1,64 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import signal
+from gi.repository import GLib
+from loguru import logger
+from tweak_flx1s.const import CAMERA_SOCKET
+from tweak_flx1s.actions.camera import get_camera, CameraError
+from tweak_flx1s.core.ipc import SocketServer
+
+class CameraService:
+    """
+    Takes pictures for one-shot processes so the camera pipeline can stay
+    warm between shots. The camera itself is only held while warm.
+    """
+
+    def __init__(self, path=CAMERA_SOCKET):
+        self.loop = GLib.MainLoop()
+        self.camera = get_camera()
+        self.server = SocketServer(path, self._on_request, timeout=30)
+
+    def run(self):
+        logger.info(f"Starting camera service (keep warm {self.camera.keep_warm}s)...")
+        self.server.start()
+
+        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGTERM, self._on_quit)
+        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGINT, self._on_quit)
+
+        try:
+            self.loop.run()
+        except KeyboardInterrupt:
+            self._on_quit()
+
+    def _on_request(self, request):
+        try:
+            paths = self.camera.shoot(burst=int(request.get("burst", 1)),
+                                      interval_ms=int(request.get("interval_ms", 0)))
+        except CameraError as e:
+            return {"error": str(e)}
+        return {"ok": True, "paths": paths}
+
+    def _on_quit(self):
+        logger.info("Stopping camera service...")
+        self.server.stop()
+        self.camera.stop()
+        if self.loop.is_running():
+            self.loop.quit()
+        return GLib.SOURCE_REMOVE
+
+def run():
+    service = CameraService()
+    service.run()
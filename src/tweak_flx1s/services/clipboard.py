@@ -0,0 +1,140 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import signal
+import subprocess
+from gi.repository import GLib, Gio
+from loguru import logger
+from tweak_flx1s.const import CLIPBOARD_SOCKET
+from tweak_flx1s.actions.clipboard import ClipboardHistory, select_mime
+from tweak_flx1s.core.ipc import SocketServer
+
+class ClipboardHistoryService:
+    """
+    Records the Wayland selection into the clipboard history.
+    wl-paste --watch prints a line on every selection change, the content
+    is then streamed into the history with wl-paste. Changes to the
+    history from other processes go through its socket.
+    """
+
+    def __init__(self, path=CLIPBOARD_SOCKET):
+        self.history = ClipboardHistory().load()
+        self.server = SocketServer(path, self._on_request)
+        self.loop = GLib.MainLoop()
+        self.cancellable = Gio.Cancellable()
+        self.subprocess = None
+        self.data_input_stream = None
+
+    def run(self):
+        logger.info(f"Starting clipboard history service ({len(self.history.entries)} entries)...")
+        self.history.evict()
+        self.history.prune_orphans()
+        self.history.save()
+        self.server.start()
+
+        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGTERM, self._on_quit)
+        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGINT, self._on_quit)
+
+        self._start_watch()
+
+        try:
+            self.loop.run()
+        except KeyboardInterrupt:
+            self._on_quit()
+
+    def _start_watch(self):
+        cmd = ["wl-paste", "--watch", "echo"]
+        try:
+            self.subprocess = Gio.Subprocess.new(cmd, Gio.SubprocessFlags.STDOUT_PIPE)
+            self.data_input_stream = Gio.DataInputStream.new(self.subprocess.get_stdout_pipe())
+            self._read_line()
+        except Exception as e:
+            logger.error(f"Failed to start wl-paste --watch: {e}")
+            self._on_quit()
+
+    def _read_line(self):
+        self.data_input_stream.read_line_async(GLib.PRIORITY_DEFAULT, self.cancellable, self._on_line_read)
+
+    def _on_line_read(self, source, result):
+        try:
+            line, _length = source.read_line_finish(result)
+        except GLib.Error as e:
+            if e.code != Gio.IOErrorEnum.CANCELLED:
+                logger.error(f"Error reading wl-paste: {e}")
+                self._on_quit()
+            return
+
+        if line is None:
+            logger.warning("wl-paste --watch exited")
+            self._on_quit()
+            return
+
+        self._record()
+        self._read_line()
+
+    def _record(self):
+        try:
+            offered = subprocess.run(["wl-paste", "--list-types"], capture_output=True, text=True, timeout=2).stdout.splitlines()
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logger.error(f"Failed to list clipboard types: {e}")
+            return
+
+        mime = select_mime(offered)
+        if not mime:
+            logger.debug(f"Ignoring selection with types {offered}")
+            return
+
+        try:
+            proc = subprocess.Popen(["wl-paste", "--type", mime],
+                                    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        except OSError as e:
+            logger.error(f"Failed to read clipboard: {e}")
+            return
+
+        try:
+            entry = self.history.add_stream(proc.stdout, mime)
+        except OSError as e:
+            logger.error(f"Failed to store clipboard entry: {e}")
+            entry = None
+        finally:
+            proc.stdout.close()
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+
+        if entry:
+            logger.debug(f"Recorded {mime} entry {entry.digest[:12]} ({entry.size} bytes)")
+
+    def _on_request(self, request):
+        command = request.get("command")
+        if command == "clear":
+            self.history.clear()
+            logger.info("Clipboard history cleared")
+            return {"ok": True}
+        return {"error": f"Unknown command {command!r}"}
+
+    def _on_quit(self):
+        logger.info("Stopping clipboard history service...")
+        self.server.stop()
+        self.cancellable.cancel()
+        if self.subprocess:
+            self.subprocess.force_exit()
+        if self.loop.is_running():
+            self.loop.quit()
+        return GLib.SOURCE_REMOVE
+
+def run():
+    service = ClipboardHistoryService()
+    service.run()
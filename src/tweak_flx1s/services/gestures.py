@@ -14,17 +14,25 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import os
-import signal
 import shutil
-import gi
 from gi.repository import GLib, Gio
 from loguru import logger
 from tweak_flx1s.utils import get_device_model
 from tweak_flx1s.actions.gestures import GesturesManager
+from tweak_flx1s.core.display import DisplayPowerWatch
+from tweak_flx1s.core.monitor import Monitor
+
+class GestureMonitor(Monitor):
+    """
+    Monitors gestures using lisgd.
+    lisgd only runs while the display is on: it is stopped when the screen
+    blanks, so touches in a pocket wake nothing, and started again on unblank.
+    """
+
+    name = "gestures"
 
-class GestureMonitor:
-    """Monitors gestures using lisgd."""
     def __init__(self):
+        super().__init__()
         self.device = os.environ.get("LISGD_INPUT_DEVICE")
         if not self.device:
             # Fallback if env var missing (e.g. manually started without override)
@@ -37,27 +45,35 @@ class GestureMonitor:
 
         self.subprocess = None
         self.manager = GesturesManager()
-        self.loop = GLib.MainLoop()
-        self.cancellable = Gio.Cancellable()
+        self.cancellable = None
+        self.display = None
 
     def start(self):
         """Starts the lisgd process with configured gestures."""
         if not self.manager.config.get("enabled", False):
             logger.info("Gestures are disabled in config.")
-            return
-
-        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGTERM, self._on_quit)
-        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGINT, self._on_quit)
-
-        self._start_lisgd()
-
-        try:
-            self.loop.run()
-        except KeyboardInterrupt:
-            self._on_quit()
+            return False
+
+        # Polling the LED backlight is opt-in, see DisplayPowerWatch.
+        self.display = DisplayPowerWatch(self.track(self._on_display_changed),
+                                         poll_seconds=self.manager.config.get("screen_off_poll_seconds"))
+        if not self.display.start():
+            logger.info("Display is off, lisgd will start when it turns on")
+            return True
+        return self._start_lisgd()
+
+    def _on_display_changed(self, on):
+        if on and self.subprocess is None:
+            logger.debug("Display on, resuming gestures")
+            if not self._start_lisgd():
+                self.quit()
+        elif not on and self.subprocess is not None:
+            logger.debug("Display off, pausing gestures")
+            self._stop_lisgd()
 
     def _start_lisgd(self):
         logger.info(f"Starting lisgd on {self.device}")
+        self.cancellable = Gio.Cancellable()
 
         cmd = ["lisgd", "-d", self.device]
 
@@ -82,38 +98,50 @@ class GestureMonitor:
                 Gio.SubprocessFlags.NONE
             )
 
-            self.subprocess.wait_check_async(self.cancellable, self._on_subprocess_exit)
+            self.subprocess.wait_check_async(self.cancellable, self.track(self._on_subprocess_exit))
 
         except Exception as e:
             logger.error(f"Error running lisgd: {e}")
-            self._on_quit()
+            self.subprocess = None
+            return False
+        return True
+
+    def child_pids(self):
+        pid = self.subprocess.get_identifier() if self.subprocess else None
+        return [int(pid)] if pid else []
 
     def _on_subprocess_exit(self, source, result):
         try:
             source.wait_check_finish(result)
             logger.info("lisgd exited normally.")
         except GLib.Error as e:
-            if e.code != Gio.IOErrorEnum.CANCELLED:
-                 logger.error(f"lisgd exited with error: {e}")
-        finally:
-            self._on_quit()
+            if e.code == Gio.IOErrorEnum.CANCELLED:
+                return
+            logger.error(f"lisgd exited with error: {e}")
+        self.subprocess = None
+        self.quit()
 
-    def _on_quit(self):
-        """Stops the lisgd process and quits the loop."""
-        logger.info("Stopping gestures monitor...")
-        self.cancellable.cancel()
+    def _stop_lisgd(self):
+        if self.cancellable:
+            self.cancellable.cancel()
+            self.cancellable = None
 
         if self.subprocess:
             logger.info("Terminating lisgd...")
             self.subprocess.force_exit()
+            self.subprocess = None
 
-        if self.loop.is_running():
-            self.loop.quit()
-        return GLib.SOURCE_REMOVE
+    def stop(self):
+        """Stops the lisgd process."""
+        logger.info("Stopping gestures monitor...")
+        if self.display:
+            self.display.stop()
+            self.display = None
+        self._stop_lisgd()
 
 def run():
     monitor = GestureMonitor()
-    monitor.start()
+    monitor.run()
 
 if __name__ == "__main__":
     from tweak_flx1s.utils import setup_logging
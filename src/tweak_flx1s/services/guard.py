@@ -13,62 +13,153 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-import signal
-import gi
-from gi.repository import Gio, GLib
+import os
+import glob
+import configparser
+from gi.repository import GLib
 from loguru import logger
-from tweak_flx1s.utils import run_command
-from tweak_flx1s.const import APP_ID
-
-class AndromedaGuardService:
+from tweak_flx1s.const import HOME_DIR, SERVICE_GUARD
+from tweak_flx1s.backends import get_backend
+from tweak_flx1s.core.bus import subscribe, unsubscribe, name_owner_pid
+from tweak_flx1s.core.monitor import Monitor
+from tweak_flx1s.core.notify import get_broker
+
+ANDROMEDA_SESSION_NAME = "io.furios.Andromeda.Session"
+A11Y_SCHEMA = "org.gnome.desktop.a11y.applications"
+DBUS_SERVICE_DIRS = [
+    os.path.join(HOME_DIR, ".local/share/dbus-1/services"),
+    "/usr/local/share/dbus-1/services",
+    "/usr/share/dbus-1/services",
+]
+USER_UNIT_DIR = os.path.join(HOME_DIR, ".config/systemd/user")
+DROP_IN_NAME = "tweak-flx1s-guard.conf"
+
+def find_session_unit():
+    """
+    Returns the user unit that provides the Andromeda session, if it can be told.
+    Either its D-Bus activation file names it, or the running owner's cgroup does.
+    """
+    for path in DBUS_SERVICE_DIRS:
+        for service_file in glob.glob(os.path.join(path, "*.service")):
+            parser = configparser.ConfigParser(interpolation=None)
+            try:
+                parser.read(service_file)
+                section = parser["D-BUS Service"]
+            except (configparser.Error, KeyError):
+                continue
+            if section.get("Name") == ANDROMEDA_SESSION_NAME and section.get("SystemdService"):
+                return section["SystemdService"]
+
+    pid = name_owner_pid(ANDROMEDA_SESSION_NAME)
+    if pid:
+        try:
+            with open(f"/proc/{pid}/cgroup", 'r') as f:
+                parts = f.read().strip().split("/")
+        except OSError:
+            return None
+        if "user@" in "/".join(parts) and parts[-1].endswith(".service"):
+            return parts[-1]
+    return None
+
+def installed_activation():
+    """Returns the session unit the guard is hooked to, or None."""
+    for drop_in in glob.glob(os.path.join(USER_UNIT_DIR, "*.d", DROP_IN_NAME)):
+        return os.path.basename(os.path.dirname(drop_in))[:-len(".d")]
+    return None
+
+def install_activation(unit):
+    """
+    Makes the session unit pull in the guard, so the guard starts with every
+    session. This adds a drop-in to a unit of another package, so it is only
+    done when the user asks for it in the Tweaks page.
+    """
+    drop_in_dir = os.path.join(USER_UNIT_DIR, f"{unit}.d")
+    drop_in = os.path.join(drop_in_dir, DROP_IN_NAME)
+    if os.path.exists(drop_in):
+        return True
+    try:
+        os.makedirs(drop_in_dir, exist_ok=True)
+        with open(drop_in, 'w') as f:
+            f.write(f"[Unit]\nWants={SERVICE_GUARD}\n")
+    except OSError as e:
+        logger.error(f"Failed to install guard activation for {unit}: {e}")
+        return False
+    get_backend().services.daemon_reload(check=False)
+    logger.info(f"Guard will be started together with {unit}")
+    return True
+
+def remove_activation():
+    """Removes the drop-ins install_activation() wrote."""
+    removed = False
+    for drop_in in glob.glob(os.path.join(USER_UNIT_DIR, "*.d", DROP_IN_NAME)):
+        try:
+            os.remove(drop_in)
+            removed = True
+        except OSError as e:
+            logger.error(f"Failed to remove {drop_in}: {e}")
+            return False
+    if removed:
+        get_backend().services.daemon_reload(check=False)
+        logger.info("Guard is no longer started with the Andromeda session")
+    return True
+
+class AndromedaGuardService(Monitor):
     """
     Python implementation of the Andromeda Guard service.
     Monitors the 'org.gnome.desktop.a11y.applications screen-keyboard-enabled' setting
     and manages notifications with countdowns and cleanup.
     """
 
+    name = "guard"
+
     def __init__(self):
-        self.app = Gio.Application(application_id=APP_ID, flags=Gio.ApplicationFlags.NON_UNIQUE)
-        self.app.register(None)
+        super().__init__()
+        self.notifications = get_broker()
         self.notification_id = "andromeda-guard-notification"
-        self._running = True
-        self.loop = None
-        self.withdrawal_source_id = None
         self.countdown_source_id = None
         self.counter = 0
-        self.subprocess = None
-        self.cancellable = Gio.Cancellable()
-        self.data_input_stream = None
-
-    def run(self):
-        """Starts the guard service loop."""
+        self.subscription = None
+        self.activatable = False
+
+    def start(self):
+        """
+        Resets the OSK once, then again whenever an Andromeda session starts.
+        Standalone, and if the user hooked it to the session's unit, it can
+        exit when idle since it is started on demand.
+        """
         logger.info("Starting Andromeda Guard Service...")
+        GLib.idle_add(self.track(self._perform_reset))
+        if self.idle_timeout:
+            self._learn_activation()
 
-        self.loop = GLib.MainLoop()
-
-        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGTERM, self._quit_service)
-        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGINT, self._quit_service)
-
-        GLib.idle_add(self._perform_reset)
-
-        self._start_monitor_subprocess()
-
-        try:
-            self.loop.run()
-        except KeyboardInterrupt:
-            self._quit_service()
+        self.subscription = subscribe(
+            "org.freedesktop.DBus", "org.freedesktop.DBus", "NameOwnerChanged",
+            self.track(self._on_name_owner_changed), arg0=ANDROMEDA_SESSION_NAME
+        )
+        return True
 
-    def _quit_service(self):
+    def stop(self):
         logger.info("Stopping Andromeda Guard Service...")
-        self._running = False
-        self.cancellable.cancel()
-
-        if self.subprocess:
-            self.subprocess.force_exit()
-
-        if self.loop.is_running():
-            self.loop.quit()
-        return GLib.SOURCE_REMOVE
+        if self.subscription:
+            unsubscribe(self.subscription)
+            self.subscription = None
+        if self.countdown_source_id:
+            GLib.source_remove(self.countdown_source_id)
+            self.countdown_source_id = None
+
+    def busy(self):
+        """Stays up while counting down, and for good unless it can be started on demand."""
+        return self.countdown_source_id is not None or not self.activatable
+
+    def _learn_activation(self):
+        self.activatable = installed_activation() is not None
+
+    def _on_name_owner_changed(self, parameters):
+        _name, _old_owner, new_owner = parameters.unpack()
+        if new_owner:
+            if self.idle_timeout and not self.activatable:
+                self._learn_activation()
+            self._handle_session_reset()
 
     def _perform_reset(self):
         """Performs the disable -> wait -> enable cycle."""
@@ -88,24 +179,20 @@ class AndromedaGuardService:
         return False
 
     def _disable_keyboard(self):
-        run_command("gsettings set org.gnome.desktop.a11y.applications screen-keyboard-enabled false", check=False)
+        get_backend().settings.set(A11Y_SCHEMA, "screen-keyboard-enabled", False)
 
     def _enable_keyboard(self):
-        run_command("gsettings set org.gnome.desktop.a11y.applications screen-keyboard-enabled true", check=False)
+        get_backend().settings.set(A11Y_SCHEMA, "screen-keyboard-enabled", True)
         self._send_notification("Andromeda is ready - OSK Unlocked", expire_timeout=3000)
 
     def _start_countdown(self, seconds):
         self.counter = seconds
         if self.countdown_source_id is None:
-             self.countdown_source_id = GLib.timeout_add_seconds(1, self._on_tick)
+             self.countdown_source_id = GLib.timeout_add_seconds(1, self.track(self._on_tick))
 
         self._update_notification()
 
     def _on_tick(self):
-        if not self._running:
-             self.countdown_source_id = None
-             return False
-
         self.counter -= 1
         if self.counter <= 0:
              self._enable_keyboard()
@@ -123,71 +210,12 @@ class AndromedaGuardService:
             self._send_notification(msg, expire_timeout=expire_ms)
 
     def _send_notification(self, body, expire_timeout=None):
-        """Sends a notification using Gio and manages withdrawal."""
-        if self.withdrawal_source_id:
-            GLib.source_remove(self.withdrawal_source_id)
-            self.withdrawal_source_id = None
-
-        notification = Gio.Notification.new("Andromeda display guard")
-        notification.set_body(body)
-        notification.set_icon(Gio.ThemedIcon.new("input-keyboard"))
-
-        self.app.send_notification(self.notification_id, notification)
-
-        if expire_timeout:
-             self.withdrawal_source_id = GLib.timeout_add(expire_timeout, self._withdraw)
-
-    def _withdraw(self):
-        self.app.withdraw_notification(self.notification_id)
-        self.withdrawal_source_id = None
-        return False
-
-    def _start_monitor_subprocess(self):
-        """Monitors DBus for the custom signal using Gio.Subprocess."""
-        cmd = ["dbus-monitor", "--session", "type='signal',interface='org.freedesktop.DBus',member='NameAcquired'"]
-        logger.debug(f"Running dbus monitor: {' '.join(cmd)}")
-
-        try:
-            self.subprocess = Gio.Subprocess.new(
-                cmd,
-                Gio.SubprocessFlags.STDOUT_PIPE | Gio.SubprocessFlags.STDERR_PIPE
-            )
-
-            stdout_pipe = self.subprocess.get_stdout_pipe()
-            self.data_input_stream = Gio.DataInputStream.new(stdout_pipe)
-            self._read_line()
-
-        except Exception as e:
-            logger.error(f"Failed to start dbus-monitor: {e}")
-            self._quit_service()
-
-    def _read_line(self):
-        """Reads a line asynchronously."""
-        self.data_input_stream.read_line_async(
-            GLib.PRIORITY_DEFAULT,
-            self.cancellable,
-            self._on_line_read
+        """Updates the guard notification in place; the server expires it."""
+        self.notifications.notify(
+            "Andromeda display guard", body, icon_name="input-keyboard",
+            key=self.notification_id, expire_ms=expire_timeout or -1, source="andromeda-guard"
         )
 
-    def _on_line_read(self, source, result):
-        try:
-            line_bytes, length = source.read_line_finish(result)
-            if line_bytes is None:
-                logger.warning("dbus-monitor stream ended")
-                self._quit_service()
-                return
-
-            line = line_bytes.decode('utf-8').strip()
-            if "io.furios.Andromeda.Session" in line:
-                self._handle_session_reset()
-
-            self._read_line()
-
-        except GLib.Error as e:
-            if e.code != Gio.IOErrorEnum.CANCELLED:
-                logger.error(f"Error reading line: {e}")
-                self._quit_service()
-
 def run():
     service = AndromedaGuardService()
     service.run()
@@ -0,0 +1,155 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import time
+import signal
+import importlib
+from gi.repository import GLib
+from loguru import logger
+from tweak_flx1s.const import SERVICE_ALARM, SERVICE_GUARD, SERVICE_GESTURES, SERVICE_MEMORY, SERVICE_BUTTONS
+from tweak_flx1s.backends import get_backend
+from tweak_flx1s.core.monitor import MonitorStats, child_cpu_seconds, load_config, sd_notify
+
+# name -> (module, class, standalone unit)
+PLUGINS = {
+    "alarm": ("tweak_flx1s.services.alarm", "AlarmMonitor", SERVICE_ALARM),
+    "guard": ("tweak_flx1s.services.guard", "AndromedaGuardService", SERVICE_GUARD),
+    "gestures": ("tweak_flx1s.services.gestures", "GestureMonitor", SERVICE_GESTURES),
+    "memory": ("tweak_flx1s.services.memory", "MemoryPressureService", SERVICE_MEMORY),
+    "buttons": ("tweak_flx1s.services.buttons", "ButtonEngine", SERVICE_BUTTONS),
+}
+
+# Restart delays for a monitor that stopped on its own, like RestartSec with backoff.
+RESTART_DELAYS = [3, 10, 30, 60]
+
+def _rss_kb():
+    try:
+        with open("/proc/self/status", 'r') as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+class MonitorHost:
+    """
+    Runs several monitors as plug-ins of one process: one interpreter,
+    one main loop and one shared bus connection. Each monitor's callbacks
+    are accounted separately, so the stats report shows what each of them
+    costs. A monitor whose own unit is enabled is left to that unit.
+    """
+
+    def __init__(self):
+        self.config = load_config()
+        self.loop = GLib.MainLoop()
+        self.monitors = {}
+        self.failures = {}
+        self.stats = MonitorStats("host")
+        self.started = time.monotonic()
+
+    def run(self):
+        logger.info("Starting monitor host...")
+
+        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGTERM, self._on_quit)
+        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGINT, self._on_quit)
+        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGUSR1, self.stats.wrap(self._on_report))
+
+        for name in PLUGINS:
+            if self.config.get(name):
+                self._load(name)
+
+        sd_notify(f"READY=1\nSTATUS=Hosting {', '.join(self.monitors) or 'nothing'}")
+        if not self.monitors:
+            logger.info("No monitors enabled, exiting.")
+            return
+
+        interval = self.config.get("stats_interval_seconds", 0)
+        if interval > 0:
+            GLib.timeout_add_seconds(interval, self.stats.wrap(self._on_report))
+
+        try:
+            self.loop.run()
+        except KeyboardInterrupt:
+            self._on_quit()
+
+    def _load(self, name):
+        module_name, class_name, unit = PLUGINS[name]
+        if get_backend().services.is_enabled(unit) == "enabled":
+            logger.info(f"{unit} is enabled on its own, not hosting {name}")
+            return
+
+        try:
+            cls = getattr(importlib.import_module(module_name), class_name)
+            monitor = cls()
+        except Exception as e:
+            logger.error(f"Failed to load monitor {name}: {e}")
+            return
+        monitor.on_stopped = self._on_monitor_stopped
+        self.monitors[name] = monitor
+        self._start(monitor)
+
+    def _start(self, monitor):
+        monitor.running = True
+        try:
+            started = monitor.start()
+        except Exception as e:
+            logger.error(f"Monitor {monitor.name} failed to start: {e}")
+            started = False
+        if not started:
+            monitor.running = False
+            logger.info(f"Monitor {monitor.name} is not running")
+        return GLib.SOURCE_REMOVE
+
+    def _on_monitor_stopped(self, monitor):
+        failures = self.failures.get(monitor.name, 0)
+        delay = RESTART_DELAYS[min(failures, len(RESTART_DELAYS) - 1)]
+        self.failures[monitor.name] = failures + 1
+        logger.warning(f"Monitor {monitor.name} stopped, restarting in {delay}s")
+        GLib.timeout_add_seconds(delay, self._start, monitor)
+
+    def _on_report(self):
+        self.report()
+        return GLib.SOURCE_CONTINUE
+
+    def report(self):
+        """Logs CPU time and wakeups per monitor, and the process RSS."""
+        uptime = time.monotonic() - self.started
+        logger.info(f"Monitor host: {len(self.monitors)} monitors, RSS {_rss_kb() // 1024} MB, "
+                    f"CPU {time.process_time():.2f}s over {uptime / 60:.0f} min")
+        for name, monitor in self.monitors.items():
+            child = sum(child_cpu_seconds(pid) for pid in monitor.child_pids())
+            state = "running" if monitor.running else "stopped"
+            logger.info(f"  {name}: {state}, {monitor.stats.wakeups} wakeups, "
+                        f"{monitor.stats.cpu_seconds * 1000:.0f} ms CPU"
+                        + (f", helpers {child:.2f}s CPU" if child else ""))
+        logger.info(f"  host: {self.stats.wakeups} wakeups, {self.stats.cpu_seconds * 1000:.0f} ms CPU")
+
+    def _on_quit(self):
+        logger.info("Stopping monitor host...")
+        sd_notify("STOPPING=1")
+        self.report()
+        for monitor in self.monitors.values():
+            monitor.on_stopped = None
+            if monitor.running:
+                monitor.running = False
+                monitor.stop()
+        if self.loop.is_running():
+            self.loop.quit()
+        return GLib.SOURCE_REMOVE
+
+def run():
+    host = MonitorHost()
+    host.run()
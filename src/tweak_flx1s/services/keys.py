@@ -0,0 +1,85 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import signal
+from gi.repository import GLib
+from loguru import logger
+from tweak_flx1s.const import KEYS_SOCKET
+from tweak_flx1s.actions import keys
+from tweak_flx1s.core.ipc import SocketServer
+from tweak_flx1s.core.wayland import WaylandError
+
+class KeyInjectionService:
+    """
+    Holds a virtual keyboard open and injects event batches sent by
+    one-shot processes over a unix socket.
+    """
+
+    def __init__(self, path=KEYS_SOCKET):
+        self.loop = GLib.MainLoop()
+        self.server = SocketServer(path, self._on_request)
+
+    def run(self):
+        logger.info("Starting key injection service...")
+        keys.set_injector(self._connect())
+        self.server.start()
+
+        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGTERM, self._on_quit)
+        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGINT, self._on_quit)
+
+        try:
+            self.loop.run()
+        except KeyboardInterrupt:
+            self._on_quit()
+
+    def _connect(self):
+        try:
+            return keys.VirtualKeyboardInjector()
+        except (WaylandError, OSError) as e:
+            logger.warning(f"Virtual keyboard unavailable ({e}), using wtype")
+            return keys.WtypeInjector()
+
+    def _on_request(self, request):
+        events = [tuple(e) for e in request.get("events", [])]
+        injector = keys.get_injector()
+        try:
+            injector.send(events)
+            return {"ok": True}
+        except WaylandError as e:
+            # Compositor restarted or dropped us, reconnect once and go on
+            # from where the text stopped.
+            logger.warning(f"Virtual keyboard lost: {e}")
+            typed = injector.typed
+            events = keys.unsent_events(events, typed)
+            injector = self._connect()
+            keys.set_injector(injector)
+            try:
+                injector.send(events)
+                return {"ok": True}
+            except WaylandError as e:
+                return {"error": str(e), "typed": typed + injector.typed}
+
+    def _on_quit(self):
+        logger.info("Stopping key injection service...")
+        self.server.stop()
+        keys.set_injector(None)
+
+        if self.loop.is_running():
+            self.loop.quit()
+        return GLib.SOURCE_REMOVE
+
+def run():
+    service = KeyInjectionService()
+    service.run()
@@ -0,0 +1,153 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import time
+import signal
+from gi.repository import GLib
+from loguru import logger
+from tweak_flx1s.core.monitor import Monitor
+from tweak_flx1s.core.notify import get_broker
+from tweak_flx1s.system.memory import load_config, list_candidates, read_pressure, ProcessHandle
+
+# Seconds between SIGTERM and SIGKILL.
+KILL_GRACE = 3
+# Fallback polling interval when the kernel refuses a PSI trigger.
+POLL_SECONDS = 10
+# avg10 percentage treated as pressure when polling.
+POLL_THRESHOLD = 10.0
+
+class MemoryPressureService(Monitor):
+    """
+    Responds to memory stalls before the kernel OOM killer does.
+    Registers a PSI trigger on /proc/pressure/memory and sleeps in poll()
+    until the kernel reports the stall threshold was crossed. The biggest
+    eligible process is then reported or terminated, at most once per cooldown.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        super().__init__()
+        self.config = load_config()
+        self.fd = None
+        self.watch_id = None
+        self.poll_id = None
+        self.last_response = 0
+
+    def start(self):
+        logger.info(f"Starting memory pressure service (action: {self.config['action']})...")
+        if not self._register_trigger():
+            self._start_polling()
+        return True
+
+    def _start_polling(self):
+        logger.warning(f"PSI trigger unavailable, polling every {POLL_SECONDS}s")
+        self.poll_id = GLib.timeout_add_seconds(POLL_SECONDS, self.track(self._on_poll))
+
+    def _register_trigger(self):
+        path = self.config["psi_file"]
+        try:
+            self.fd = os.open(path, os.O_RDWR | os.O_NONBLOCK)
+            os.write(self.fd, self.config["psi_trigger"].encode() + b"\0")
+        except OSError as e:
+            logger.error(f"Failed to register PSI trigger on {path}: {e}")
+            if self.fd is not None:
+                os.close(self.fd)
+                self.fd = None
+            return False
+
+        self.watch_id = GLib.io_add_watch(self.fd, GLib.PRIORITY_DEFAULT,
+                                          GLib.IOCondition.PRI | GLib.IOCondition.ERR,
+                                          self.track(self._on_trigger))
+        logger.info(f"PSI trigger registered: {self.config['psi_trigger']}")
+        return True
+
+    def _on_trigger(self, fd, condition):
+        if condition & GLib.IOCondition.ERR:
+            logger.error("PSI trigger was removed by the kernel")
+            self.watch_id = None
+            os.close(self.fd)
+            self.fd = None
+            self._start_polling()
+            return GLib.SOURCE_REMOVE
+        self._respond()
+        return GLib.SOURCE_CONTINUE
+
+    def _on_poll(self):
+        pressure = read_pressure(self.config["psi_file"])
+        if pressure and pressure.get("some", 0) >= POLL_THRESHOLD:
+            self._respond()
+        return GLib.SOURCE_CONTINUE
+
+    def _respond(self):
+        pressure = read_pressure(self.config["psi_file"]) or {}
+        logger.warning(f"Memory pressure: some avg10={pressure.get('some', 0):.1f}% "
+                       f"full avg10={pressure.get('full', 0):.1f}%")
+
+        now = time.monotonic()
+        if now - self.last_response < self.config["cooldown_seconds"]:
+            return
+
+        candidates = list_candidates(self.config, limit=1)
+        if not candidates:
+            logger.info("No eligible process to reclaim memory from")
+            return
+        self.last_response = now
+        victim = candidates[0]
+
+        if self.config["action"] == "kill":
+            logger.warning(f"Terminating {victim.name} (PID {victim.pid}, {victim.pss_mb} MB)")
+            process = None
+            try:
+                process = ProcessHandle(victim.pid)
+                process.send_signal(signal.SIGTERM)
+            except OSError as e:
+                logger.error(f"Failed to terminate {victim.name}: {e}")
+                if process:
+                    process.close()
+                return
+            GLib.timeout_add_seconds(KILL_GRACE, self.track(self._on_grace_expired), victim, process)
+            get_broker().notify("Low Memory", f"Closed {victim.name} ({victim.pss_mb} MB)",
+                                icon_name="dialog-warning", key="memory-pressure", source="memory")
+        else:
+            get_broker().notify("Low Memory", f"{victim.name} is using {victim.pss_mb} MB",
+                                icon_name="dialog-warning", key="memory-pressure", source="memory")
+
+    def _on_grace_expired(self, victim, process):
+        if process.alive():
+            logger.warning(f"{victim.name} ignored SIGTERM, killing")
+            try:
+                process.send_signal(signal.SIGKILL)
+            except OSError:
+                pass
+        process.close()
+        return GLib.SOURCE_REMOVE
+
+    def stop(self):
+        logger.info("Stopping memory pressure service...")
+        if self.watch_id:
+            GLib.source_remove(self.watch_id)
+            self.watch_id = None
+        if self.poll_id:
+            GLib.source_remove(self.poll_id)
+            self.poll_id = None
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+def run():
+    service = MemoryPressureService()
+    service.run()
@@ -18,6 +18,7 @@ import subprocess
 from loguru import logger
 from tweak_flx1s.utils import run_command
 from tweak_flx1s.const import HOME_DIR
+from tweak_flx1s.backends import get_backend
 
 class AndromedaManager:
     """
@@ -31,7 +32,8 @@ class AndromedaManager:
     FSTAB_MARKER_BEGIN = "# BEGIN ANDROMEDA MOUNTS"
     FSTAB_MARKER_END = "# END ANDROMEDA MOUNTS"
 
-    def __init__(self, user=None):
+    def __init__(self, user=None, backend=None):
+        self.backend = backend or get_backend()
         if user:
             self.HOST_USER = user
         else:
@@ -51,8 +53,12 @@ class AndromedaManager:
 
     def is_mounted(self):
         """Checks if shared folders are currently mounted."""
-        mounts = run_command("mount", check=False)
-        return self.LINUX_MOUNT_BASE in mounts or self.ANDROID_MOUNT_BASE in mounts
+        return bool(self._mounted_targets())
+
+    def _mounted_targets(self):
+        """Mount points below either share base."""
+        return [m["target"] for m in self.backend.mounts.list()
+                if m["target"].startswith((self.LINUX_MOUNT_BASE, self.ANDROID_MOUNT_BASE))]
 
     def toggle_mount(self):
         """Toggles the mount state."""
@@ -89,7 +95,7 @@ class AndromedaManager:
             self._ensure_dir(target, self.ANDROID_UID, self.ANDROID_UID, 0o775)
 
             try:
-                run_command(["mount", "--bind", source, target])
+                self.backend.mounts.bind(source, target)
                 fstab_entries.append(f"{source} {target} none bind 0 0")
             except Exception as e:
                 logger.error(f"Failed to mount {item}: {e}")
@@ -112,7 +118,7 @@ class AndromedaManager:
                 run_command(["chmod", "775", target])
 
                 try:
-                    run_command(["mount", "--bind", source, target])
+                    self.backend.mounts.bind(source, target)
                     fstab_entries.append(f"{source} {target} none bind 0 0")
                 except Exception as e:
                     logger.error(f"Failed to mount {item}: {e}")
@@ -124,9 +130,10 @@ class AndromedaManager:
         service = f"tweak-flx1s-andromeda-fs@{self.HOST_USER}.service"
         logger.info(f"Starting service {service}...")
         try:
-            run_command(["systemctl", "enable", service])
-            run_command(["systemctl", "daemon-reload"])
-            run_command(["systemctl", "start", service])
+            services = self.backend.services
+            services.enable(service, user=False)
+            services.daemon_reload(user=False)
+            services.start(service, user=False)
         except Exception as e:
             logger.error(f"Failed to start service {service}: {e}")
 
@@ -141,28 +148,21 @@ class AndromedaManager:
         service = f"tweak-flx1s-andromeda-fs@{self.HOST_USER}.service"
         logger.info(f"Stopping service {service}...")
         try:
-            run_command(["systemctl", "stop", service])
-            run_command(["systemctl", "disable", service])
-            run_command(["systemctl", "daemon-reload"])
+            services = self.backend.services
+            services.stop(service, user=False)
+            services.disable(service, user=False)
+            services.daemon_reload(user=False)
         except Exception as e:
             logger.error(f"Failed to stop service {service}: {e}")
 
         logger.info("Unmounting shared folders...")
 
-        mounts = run_command("mount").splitlines()
-        targets = []
-        for line in mounts:
-            if self.LINUX_MOUNT_BASE in line or self.ANDROID_MOUNT_BASE in line:
-                parts = line.split(" on ")
-                if len(parts) > 1:
-                    target = parts[1].split(" type ")[0]
-                    targets.append(target)
-
+        targets = self._mounted_targets()
         targets.sort(reverse=True)
 
         for target in targets:
             try:
-                run_command(["umount", "-l", target])
+                self.backend.mounts.unmount(target, lazy=True)
             except Exception:
                 pass
 
@@ -203,10 +203,7 @@ class AndromedaManager:
             watch_dirs.append(self.ANDROID_MOUNT_BASE)
 
         for d in watch_dirs:
-            cmd = ["setfacl", "-R",
-                   "-m", f"m:rwx,u:{self.HOST_USER}:rwx,d:u:{self.HOST_USER}:rwx,u:{self.ANDROID_UID}:rwx,d:u:{self.ANDROID_UID}:rwx",
-                   d]
-            run_command(cmd)
+            self.backend.acl.grant(d, [self.HOST_USER, self.ANDROID_UID], recursive=True)
 
         logger.info("Initial sync done. Watching...")
 
@@ -220,8 +217,7 @@ class AndromedaManager:
                 new_file = line.strip()
                 logger.info(f"New file detected: {new_file}")
 
-                cmd_update = ["setfacl", "-m", f"m:rwx,u:{self.HOST_USER}:rwx,u:{self.ANDROID_UID}:rwx", new_file]
-                run_command(cmd_update, check=False)
+                self.backend.acl.grant(new_file, [self.HOST_USER, self.ANDROID_UID], check=False)
         except KeyboardInterrupt:
             process.terminate()
 
@@ -13,18 +13,17 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from tweak_flx1s.utils import logger, run_command
+from tweak_flx1s.backends import get_backend
 
 class BatMonManager:
     """Manages FLX1s-Bat-Mon package installation and removal."""
 
+    def __init__(self, backend=None):
+        self.backend = backend or get_backend()
+
     def check_installed(self):
         """Checks if flx1s-bat-mon is installed."""
-        try:
-             run_command("dpkg -s flx1s-bat-mon", check=True)
-             return True
-        except Exception:
-             return False
+        return self.backend.packages.is_installed("flx1s-bat-mon")
 
     def get_install_cmd(self):
         """Returns command to install FLX1s-Bat-Mon."""
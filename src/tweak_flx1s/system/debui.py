@@ -13,24 +13,18 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from tweak_flx1s.utils import logger, run_command
+from tweak_flx1s.backends import get_backend
 
 class DebUiManager:
     """Manages DebUI package installation and removal."""
 
+    def __init__(self, backend=None):
+        self.backend = backend or get_backend()
+
     def check_installed(self):
         """Checks if deb-ui is installed."""
-        try:
-             run_command("dpkg -s deb-ui", check=True)
-             return True
-        except Exception:
-             pass
-
-        try:
-             run_command("dpkg -s debui", check=True)
-             return True
-        except Exception:
-             return False
+        packages = self.backend.packages
+        return packages.is_installed("deb-ui") or packages.is_installed("debui")
 
     def get_install_cmd(self):
         """Returns command to install DebUI."""
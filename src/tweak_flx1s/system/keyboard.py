@@ -16,24 +16,27 @@
 import os
 import shutil
 from loguru import logger
-from tweak_flx1s.utils import run_command
+from tweak_flx1s.backends import get_backend
 from tweak_flx1s.const import HOME_DIR
+from tweak_flx1s.core.assets import AssetBundle
 
 class KeyboardManager:
     """Manages keyboard layouts and OSK selection."""
 
-    def __init__(self):
+    def __init__(self, backend=None):
+        self.backend = backend or get_backend()
         self.SQUEEKBOARD_DIR = os.path.join(HOME_DIR, ".local/share/squeekboard")
         self.APP_SHARE_DIR = "/usr/share/tweak-flx1s"
         if not os.path.exists(self.APP_SHARE_DIR):
              self.APP_SHARE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../data/share"))
+        self.assets = AssetBundle("squeekboard", os.path.join(self.APP_SHARE_DIR, "squeekboard"),
+                                  self.SQUEEKBOARD_DIR, prune=True, link=True)
 
     def check_squeekboard_installed(self):
         """Checks if squeekboard package is installed."""
         try:
             logger.info("Checking if squeekboard is installed...")
-            res = run_command("dpkg -l squeekboard", check=False)
-            if res and "ii  squeekboard" in res:
+            if self.backend.packages.is_installed("squeekboard"):
                  logger.info("Squeekboard found via dpkg.")
                  return True
             if shutil.which("squeekboard"):
@@ -57,20 +60,16 @@ class KeyboardManager:
         """Returns the currently selected keyboard alternative."""
         try:
             logger.info("Fetching current keyboard...")
-            out = run_command("update-alternatives --query Phosh-OSK", check=False)
-            if not out:
-                 logger.warning("No output from update-alternatives query.")
+            path = self.backend.alternatives.query("Phosh-OSK")["value"]
+            if not path:
+                 logger.warning("No value from update-alternatives query.")
                  return "unknown"
 
-            for line in out.splitlines():
-                if line.startswith("Value:"):
-                    path = line.split(":", 1)[1].strip()
-                    logger.info(f"Current keyboard path: {path}")
-                    if "squeekboard" in path: return "squeekboard"
-                    if "stub" in path: return "phosh-osk-stub"
-                    if "stevia" in path: return "phosh-osk-stevia"
-                    return path
-            return "unknown"
+            logger.info(f"Current keyboard path: {path}")
+            if "squeekboard" in path: return "squeekboard"
+            if "stub" in path: return "phosh-osk-stub"
+            if "stevia" in path: return "phosh-osk-stevia"
+            return path
         except Exception as e:
             logger.error(f"Failed to get current keyboard: {e}")
             return "unknown"
@@ -82,28 +81,16 @@ class KeyboardManager:
         options = []
         try:
             logger.info("Querying available keyboards via Phosh-OSK...")
-            out = run_command("update-alternatives --query Phosh-OSK", check=False)
-
-            if out:
-                blocks = out.strip().split("\n\n")
-                for block in blocks:
-                    lines = block.splitlines()
-                    path = None
-                    priority = None
-
-                    for line in lines:
-                        if line.startswith("Alternative:"):
-                            path = line.split(":", 1)[1].strip()
-
-                    if path:
-                        name = "Unknown"
-                        if "squeekboard" in path: name = "Squeekboard"
-                        elif "stub" in path: name = "Phosh OSK (Stub)"
-                        elif "stevia" in path: name = "Phosh OSK (Stevia)"
-                        else: name = path
+            for alternative in self.backend.alternatives.query("Phosh-OSK")["alternatives"]:
+                path = alternative["path"]
+                name = "Unknown"
+                if "squeekboard" in path: name = "Squeekboard"
+                elif "stub" in path: name = "Phosh OSK (Stub)"
+                elif "stevia" in path: name = "Phosh OSK (Stevia)"
+                else: name = path
 
-                        logger.info(f"Found alternative: {name} ({path})")
-                        options.append({"name": name, "path": path})
+                logger.info(f"Found alternative: {name} ({path})")
+                options.append({"name": name, "path": path})
 
             if not options:
                  logger.warning("No alternatives found via query.")
@@ -119,20 +106,14 @@ class KeyboardManager:
         return f"update-alternatives --set Phosh-OSK {path}"
 
     def install_finnish_layout(self):
-        """Copies the custom Finnish layout to ~/.local/share/squeekboard."""
+        """Copies the custom Finnish layout to ~/.local/share/squeekboard, only the files that changed."""
         try:
             logger.info("Installing Finnish layout...")
-            src = os.path.join(self.APP_SHARE_DIR, "squeekboard")
-            if not os.path.exists(src):
-                logger.error(f"Source squeekboard dir not found at {src}")
+            if not self.assets.available():
+                logger.error(f"Source squeekboard dir not found at {self.assets.source}")
                 return False
 
-            if os.path.exists(self.SQUEEKBOARD_DIR):
-                logger.info(f"Removing existing directory: {self.SQUEEKBOARD_DIR}")
-                shutil.rmtree(self.SQUEEKBOARD_DIR)
-
-            shutil.copytree(src, self.SQUEEKBOARD_DIR)
-            logger.info(f"Installed Finnish layout to {self.SQUEEKBOARD_DIR}")
+            self.assets.sync()
             return True
         except Exception as e:
             logger.error(f"Failed to install Finnish layout: {e}")
@@ -0,0 +1,236 @@
+# Copyright (C) 2026 alaraajavamma aki@urheiluaki.fi
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import json
+import errno
+import select
+import signal
+import fnmatch
+from loguru import logger
+from tweak_flx1s.const import CONFIG_DIR
+
+CONFIG_FILE = os.path.join(CONFIG_DIR, "memory.json")
+
+DEFAULT_CONFIG = {
+    "psi_file": "/proc/pressure/memory",
+    # Stall threshold and window in microseconds. Unprivileged triggers need a
+    # window that is a multiple of 2 seconds.
+    "psi_trigger": "some 150000 2000000",
+    "action": "notify",
+    "cooldown_seconds": 60,
+    "min_pss_mb": 100,
+    "allow": [],
+    "deny": []
+}
+
+# Never touched: the shell, audio, the bus and the Android container.
+PROTECTED_NAMES = [
+    "systemd", "systemd-*", "dbus-daemon", "dbus-broker*", "phosh", "phoc", "gnome-session*",
+    "squeekboard", "feedbackd", "pipewire*", "wireplumber", "pulseaudio", "ModemManager",
+    "ofonod", "NetworkManager", "lxc-*", "andromeda*", "Xwayland", "tweak-flx1s"
+]
+PROTECTED_CGROUPS = ["andromeda", "lxc"]
+
+def load_config():
+    config = dict(DEFAULT_CONFIG)
+    if os.path.exists(CONFIG_FILE):
+        try:
+            with open(CONFIG_FILE, 'r') as f:
+                config.update(json.load(f))
+        except Exception as e:
+            logger.error(f"Failed to load memory config: {e}")
+    return config
+
+class ProcessInfo:
+    def __init__(self, pid, name, rss_kb):
+        self.pid = pid
+        self.name = name
+        self.rss_kb = rss_kb
+        self.pss_kb = None
+        self.oom_score = 0
+
+    @property
+    def pss_mb(self):
+        return (self.pss_kb or self.rss_kb) // 1024
+
+def _read(path):
+    with open(path, 'r') as f:
+        return f.read()
+
+def _matches(name, patterns):
+    return any(fnmatch.fnmatchcase(name, p) for p in patterns)
+
+def _protected_cgroup(pid):
+    try:
+        cgroup = _read(f"/proc/{pid}/cgroup")
+    except OSError:
+        return True
+    return any(marker in cgroup for marker in PROTECTED_CGROUPS)
+
+def read_pressure(path="/proc/pressure/memory"):
+    """Returns the 'some' and 'full' avg10 values, or None if PSI is unavailable."""
+    try:
+        lines = _read(path).splitlines()
+    except OSError:
+        return None
+    result = {}
+    for line in lines:
+        kind, *fields = line.split()
+        values = dict(f.split("=", 1) for f in fields)
+        result[kind] = float(values.get("avg10", 0))
+    return result
+
+def list_candidates(config, limit=5):
+    """
+    Returns the processes most worth reclaiming, largest first.
+    Only the current user's processes are considered. RSS from statm pre-selects,
+    PSS from smaps_rollup is read for the short list only.
+    """
+    uid = os.getuid()
+    own_pid = os.getpid()
+    page_kb = os.sysconf("SC_PAGE_SIZE") // 1024
+    allow = config.get("allow") or []
+    deny = PROTECTED_NAMES + (config.get("deny") or [])
+
+    procs = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        pid = int(entry)
+        if pid == own_pid:
+            continue
+        try:
+            if os.stat(f"/proc/{pid}").st_uid != uid:
+                continue
+            name = _read(f"/proc/{pid}/comm").strip()
+            rss_kb = int(_read(f"/proc/{pid}/statm").split()[1]) * page_kb
+        except (OSError, ValueError, IndexError):
+            continue
+
+        if allow and not _matches(name, allow):
+            continue
+        if _matches(name, deny):
+            continue
+        procs.append(ProcessInfo(pid, name, rss_kb))
+
+    procs.sort(key=lambda p: p.rss_kb, reverse=True)
+
+    result = []
+    for proc in procs[:limit * 3]:
+        if _protected_cgroup(proc.pid):
+            continue
+        try:
+            for line in _read(f"/proc/{proc.pid}/smaps_rollup").splitlines():
+                if line.startswith("Pss:"):
+                    proc.pss_kb = int(line.split()[1])
+                    break
+            proc.oom_score = int(_read(f"/proc/{proc.pid}/oom_score"))
+        except (OSError, ValueError):
+            continue
+        if proc.pss_mb >= config.get("min_pss_mb", 0):
+            result.append(proc)
+
+    result.sort(key=lambda p: (p.pss_kb or p.rss_kb, p.oom_score), reverse=True)
+    return result[:limit]
+
+def is_alive(pid):
+    try:
+        state = _read(f"/proc/{pid}/stat").rsplit(")", 1)[1].split()[0]
+    except (OSError, IndexError):
+        return False
+    return state != "Z"
+
+def start_time(pid):
+    """Start time of pid in clock ticks since boot, or None if it is gone."""
+    try:
+        return int(_read(f"/proc/{pid}/stat").rsplit(")", 1)[1].split()[19])
+    except (OSError, IndexError, ValueError):
+        return None
+
+class ProcessHandle:
+    """
+    A process pinned by a pidfd, so a later signal cannot reach another
+    process that reused its PID. Without pidfd support the start time is
+    compared before each signal instead.
+    """
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.started = start_time(pid)
+        self.pidfd = None
+        try:
+            self.pidfd = os.pidfd_open(pid)
+        except AttributeError:
+            pass
+        except OSError as e:
+            if e.errno != errno.ENOSYS:
+                raise
+
+    def alive(self):
+        if self.pidfd is not None:
+            # A pidfd polls readable once the process has exited.
+            return not select.select([self.pidfd], [], [], 0)[0]
+        return is_alive(self.pid) and self._same_process()
+
+    def _same_process(self):
+        return self.started is not None and start_time(self.pid) == self.started
+
+    def send_signal(self, sig):
+        if self.pidfd is not None:
+            signal.pidfd_send_signal(self.pidfd, sig)
+        elif self._same_process():
+            os.kill(self.pid, sig)
+        else:
+            raise ProcessLookupError(errno.ESRCH, os.strerror(errno.ESRCH))
+
+    def close(self):
+        if self.pidfd is not None:
+            os.close(self.pidfd)
+            self.pidfd = None
+
+def terminate(pid, grace=3.0):
+    """Sends SIGTERM, then SIGKILL if the process is still there after grace seconds."""
+    import time
+    try:
+        process = ProcessHandle(pid)
+    except ProcessLookupError:
+        return True
+    except OSError as e:
+        logger.error(f"Cannot terminate {pid}: {e}")
+        return False
+
+    try:
+        try:
+            process.send_signal(signal.SIGTERM)
+        except ProcessLookupError:
+            return True
+        except PermissionError as e:
+            logger.error(f"Cannot terminate {pid}: {e}")
+            return False
+
+        deadline = time.monotonic() + grace
+        while time.monotonic() < deadline:
+            if not process.alive():
+                return True
+            time.sleep(0.1)
+
+        try:
+            process.send_signal(signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        return True
+    finally:
+        process.close()
@@ -13,12 +13,15 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-import subprocess
-from tweak_flx1s.utils import logger, run_command, get_device_model
+from tweak_flx1s.utils import get_device_model
+from tweak_flx1s.backends import get_backend
 
 class PackageManager:
     """Helper class for package management commands."""
 
+    def __init__(self, backend=None):
+        self.backend = backend or get_backend()
+
     def check_is_staging(self):
         """Checks if the system is on staging environment."""
         base_pkgs = ["furios-apt-config-staging", "furios-apt-config-debian-staging"]
@@ -76,11 +79,7 @@ class PackageManager:
 
     def check_package_installed(self, package_name):
         """Checks if a package is installed."""
-        try:
-            run_command(f"dpkg -s {package_name}", check=True)
-            return True
-        except Exception:
-            return False
+        return self.backend.packages.is_installed(package_name)
 
     def _run_in_terminal(self, command):
         """Helper to format command for execution."""
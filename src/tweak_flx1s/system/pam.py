@@ -16,7 +16,8 @@
 import os
 import shutil
 from loguru import logger
-from tweak_flx1s.utils import run_command, get_device_model
+from tweak_flx1s.utils import get_device_model
+from tweak_flx1s.backends import get_backend
 
 class PamManager:
     """
@@ -86,6 +87,9 @@ password  optional  pam_gnome_keyring.so
 # end of pam-auth-update config
 """
 
+    def __init__(self, backend=None):
+        self.backend = backend or get_backend()
+
     def configure_fingerprint(self):
         """
         Configures fingerprint authentication for FuriPhoneFLX1.
@@ -100,7 +104,7 @@ password  optional  pam_gnome_keyring.so
 
         logger.info("Installing required packages...")
         try:
-            run_command(["apt-get", "install", "-y", "libpam-parallel", "libpam-biomd"])
+            self.backend.packages.install(["libpam-parallel", "libpam-biomd"])
         except Exception as e:
             logger.error(f"Failed to install packages: {e}")
             return f"Failed to install packages: {e}"
@@ -16,24 +16,28 @@
 import os
 import shutil
 from tweak_flx1s.utils import logger, run_command
+from tweak_flx1s.backends import get_backend
 
 class PhofonoManager:
     """Manages Phofono package installation and removal."""
 
+    def __init__(self, backend=None):
+        self.backend = backend or get_backend()
+
     def check_installed(self):
         """Checks if phofono is installed."""
         try:
              logger.debug("Checking if phofono is installed...")
-             run_command("dpkg -s phofono", check=True)
-             return True
+             return self.backend.packages.is_installed("phofono")
         except Exception:
              return False
 
     def prepare_install(self):
         """Prepares environment for phofono installation."""
         logger.info("Preparing install: stopping services...")
-        run_command("systemctl --user stop calls-daemon", check=False)
-        run_command("systemctl --user mask calls-daemon", check=False)
+        services = self.backend.services
+        services.stop("calls-daemon", check=False)
+        services.mask("calls-daemon", check=False)
 
         work_dir = "/tmp/phofono"
         if os.path.exists(work_dir):
@@ -72,8 +76,9 @@ echo "Root tasks complete."
         with open(service_file, "w") as f:
             f.write("[D-BUS Service]\nName=org.gnome.Calls\nExec=/bin/true")
 
-        run_command("systemctl --user disable ofono-toned", check=False)
-        run_command("systemctl --user mask ofono-toned", check=False)
+        services = self.backend.services
+        services.disable("ofono-toned", check=False)
+        services.mask("ofono-toned", check=False)
         run_command("pkill -f ofono-toned", check=False)
 
         work_dir = "/tmp/phofono"
@@ -100,14 +105,15 @@ echo "Root tasks complete."
     def finish_uninstall(self):
         """Finalizes uninstallation as user."""
         logger.info("Finishing uninstall: restoring user services...")
-        run_command("systemctl --user unmask calls-daemon", check=False)
+        services = self.backend.services
+        services.unmask("calls-daemon", check=False)
 
         dbus_file = os.path.expanduser("~/.local/share/dbus-1/services/org.gnome.Calls.service")
         if os.path.exists(dbus_file):
             os.remove(dbus_file)
 
-        run_command("systemctl --user daemon-reload", check=False)
+        services.daemon_reload(check=False)
 
-        run_command("systemctl --user unmask ofono-toned", check=False)
-        run_command("systemctl --user enable ofono-toned", check=False)
-        run_command("systemctl --user start ofono-toned", check=False)
+        services.unmask("ofono-toned", check=False)
+        services.enable("ofono-toned", check=False)
+        services.start("ofono-toned", check=False)
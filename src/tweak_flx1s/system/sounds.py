@@ -14,20 +14,25 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import os
-import shutil
 from loguru import logger
-from tweak_flx1s.utils import run_command
+from tweak_flx1s.backends import get_backend
+from tweak_flx1s.core.assets import AssetBundle
 from tweak_flx1s.const import HOME_DIR
 
+SOUND_SCHEMA = "org.gnome.desktop.sound"
+
 class SoundManager:
     """Manages custom sound themes."""
 
-    def __init__(self):
+    def __init__(self, backend=None):
+        self.backend = backend or get_backend()
         self.SOUND_DIR = os.path.join(HOME_DIR, ".local/share/sounds/__custom")
         self.APP_SHARE_DIR = "/usr/share/tweak-flx1s"
         if not os.path.exists(os.path.join(self.APP_SHARE_DIR, "sounds")):
 
              self.APP_SHARE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../data/share"))
+        self.assets = AssetBundle("sounds", os.path.join(self.APP_SHARE_DIR, "sounds", "__custom"),
+                                  self.SOUND_DIR, prune=True, link=True)
 
     def is_custom_sounds_installed(self):
         """Checks if the custom sound folder exists and is populated."""
@@ -36,39 +41,30 @@ class SoundManager:
     def is_custom_theme_active(self):
         """Checks if the custom sound theme is currently active in gsettings."""
         try:
-            out = run_command("gsettings get org.gnome.desktop.sound theme-name", check=False)
-            return "__custom" in out
+            return self.backend.settings.get(SOUND_SCHEMA, "theme-name") == "__custom"
         except Exception:
             return False
 
     def install_custom_sounds(self):
-        """Copies custom sounds to local share."""
+        """Copies custom sounds to local share, only the files that changed."""
         try:
-            src = os.path.join(self.APP_SHARE_DIR, "sounds", "__custom")
-            if not os.path.exists(src):
-                logger.error(f"Source sounds dir not found at {src}")
+            if not self.assets.available():
+                logger.error(f"Source sounds dir not found at {self.assets.source}")
                 return False
 
-            if os.path.exists(self.SOUND_DIR):
-                shutil.rmtree(self.SOUND_DIR)
-
-            shutil.copytree(src, self.SOUND_DIR)
-            logger.info(f"Installed custom sounds to {self.SOUND_DIR}")
+            self.assets.sync()
             return True
         except Exception as e:
             logger.error(f"Failed to install custom sounds: {e}")
             return False
 
     def enable_custom_theme(self):
-        """Enables the custom sound theme."""
-        if not self.is_custom_sounds_installed():
-            if not self.install_custom_sounds():
-                return False
+        """Enables the custom sound theme, updating the installed sounds first if they changed."""
+        if not self.install_custom_sounds() and not self.is_custom_sounds_installed():
+            return False
 
-        run_command("gsettings set org.gnome.desktop.sound theme-name '__custom'", check=False)
-        return True
+        return self.backend.settings.set(SOUND_SCHEMA, "theme-name", "__custom")
 
     def disable_custom_theme(self):
         """Reverts to default sound theme."""
-        run_command("gsettings set org.gnome.desktop.sound theme-name 'default'", check=False)
-        return True
+        return self.backend.settings.set(SOUND_SCHEMA, "theme-name", "default")
@@ -15,18 +15,16 @@
 
 import requests
 import urllib.parse
-from gi.repository import Gio, GLib
+from gi.repository import GLib
 from tweak_flx1s.utils import logger, run_command
+from tweak_flx1s.backends import get_backend
+
+WEATHER_SCHEMA = "org.gnome.Weather"
 
 class WeatherManager:
     """Manages GNOME Weather locations."""
-    def __init__(self):
-        self.schema_id = "org.gnome.Weather"
-        self.settings = None
-        try:
-            self.settings = Gio.Settings.new(self.schema_id)
-        except Exception as e:
-            logger.warning(f"Could not load GSettings for {self.schema_id}: {e}")
+    def __init__(self, backend=None):
+        self.settings = (backend or get_backend()).settings
 
     def search_location(self, query):
         """Searches for a location using OSM Nominatim."""
@@ -49,8 +47,9 @@ class WeatherManager:
 
     def add_location(self, location_data):
         """Adds a location to GNOME Weather settings."""
-        if not self.settings:
-            logger.error("GSettings not initialized")
+        current_value = self.settings.get_variant(WEATHER_SCHEMA, "locations")
+        if current_value is None:
+            logger.error(f"GSettings schema {WEATHER_SCHEMA} is not available")
             return False
 
         try:
@@ -67,8 +66,6 @@ class WeatherManager:
 
             new_location_variant = GLib.Variant.parse(GLib.VariantType("v"), variant_str, None)
 
-            current_value = self.settings.get_value("locations")
-
             builder = GLib.VariantBuilder(GLib.VariantType("av"))
 
             if current_value:
@@ -82,7 +79,8 @@ class WeatherManager:
             builder.add_value(new_location_variant)
 
             new_array = builder.end()
-            self.settings.set_value("locations", new_array)
+            if not self.settings.set(WEATHER_SCHEMA, "locations", new_array):
+                return False
             logger.info(f"Added location: {name}")
             return True
 
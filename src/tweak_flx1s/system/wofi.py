@@ -15,9 +15,9 @@
 
 import os
 import shutil
-import filecmp
 from loguru import logger
 from tweak_flx1s.const import HOME_DIR
+from tweak_flx1s.core.assets import AssetBundle
 
 class WofiManager:
     """Manages Wofi configuration."""
@@ -27,6 +27,7 @@ class WofiManager:
         self.APP_CONFIG_DIR = "/usr/share/tweak-flx1s/configs/wofi"
         if not os.path.exists(self.APP_CONFIG_DIR):
              self.APP_CONFIG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../data/configs/wofi"))
+        self.assets = AssetBundle("wofi", self.APP_CONFIG_DIR, self.WOFI_CONFIG_DIR, files=["config", "style.css"])
 
     def ensure_config_exists(self):
         """Ensures that Wofi config files exist."""
@@ -47,37 +48,12 @@ class WofiManager:
                     logger.warning(f"Source Wofi config not found: {src}")
 
     def check_config_match(self):
-        """Checks if current Wofi config matches the app default."""
-        for f in ["config", "style.css"]:
-            target = os.path.join(self.WOFI_CONFIG_DIR, f)
-            src = os.path.join(self.APP_CONFIG_DIR, f)
-
-            if not os.path.exists(target):
-                return False
-            if not os.path.exists(src):
-                return False
-
-            try:
-                if not filecmp.cmp(src, target, shallow=False):
-                    return False
-            except Exception:
-                return False
-        return True
+        """Checks if current Wofi config matches the app default, by cached content hash."""
+        return self.assets.in_sync()
 
     def force_install_config(self):
-        """Overwrites Wofi config with app defaults."""
-        if not os.path.exists(self.WOFI_CONFIG_DIR):
-            os.makedirs(self.WOFI_CONFIG_DIR)
-
-        for f in ["config", "style.css"]:
-            src = os.path.join(self.APP_CONFIG_DIR, f)
-            target = os.path.join(self.WOFI_CONFIG_DIR, f)
-
-            if os.path.exists(src):
-                try:
-                    shutil.copy(src, target)
-                    logger.info(f"Forced install of Wofi {f}")
-                except Exception as e:
-                    logger.error(f"Failed to force copy Wofi {f}: {e}")
-            else:
-                logger.warning(f"Source Wofi config not found: {src}")
+        """Overwrites Wofi config with app defaults, where it differs."""
+        try:
+            self.assets.sync()
+        except OSError as e:
+            logger.error(f"Failed to install Wofi config: {e}")
@@ -16,9 +16,7 @@
 import sys
 import shutil
 import subprocess
-import gi
 from loguru import logger
-from tweak_flx1s.const import APP_ID
 
 def setup_logging(debug=False):
     """Initializes logging configuration."""
@@ -75,25 +73,15 @@ def get_device_model():
         logger.error(f"Failed to detect device model: {e}")
         return "Unknown"
 
-def send_notification(title, body="", icon_name="dialog-information", id=None):
+def send_notification(title, body="", icon_name="dialog-information", id=None, image_path=None, expire_timeout=-1):
     """
-    Sends a notification using Gio.Application.
+    Sends a notification through the process-wide broker.
+    A notification with the same id replaces the previous one.
+    image_path, if given, is shown instead of the themed icon.
     """
     try:
-        gi.require_version('Gio', '2.0')
-        from gi.repository import Gio
-
-        app = Gio.Application(application_id=APP_ID, flags=Gio.ApplicationFlags.NON_UNIQUE)
-        app.register(None)
-
-        notification = Gio.Notification.new(title)
-        if body:
-            notification.set_body(body)
-        if icon_name:
-            icon = Gio.ThemedIcon.new(icon_name)
-            notification.set_icon(icon)
-
-        app.send_notification(id, notification)
-        logger.info(f"Notification sent: {title}")
+        from tweak_flx1s.core.notify import get_broker
+        get_broker().notify(title, body, icon_name=icon_name, key=id,
+                            image_path=image_path, expire_ms=expire_timeout)
     except Exception as e:
         logger.error(f"Failed to send notification: {e}")